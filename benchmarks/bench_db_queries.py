@@ -0,0 +1,155 @@
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from src.services.database import Database
+from .corpus import _SYLLABLES
+
+# The previous lookup queries (no secondary indexes, LOWER() on both sides)
+_OLD_ENTITY = """
+    SELECT DISTINCT a.* FROM articles a
+    JOIN article_entities ae ON a.id = ae.article_id
+    JOIN entities e ON e.id = ae.entity_id
+    WHERE e.type = ? AND (
+        (e.normalized IS NOT NULL AND LOWER(e.normalized) = LOWER(?))
+        OR (e.normalized IS NULL AND LOWER(e.name) = LOWER(?))
+    )
+    ORDER BY a.published_at DESC
+    LIMIT ?
+"""
+_OLD_SECTOR = """
+    SELECT DISTINCT a.* FROM articles a
+    JOIN entities e ON e.id IN (
+        SELECT entity_id FROM article_entities WHERE article_id = a.id
+    )
+    WHERE (e.type = 'SECTOR' AND LOWER(e.name) = LOWER(?))
+       OR (a.category IS NOT NULL AND LOWER(a.category) = LOWER(?))
+    ORDER BY a.published_at DESC
+    LIMIT ?
+"""
+_OLD_STOCK = """
+    SELECT a.* FROM articles a
+    JOIN stock_impacts s ON a.id = s.article_id
+    WHERE s.symbol = ?
+    ORDER BY a.published_at DESC
+    LIMIT ?
+"""
+_OLD_SCHEMA = [
+    "CREATE TABLE articles (id TEXT PRIMARY KEY, title TEXT, content TEXT, source TEXT, published_at TEXT, "
+    "url TEXT, category TEXT, metadata TEXT)",
+    "CREATE TABLE entities (id TEXT PRIMARY KEY, type TEXT, name TEXT, normalized TEXT)",
+    "CREATE TABLE article_entities (article_id TEXT, entity_id TEXT)",
+    "CREATE TABLE stock_impacts (article_id TEXT, symbol TEXT, confidence REAL, type TEXT)",
+]
+
+
+def _data(links: int, per_article: int, companies: int, sectors: int, seed: int = 0):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < companies:
+        names.add("".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(3, 5))).capitalize())
+    company_ents = [{"id": f"COMPANY:{n}", "type": "COMPANY", "name": n, "normalized": n.lower()} for n in sorted(names)]
+    sector_ents = [{"id": f"SECTOR:Sector{i}", "type": "SECTOR", "name": f"Sector{i}", "normalized": f"sector{i}"}
+                   for i in range(sectors)]
+    articles, entity_map, impacts = [], {}, []
+    for i in range(links // per_article):
+        aid = f"A{i}"
+        articles.append({"id": aid, "title": f"Story {i}", "content": "", "source": "Bench",
+                         "published_at": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00Z",
+                         "url": "", "category": rng.choice(sector_ents)["name"]})
+        ents = rng.sample(company_ents, per_article - 1) + [rng.choice(sector_ents)]
+        entity_map[aid] = ents
+        impacts += [{"article_id": aid, "symbol": e["name"].upper(), "confidence": 1.0, "type": "direct"}
+                    for e in ents if e["type"] == "COMPANY"]
+    return articles, entity_map, impacts, company_ents, sector_ents
+
+
+def _load_old(path, articles, entity_map, impacts):
+    conn = sqlite3.connect(path)
+    for stmt in _OLD_SCHEMA:
+        conn.execute(stmt)
+    conn.executemany("INSERT INTO articles VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                     [(a["id"], a["title"], a["content"], a["source"], a["published_at"], a["url"], a["category"], "None")
+                      for a in articles])
+    ents = {e["id"]: e for es in entity_map.values() for e in es}
+    conn.executemany("INSERT INTO entities VALUES (?, ?, ?, ?)",
+                     [(e["id"], e["type"], e["name"], e["normalized"]) for e in ents.values()])
+    conn.executemany("INSERT INTO article_entities VALUES (?, ?)",
+                     [(aid, e["id"]) for aid, es in entity_map.items() for e in es])
+    conn.executemany("INSERT INTO stock_impacts VALUES (?, ?, ?, ?)",
+                     [(i["article_id"], i["symbol"], i["confidence"], i["type"]) for i in impacts])
+    conn.commit()
+    return conn
+
+
+def _time(fn, args_list):
+    t0 = time.perf_counter()
+    out = [fn(*args) for args in args_list]
+    return (time.perf_counter() - t0) / len(args_list) * 1e3, out
+
+
+def run(links: int, per_article: int, companies: int, sectors: int, queries: int, old_sector_queries: int):
+    articles, entity_map, impacts, company_ents, sector_ents = _data(links, per_article, companies, sectors)
+    print(f"{len(articles)} articles, {links} article_entities rows, {len(impacts)} stock_impacts rows")
+    rng = random.Random(1)
+    company_q = [(e["name"],) for e in rng.sample(company_ents, queries)]
+    sector_q = [(e["name"],) for e in rng.sample(sector_ents, min(queries, len(sector_ents)))]
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        old = _load_old(os.path.join(tmp, "old.db"), articles, entity_map, impacts)
+        old_load = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        db = Database(os.path.join(tmp, "new.db"))
+        with db.transaction():
+            db.upsert_articles(articles)
+            db.link_entities_bulk(entity_map)
+            db.add_stock_impacts_bulk(impacts)
+        new_load = time.perf_counter() - t0
+        print(f"load: {old_load:.1f} s without indexes, {new_load:.1f} s with indexes")
+
+        # Compared by published_at: ties at the LIMIT boundary may pick different (equally recent) ids
+        def old_rows(sql, *args):
+            return [r[4] for r in old.execute(sql, args)]
+
+        def ids(rows):
+            return [r["published_at"] for r in rows]
+
+        cases = [
+            ("company", company_q,
+             lambda n: old_rows(_OLD_ENTITY, "COMPANY", n, n, 20), lambda n: ids(db.list_news_by_company(n.lower(), 20))),
+            ("sector", sector_q,
+             lambda n: old_rows(_OLD_SECTOR, n, n, 20), lambda n: ids(db.list_news_by_sector(n, 20))),
+            ("stock", company_q,
+             lambda s: old_rows(_OLD_STOCK, s.upper(), 20), lambda s: ids(db.list_news_by_stock(s.upper(), 20))),
+        ]
+        print(f"{'query':>8} {'old ms':>10} {'indexed ms':>11} {'speedup':>9}")
+        for name, args_list, old_fn, new_fn in cases:
+            new_ms, new_out = _time(new_fn, args_list)
+            old_args = args_list[:old_sector_queries] if name == "sector" else args_list
+            if not old_args:
+                print(f"{name:>8} {'skipped':>10} {new_ms:>11.3f} {'-':>9}")
+                continue
+            old_ms, old_out = _time(old_fn, old_args)
+            assert old_out == new_out[:len(old_out)]
+            print(f"{name:>8} {old_ms:>10.2f} {new_ms:>11.3f} {old_ms / new_ms:>8.0f}x")
+        old.close()
+        db.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Entity / sector / stock lookups: unindexed scans vs indexed joins")
+    parser.add_argument("--links", type=int, default=1_000_000, help="article_entities rows")
+    parser.add_argument("--per-article", type=int, default=5)
+    parser.add_argument("--companies", type=int, default=20000)
+    parser.add_argument("--sectors", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--old-sector-queries", type=int, default=0,
+                        help="runs of the old correlated sector query (~47 s each at 50k rows)")
+    args = parser.parse_args()
+    run(args.links, args.per_article, args.companies, args.sectors, args.queries, args.old_sector_queries)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import argparse
+import time
+from src.agents.deduplication import DeduplicationAgent
+from src.agents.news_ingestion import NewsIngestionAgent
+from src.services.embedding_service import EmbeddingService
+from .corpus import generate_corpus
+
+
+def run(sizes, dup_rate: float, exhaustive_max: int):
+    embedder = EmbeddingService("sentence-transformers/all-MiniLM-L6-v2")
+    normalizer = NewsIngestionAgent()
+    print(f"{'articles':>9} {'mode':>10} {'seconds':>9} {'us/article':>11} {'unique':>8} {'groups':>7}")
+    for n in sizes:
+        parsed = [normalizer._normalize(a) for a in generate_corpus(n, dup_rate=dup_rate)]
+        modes = [("blocked", True)] + ([("exhaustive", False)] if n <= exhaustive_max else [])
+        for name, blocking in modes:
+            agent = DeduplicationAgent(embedder, blocking=blocking)
+            t0 = time.perf_counter()
+            out = agent.run({"parsed_articles": parsed})
+            dt = time.perf_counter() - t0
+            print(f"{n:>9} {name:>10} {dt:>9.2f} {dt / n * 1e6:>11.1f} "
+                  f"{len(out['unique_articles']):>8} {len(out['duplicate_groups']):>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DeduplicationAgent scaling benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--dup-rate", type=float, default=0.2)
+    parser.add_argument("--exhaustive-max", type=int, default=2000,
+                        help="also time the exhaustive O(n^2) path up to this batch size")
+    args = parser.parse_args()
+    run(args.sizes, args.dup_rate, args.exhaustive_max)
+
+
+if __name__ == "__main__":
+    main()
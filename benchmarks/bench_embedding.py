@@ -0,0 +1,51 @@
+import argparse
+import re
+import time
+from typing import List
+from src.services.embedding_service import EmbeddingService
+from .corpus import generate_corpus
+
+
+def _per_text_embed(text: str, dim: int) -> List[float]:
+    # The previous fallback, verbatim: one Python list per text, per-token hash(), generator norm
+    text = text.lower()
+    text = re.sub(r"(\d)([a-zA-Z]+)", r"\1 \2", text)
+    text = re.sub(r"[^a-z0-9%]+", " ", text)
+    tokens = [t for t in text.split() if t]
+    vec = [0.0] * dim
+    for i, tok in enumerate(tokens):
+        idx = (hash(tok) % dim)
+        vec[idx] += 1.0
+        if i + 1 < len(tokens):
+            bigram = tok + "_" + tokens[i + 1]
+            bidx = (hash(bigram) % dim)
+            vec[bidx] += 0.5
+    norm = sum(v * v for v in vec) ** 0.5
+    if norm > 0:
+        vec = [v / norm for v in vec]
+    return vec
+
+
+def run(sizes):
+    svc = EmbeddingService("sentence-transformers/all-MiniLM-L6-v2")
+    print(f"{'texts':>8} {'per-text':>10} {'batched':>10} {'speedup':>9}")
+    for n in sizes:
+        texts = [a["title"] + "\n" + a["content"] for a in generate_corpus(n)]
+        t0 = time.perf_counter()
+        [_per_text_embed(t, svc.dim) for t in texts]
+        per_text = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        svc._fallback_embed_batch(texts)
+        batched = time.perf_counter() - t0
+        print(f"{n:>8} {per_text:>9.3f}s {batched:>9.3f}s {per_text / batched:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-text vs batched hashing-trick fallback embedder")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    args = parser.parse_args()
+    run(args.sizes)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import argparse
+import os
+import random
+import tempfile
+import time
+from src.services.database import Database
+from .corpus import generate_corpus
+
+
+def _articles(n: int, base: int):
+    # generate_corpus is slow at 1M; tile a smaller corpus with fresh ids instead
+    corpus = generate_corpus(min(n, base))
+    for i in range(n):
+        a = corpus[i % len(corpus)]
+        yield {**a, "id": f"S{i}", "url": f"https://example.com/synthetic/{i}"}
+
+
+def _like_search(db: Database, query: str):
+    # Lexical search without an index: every article's text is scanned for every term, and all
+    # matches come back to be ranked
+    terms = query.lower().split()
+    where = " OR ".join("(title LIKE ? OR content LIKE ?)" for _ in terms)
+    args = [f"%{t}%" for t in terms for _ in range(2)]
+    return db.conn.execute(f"SELECT id, title, content FROM articles WHERE {where}", args).fetchall()
+
+
+def run(n: int, base: int, queries: int, like_queries: int, batch: int = 50000):
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "news.db"))
+        t0 = time.perf_counter()
+        chunk = []
+        for a in _articles(n, base):
+            chunk.append(a)
+            if len(chunk) == batch:
+                db.upsert_articles(chunk)
+                chunk = []
+        db.upsert_articles(chunk)
+        load = time.perf_counter() - t0
+        size = sum(os.path.getsize(os.path.join(tmp, f)) for f in os.listdir(tmp)) / 2 ** 20
+        print(f"{n} articles loaded in {load:.0f} s (incl. FTS5 triggers), database {size:.0f} MiB")
+
+        sample = [r[0] for r in db.conn.execute("SELECT title FROM articles LIMIT 2000")]
+        query_list = [" ".join(rng.sample(rng.choice(sample).split(), 3)) for _ in range(queries)]
+        print(f"{'search':>26} {'ms/query':>10}")
+        t0 = time.perf_counter()
+        for q in query_list[:like_queries]:
+            _like_search(db, q)
+        like = (time.perf_counter() - t0) / max(1, like_queries) * 1e3
+        print(f"{'LIKE scan':>26} {like:>10.1f}")
+        t0 = time.perf_counter()
+        for q in query_list[:like_queries]:
+            db.search_text(q, limit=20, max_postings=n)
+        every = (time.perf_counter() - t0) / max(1, like_queries) * 1e3
+        print(f"{'FTS5 BM25, every term':>26} {every:>10.1f}")
+        t0 = time.perf_counter()
+        hits = [db.search_text(q, limit=20) for q in query_list]
+        fts = (time.perf_counter() - t0) / queries * 1e3
+        assert all(hits)
+        print(f"{'FTS5 BM25, selective terms':>26} {fts:>10.2f}")
+        db.conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lexical search: LIKE scans vs the FTS5 index with BM25 ranking")
+    parser.add_argument("--articles", type=int, default=1_000_000)
+    parser.add_argument("--base", type=int, default=20000, help="distinct articles tiled to --articles")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--like-queries", type=int, default=3)
+    args = parser.parse_args()
+    run(args.articles, args.base, args.queries, args.like_queries)
+
+
+if __name__ == "__main__":
+    main()
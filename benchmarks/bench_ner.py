@@ -0,0 +1,90 @@
+import argparse
+import random
+import re
+import time
+from src.services.ner_service import NERService
+from .corpus import _SYLLABLES, generate_corpus
+
+_SUFFIXES = ["Industries", "Finance", "Pharma", "Motors", "Power", "Bank", "Textiles", "Cements", "Infra", "Labs"]
+
+
+def _companies(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < n:
+        stem = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(2, 4))).capitalize()
+        names.add(f"{stem} {rng.choice(_SUFFIXES)}" if rng.random() < 0.7 else stem)
+    return sorted(names)
+
+
+def _per_keyword_extract(ner: NERService, text: str):
+    # The previous loop: one re.search (pattern rebuilt) per gazetteer entry
+    found = []
+    for label, kws in (("COMPANY", ner.company_keywords), ("REGULATOR", ner.regulator_keywords),
+                       ("SECTOR", ner.sector_keywords)):
+        for kw in kws:
+            if re.search(rf"\b{re.escape(kw)}\b", text, re.IGNORECASE):
+                found.append((label, kw))
+    return found
+
+
+def run(sizes, articles: int, loop_articles: int):
+    base = NERService()
+    corpus = generate_corpus(articles)
+    print(f"{'gazetteer':>10} {'build':>8} {'per-keyword':>13} {'matcher':>11} {'speedup':>9}")
+    for n in sizes:
+        extra = _companies(max(0, n - len(base.company_keywords)))
+        ner = NERService(company_keywords=base.company_keywords + extra)
+        rng = random.Random(n)
+        # Each article mentions a couple of gazetteer companies so both paths do real matching work
+        texts = [f"{a['title']}\n{a['content']} {' and '.join(rng.sample(ner.company_keywords, 2))}" for a in corpus]
+        t0 = time.perf_counter()
+        ner.build_matcher()
+        build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for t in texts:
+            ner.extract(t)
+        matcher = (time.perf_counter() - t0) / len(texts)
+        sample = texts[:loop_articles]
+        t0 = time.perf_counter()
+        for t in sample:
+            _per_keyword_extract(ner, t)
+        loop = (time.perf_counter() - t0) / len(sample)
+        print(f"{len(ner.matcher):>10} {build:>7.2f}s {loop * 1e3:>10.2f} ms {matcher * 1e3:>8.3f} ms {loop / matcher:>8.0f}x")
+
+
+def run_pipeline(articles: int, batch_size: int, n_process: int):
+    # Per-article extract() vs extract_many() over one ingest batch (spaCy path)
+    ner = NERService(batch_size=batch_size, n_process=n_process)
+    if ner.nlp is None:
+        print("spaCy / en_core_web_* not installed; extract_many only runs the gazetteer matcher")
+    texts = [a["title"] + "\n" + a["content"] for a in generate_corpus(articles)]
+    t0 = time.perf_counter()
+    single = [ner.extract(t) for t in texts]
+    per_article = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    batched = ner.extract_many(texts)
+    many = time.perf_counter() - t0
+    assert single == batched, "extract_many changed the entities"
+    print(f"{articles} articles: extract() loop {per_article:.2f}s, extract_many(batch_size={batch_size}, "
+          f"n_process={n_process}) {many:.2f}s, {per_article / many:.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="NERService throughput: gazetteer matcher scaling, or batched spaCy extraction")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[21, 1000, 10000, 50000])
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--loop-articles", type=int, default=20)
+    parser.add_argument("--pipeline", type=int, default=0, metavar="ARTICLES",
+                        help="instead: time extract() per article vs extract_many() on this many articles")
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--n-process", type=int, default=1)
+    args = parser.parse_args()
+    if args.pipeline:
+        run_pipeline(args.pipeline, args.batch_size, args.n_process)
+    else:
+        run(args.sizes, args.articles, args.loop_articles)
+
+
+if __name__ == "__main__":
+    main()
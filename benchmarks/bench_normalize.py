@@ -0,0 +1,60 @@
+import argparse
+import re
+import time
+from src.utils.text_normalizer import normalize_tokens
+from .corpus import generate_corpus
+
+
+def _sequential_normalize(text: str) -> str:
+    # The previous DeduplicationAgent._normalize_text: one re.sub pass per rule
+    t = text.lower()
+    t = re.sub(r"\b(reserve bank of india|reserve bank|central bank)\b", "rbi", t)
+    t = re.sub(r"\b(repo rate|policy rate|interest rates|interest rate)\b", "policy rate", t)
+    t = re.sub(r"\b(hike|hikes|hiked|raise|raises|raised|increase|increases|increased)\b", "raise", t)
+    t = re.sub(r"\b(share repurchase|repurchase)\b", "buyback", t)
+    t = re.sub(r"\b(bags|bagged|wins|won)\b", "win", t)
+    t = re.sub(r"\b(okays|approves|approved)\b", "approve", t)
+    t = re.sub(r"\b(mega deal|mega)\b", "deal", t)
+    t = re.sub(r"\bbasis points\b", "bps", t)
+    t = re.sub(r"\b(\d+)\s*bps\b", r"\1 bps", t)
+    t = re.sub(r"\b(\d+)bps\b", r"\1 bps", t)
+    if re.search(r"\b(policy rate|repo|interest)\b", t):
+        def pct_to_bps(m):
+            try:
+                return f"{int(round(float(m.group(1)) * 100))} bps"
+            except Exception:
+                return m.group(0)
+        t = re.sub(r"(\d+(?:\.\d+)?)\s*%", pct_to_bps, t)
+    else:
+        t = re.sub(r"\s*%\b", " percent", t)
+    return re.sub(r"\s+", " ", t).strip()
+
+
+def run(n: int):
+    articles = generate_corpus(n)
+    # Both texts the dedup agent normalizes per article: the title and title + content
+    texts = [s for a in articles for s in (a["title"], a["title"] + "\n" + a["content"])]
+
+    t0 = time.perf_counter()
+    old = [set(_sequential_normalize(t).split()) for t in texts]
+    sequential = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    new = [set(normalize_tokens(t)[1]) for t in texts]
+    compiled = time.perf_counter() - t0
+    assert old == new, "normalizers disagree"
+
+    print(f"{'normalizer':>12} {'seconds':>9} {'articles/s':>11}")
+    print(f"{'sequential':>12} {sequential:>9.3f} {n / sequential:>11.0f}")
+    print(f"{'compiled':>12} {compiled:>9.3f} {n / compiled:>11.0f}")
+    print(f"speedup {sequential / compiled:.1f}x (token sets identical on {len(texts)} texts)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-rule re.sub passes vs compiled dedup normalizer")
+    parser.add_argument("--articles", type=int, default=20000)
+    args = parser.parse_args()
+    run(args.articles)
+
+
+if __name__ == "__main__":
+    main()
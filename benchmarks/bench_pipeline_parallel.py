@@ -0,0 +1,52 @@
+import argparse
+import os
+import tempfile
+import time
+from src.graph.workflow import build_news_processing_graph, build_streaming_news_pipeline
+from src.services.database import Database
+from src.services.dedup_index import DedupIndex
+from src.services.embedding_service import EmbeddingService
+from src.services.ner_service import NERService
+from src.services.vector_db import VectorDB
+from .corpus import generate_corpus
+
+
+def _services(tmp: str):
+    # A fresh store and a cold embedding cache per run
+    embedder = EmbeddingService("sentence-transformers/all-MiniLM-L6-v2")
+    return (Database(os.path.join(tmp, "news.db")), VectorDB(os.path.join(tmp, "vector_store"), embedder), embedder,
+            NERService(), DedupIndex(os.path.join(tmp, "dedup_index.db")))
+
+
+def run(articles: int, workers, batch_size: int, max_pending: int):
+    corpus = generate_corpus(articles)
+    print(f"{articles} articles, {os.cpu_count()} CPUs, batch_size {batch_size}")
+    print(f"{'mode':>26} {'seconds':>9} {'articles/s':>11} {'unique':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        graph = build_news_processing_graph(*_services(os.path.join(tmp, "graph")))
+        t0 = time.perf_counter()
+        unique = len(graph.invoke({"mode": "single_article", "raw_articles": corpus})["unique_articles"])
+        dt = time.perf_counter() - t0
+        print(f"{'whole-list graph':>26} {dt:>9.2f} {articles / dt:>11.0f} {unique:>8}")
+        for w in workers:
+            pipeline = build_streaming_news_pipeline(*_services(os.path.join(tmp, f"stream{w}")), batch_size=batch_size,
+                                                     max_pending=max_pending, embed_workers=w, ner_workers=w)
+            t0 = time.perf_counter()
+            unique = pipeline.run({"mode": "single_article", "raw_articles": corpus})["unique"]
+            dt = time.perf_counter() - t0
+            name = f"streaming, {w} embed + {w} NER" if w else "streaming, in-thread"
+            print(f"{name:>26} {dt:>9.2f} {articles / dt:>11.0f} {unique:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="News pipeline throughput vs process-pool worker counts")
+    parser.add_argument("--articles", type=int, default=10000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[0, 1, 2, 4])
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--max-pending", type=int, default=2)
+    args = parser.parse_args()
+    run(args.articles, args.workers, args.batch_size, args.max_pending)
+
+
+if __name__ == "__main__":
+    main()
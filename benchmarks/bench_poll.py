@@ -0,0 +1,42 @@
+import argparse
+import tempfile
+import time
+from pathlib import Path
+from src.agents.deduplication import DeduplicationAgent
+from src.agents.news_ingestion import NewsIngestionAgent
+from src.services.dedup_index import DedupIndex
+from src.services.embedding_service import EmbeddingService
+from .corpus import generate_corpus
+
+
+def run(feed_size: int, new_per_poll: int, polls: int):
+    normalizer = NewsIngestionAgent()
+    corpus = [normalizer._normalize(a) for a in generate_corpus(feed_size + new_per_poll * polls, dup_rate=0.1)]
+    with tempfile.TemporaryDirectory() as tmp:
+        index = DedupIndex(str(Path(tmp) / "dedup_index.db"))
+        agent = DeduplicationAgent(EmbeddingService("sentence-transformers/all-MiniLM-L6-v2"), index=index)
+        print(f"{'poll':>5} {'feed':>6} {'known':>6} {'new':>6} {'seconds':>9}")
+        for p in range(polls + 1):
+            # The feed is a sliding window: each poll drops the oldest items and adds `new_per_poll`
+            start = p * new_per_poll
+            feed = corpus[start:start + feed_size]
+            t0 = time.perf_counter()
+            out = agent.run({"mode": "ingest_rss", "parsed_articles": feed})
+            if out.get("dedup_index_entries"):
+                index.add(out["dedup_index_entries"])
+            dt = time.perf_counter() - t0
+            print(f"{p:>5} {len(feed):>6} {len(out.get('known_articles', [])):>6} "
+                  f"{len(out['unique_articles']):>6} {dt:>9.3f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Steady-state RSS poll cost with the cross-batch dedup index")
+    parser.add_argument("--feed-size", type=int, default=2000)
+    parser.add_argument("--new-per-poll", type=int, default=50)
+    parser.add_argument("--polls", type=int, default=5)
+    args = parser.parse_args()
+    run(args.feed_size, args.new_per_poll, args.polls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from types import SimpleNamespace
+
+
+def run(articles: int, repeats: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DB_PATH"] = os.path.join(tmp, "news.db")
+        os.environ["VECTOR_DB_PATH"] = os.path.join(tmp, "vector_store")
+        from src.api.routes import news_by_sector, news_by_stock, query_news
+        from src.main import create_app
+        from .corpus import generate_corpus
+        app = create_app()
+        app.state.news_graph.invoke({"mode": "single_article", "raw_articles": generate_corpus(articles)})
+        request = SimpleNamespace(app=app)
+        loop = asyncio.new_event_loop()
+        cases = [
+            ("/query", lambda: query_news(request, q="HDFC Bank results and RBI policy", top_k=10)),
+            ("/stocks/{symbol}/news", lambda: news_by_stock(request, symbol="HDFCBANK", top_k=20)),
+            ("/sectors/{sector}/news", lambda: news_by_sector(request, sector="Banking", top_k=20)),
+        ]
+        print(f"{articles} articles stored")
+        print(f"{'endpoint':>24} {'uncached ms':>12} {'cached ms':>10}")
+        for name, call in cases:
+            t0 = time.perf_counter()
+            for _ in range(repeats):
+                app.state.db.bump_generation()
+                loop.run_until_complete(call())
+            uncached = (time.perf_counter() - t0) / repeats * 1e3
+            loop.run_until_complete(call())
+            t0 = time.perf_counter()
+            for _ in range(repeats * 100):
+                loop.run_until_complete(call())
+            cached = (time.perf_counter() - t0) / (repeats * 100) * 1e3
+            print(f"{name:>24} {uncached:>12.2f} {cached:>10.3f}")
+        print(app.state.query_cache.stats())
+        loop.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Read endpoints with and without the query result cache")
+    parser.add_argument("--articles", type=int, default=2000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    run(args.articles, args.repeats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import feedparser
+from src.utils.rss_parser import RSSFetcher
+
+_ITEM = ("<item><guid>{feed}-{i}</guid><title>Story {i} from {feed}</title><link>http://example.com/{feed}/{i}</link>"
+         "<description>{body}</description></item>")
+
+
+class _Server(ThreadingHTTPServer):
+    # The default listen backlog (5) makes concurrent connects wait for SYN retries
+    request_queue_size = 128
+
+
+def _server(feeds: int, items: int, latency: float):
+    bodies = {}
+    for f in range(feeds):
+        entries = "".join(_ITEM.format(feed=f, i=i, body="Markets rally as RBI holds rates. " * 10) for i in range(items))
+        bodies[f"/feed{f}"] = f'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed {f}</title>{entries}</channel></rss>'.encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            # Simulated network / server latency per request
+            time.sleep(latency)
+            etag = f'"{self.path}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = bodies[self.path]
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    srv = _Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    return srv
+
+
+def run(feeds: int, items: int, latency: float):
+    srv = _server(feeds, items, latency)
+    urls = [f"http://127.0.0.1:{srv.server_address[1]}/feed{f}" for f in range(feeds)]
+    t0 = time.perf_counter()
+    sequential = sum(len(feedparser.parse(u).entries) for u in urls)
+    seq = time.perf_counter() - t0
+    fetcher = RSSFetcher(urls, max_workers=feeds)
+    t0 = time.perf_counter()
+    first = len(fetcher.fetch())
+    conc = time.perf_counter() - t0
+    fetcher.commit()  # as the ingestion worker does once the items are stored
+    t0 = time.perf_counter()
+    second = len(fetcher.fetch())
+    unchanged = time.perf_counter() - t0
+    srv.shutdown()
+    print(f"{feeds} feeds x {items} items, {latency * 1e3:.0f} ms latency per request")
+    print(f"{'poll':>28} {'seconds':>8} {'items':>6}")
+    print(f"{'sequential feedparser':>28} {seq:>8.2f} {sequential:>6}")
+    print(f"{'concurrent, first poll':>28} {conc:>8.2f} {first:>6}")
+    print(f"{'concurrent, unchanged (304)':>28} {unchanged:>8.2f} {second:>6}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="RSS polling: sequential feedparser vs concurrent conditional GETs")
+    parser.add_argument("--feeds", type=int, default=10)
+    parser.add_argument("--items", type=int, default=50)
+    parser.add_argument("--latency", type=float, default=0.3)
+    args = parser.parse_args()
+    run(args.feeds, args.items, args.latency)
+
+
+if __name__ == "__main__":
+    main()
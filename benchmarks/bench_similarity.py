@@ -0,0 +1,52 @@
+import argparse
+import time
+import numpy as np
+from src.utils.similarity import as_matrix, cosine, pairs_above, topk
+
+
+def _timed(fn, repeat: int = 1) -> float:
+    t0 = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - t0) / repeat
+
+
+def run(sizes, dim: int, queries: int, python_pairs: int):
+    rng = np.random.default_rng(0)
+    print(f"{'vectors':>8} {'op':>22} {'python cosine':>15} {'numpy kernel':>14} {'speedup':>9}")
+    for n in sizes:
+        matrix = as_matrix(rng.standard_normal((n, dim)))
+        rows = matrix.tolist()
+        q = as_matrix(rng.standard_normal((queries, dim)))
+        q_rows = q.tolist()
+
+        # One query against the corpus, top-10 (VectorDB fallback path)
+        py = _timed(lambda: sorted(((cosine(q_rows[0], r), i) for i, r in enumerate(rows)), reverse=True)[:10])
+        np_one = _timed(lambda: topk(q[:1], matrix, 10), repeat=5)
+        print(f"{n:>8} {'top-10, 1 query':>22} {py * 1e3:>12.2f} ms {np_one * 1e3:>11.2f} ms {py / np_one:>8.0f}x")
+        np_batch = _timed(lambda: topk(q, matrix, 10)) / queries
+        print(f"{n:>8} {f'top-10, {queries} queries/q':>22} {py * 1e3:>12.2f} ms {np_batch * 1e3:>11.3f} ms "
+              f"{py / np_batch:>8.0f}x")
+
+        # All pairs above a threshold (DeduplicationAgent path); python timed on a sample of pairs
+        total_pairs = n * (n - 1) // 2
+        idx = rng.integers(0, n, size=(min(python_pairs, total_pairs), 2))
+        py_sample = _timed(lambda: [cosine(rows[i], rows[j]) for i, j in idx.tolist()])
+        py_all = py_sample / len(idx) * total_pairs
+        np_all = _timed(lambda: pairs_above(matrix, 0.75))
+        print(f"{n:>8} {'all pairs >= 0.75':>22} {py_all:>11.1f} s* {np_all:>12.3f} s {py_all / np_all:>8.0f}x")
+    print("* extrapolated from a random sample of pairs")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pure-Python cosine vs batched NumPy similarity kernel")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 50000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--python-pairs", type=int, default=20000)
+    args = parser.parse_args()
+    run(args.sizes, args.dim, args.queries, args.python_pairs)
+
+
+if __name__ == "__main__":
+    main()
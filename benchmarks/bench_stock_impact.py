@@ -0,0 +1,97 @@
+import argparse
+import json
+import random
+import tempfile
+import time
+from pathlib import Path
+from src.agents.stock_impact import StockImpactAgent
+from .corpus import _SYLLABLES
+
+
+def _write_mapping(data_dir: Path, companies: int, sectors: int, seed: int = 0):
+    rng = random.Random(seed)
+    parents = [f"Sector{i}" for i in range(sectors)]
+    subsectors = [f"{p} / {j}" for p in parents for j in range(3)]
+    mapping = {"companies": {}, "company_to_sector": {}}
+    while len(mapping["companies"]) < companies:
+        name = "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(3, 5))).capitalize() + " Ltd"
+        mapping["companies"][name] = [name.upper().replace(" ", "")[:12]]
+        sub = rng.choice(subsectors)
+        mapping["company_to_sector"][name] = [sub, sub.split(" / ")[0]] if rng.random() < 0.5 else [sub]
+    with open(data_dir / "stock_mappings.json", "w", encoding="utf-8") as f:
+        json.dump(mapping, f)
+    with open(data_dir / "sector_hierarchy.json", "w", encoding="utf-8") as f:
+        json.dump({p: [f"{p} / {j}" for j in range(3)] for p in parents}, f)
+    return mapping, parents + subsectors
+
+
+def _scan_impacts(mapper, article_entity_map):
+    # The previous StockImpactAgent.run: scans the whole mapping per SECTOR / REGULATOR entity
+    impacts = []
+    for aid, ents in article_entity_map.items():
+        seen = set()
+        for e in ents:
+            if e["type"] == "COMPANY":
+                symbols = mapper.company_to_symbol(e["name"]) or mapper.company_to_symbol(e.get("normalized", ""))
+                kind = [(s, 1.0, "direct") for s in symbols]
+            elif e["type"] == "SECTOR":
+                sector = e.get("normalized") or e["name"]
+                kind = [(s, 0.7, "sector") for comp, secs in mapper._stock_map.get("company_to_sector", {}).items()
+                        if sector.lower() in [x.lower() for x in secs] for s in mapper.company_to_symbol(comp)]
+            elif e["type"] == "REGULATOR":
+                kind = [(s, 0.4, "regulator") for comp in mapper._stock_map.get("companies", {})
+                        for s in mapper.company_to_symbol(comp)]
+            else:
+                kind = []
+            for s, conf, t in kind:
+                if s not in seen:
+                    impacts.append({"article_id": aid, "symbol": s, "confidence": conf, "type": t})
+                    seen.add(s)
+    return impacts
+
+
+def run(companies: int, sectors: int, articles: int, regulator_rate: float):
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        mapping, sector_names = _write_mapping(Path(tmp), companies, sectors)
+        t0 = time.perf_counter()
+        agent = StockImpactAgent(data_dir=tmp)
+        build = time.perf_counter() - t0
+    names = list(mapping["companies"])
+    entity_map = {}
+    for i in range(articles):
+        ents = [{"type": "COMPANY", "name": n, "normalized": n.lower()} for n in rng.sample(names, 2)]
+        ents += [{"type": "SECTOR", "name": s, "normalized": s.lower()} for s in rng.sample(sector_names, 2)]
+        if rng.random() < regulator_rate:
+            ents.append({"type": "REGULATOR", "name": "SEBI", "normalized": "sebi"})
+        entity_map[f"A{i}"] = ents
+
+    t0 = time.perf_counter()
+    old = _scan_impacts(agent.mapper, entity_map)
+    scan = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    new = agent.run({"article_entity_map": entity_map})["stock_impacts"]
+    indexed = time.perf_counter() - t0
+    # Indexed lookups additionally follow sector_hierarchy.json children
+    assert {(i["article_id"], i["symbol"]) for i in old} <= {(i["article_id"], i["symbol"]) for i in new}
+    print(f"{companies} companies, {len(sector_names)} sectors, {articles} articles "
+          f"(index build {build * 1e3:.0f} ms incl. load)")
+    print(f"{'mapping':>8} {'seconds':>9} {'ms/article':>11} {'impacts':>9}")
+    print(f"{'scan':>8} {scan:>9.3f} {scan / articles * 1e3:>11.3f} {len(old):>9}")
+    print(f"{'indexed':>8} {indexed:>9.3f} {indexed / articles * 1e3:>11.3f} {len(new):>9}")
+    print(f"speedup {scan / indexed:.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stock impact mapping: full mapping scans vs inverted indexes")
+    parser.add_argument("--companies", type=int, default=5000)
+    parser.add_argument("--sectors", type=int, default=40)
+    parser.add_argument("--articles", type=int, default=1000)
+    parser.add_argument("--regulator-rate", type=float, default=0.0,
+                        help="share of articles mentioning an (unscoped) regulator")
+    args = parser.parse_args()
+    run(args.companies, args.sectors, args.articles, args.regulator_rate)
+
+
+if __name__ == "__main__":
+    main()
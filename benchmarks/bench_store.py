@@ -0,0 +1,85 @@
+import argparse
+import os
+import tempfile
+import time
+from src.agents.stock_impact import StockImpactAgent
+from src.agents.storage_indexing import StorageIndexingAgent
+from src.services.database import Database
+from src.services.ner_service import NERService
+from .corpus import generate_corpus
+
+
+class _NoVectors:
+    # Only the SQLite side of the store stage is measured here
+    def add(self, ids, docs, metas):
+        pass
+
+
+def _row_by_row_store(db: Database, unique, article_entity_map, impacts):
+    # The previous StorageIndexingAgent.run + Database methods: one commit per article, row-at-a-time inserts
+    cur = db.conn.cursor()
+    for a in unique:
+        cur.execute(
+            """INSERT OR REPLACE INTO articles (id, title, content, source, published_at, url, category, metadata)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (a["id"], a["title"], a["content"], a["source"], a["published_at"], a["url"], a.get("category"),
+             str(a.get("metadata")))
+        )
+        db.conn.commit()
+        for e in article_entity_map.get(a["id"], []):
+            cur.execute("INSERT OR REPLACE INTO entities (id, type, name, normalized) VALUES (?, ?, ?, ?)",
+                        (e["id"], e["type"], e["name"], e.get("normalized")))
+            cur.execute("INSERT INTO article_entities (article_id, entity_id) VALUES (?, ?)", (a["id"], e["id"]))
+        db.conn.commit()
+    for i in impacts:
+        cur.execute("INSERT INTO stock_impacts (article_id, symbol, confidence, type) VALUES (?, ?, ?, ?)",
+                    (i["article_id"], i["symbol"], i["confidence"], i["type"]))
+    db.conn.commit()
+
+
+def _counts(db: Database):
+    return tuple(db.conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                 for t in ("articles", "entities", "article_entities", "stock_impacts"))
+
+
+def run(articles: int):
+    corpus = generate_corpus(articles)
+    ner = NERService()
+    entity_map = {a["id"]: ents for a, ents in
+                  zip(corpus, ner.extract_many([a["title"] + "\n" + a["content"] for a in corpus]))}
+    state = StockImpactAgent().run({"unique_articles": corpus, "article_entity_map": entity_map})
+    impacts = state["stock_impacts"]
+    links = sum(len(v) for v in entity_map.values())
+    print(f"{articles} articles, {links} entity links, {len(impacts)} stock impacts")
+    print(f"{'store':>24} {'seconds':>9} {'ms/article':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = Database(os.path.join(tmp, "row.db"))
+        # Connection settings before WAL: rollback journal, synchronous=FULL
+        db.conn.execute("PRAGMA journal_mode=DELETE")
+        db.conn.execute("PRAGMA synchronous=FULL")
+        t0 = time.perf_counter()
+        _row_by_row_store(db, corpus, entity_map, impacts)
+        row = time.perf_counter() - t0
+        print(f"{'row-by-row, per-article':>24} {row:>9.3f} {row / articles * 1e3:>11.3f}")
+
+        bulk_db = Database(os.path.join(tmp, "bulk.db"))
+        agent = StorageIndexingAgent(bulk_db, _NoVectors(), None)
+        t0 = time.perf_counter()
+        agent.run({"unique_articles": corpus, "article_entity_map": entity_map, "stock_impacts": impacts})
+        bulk = time.perf_counter() - t0
+        print(f"{'bulk, one transaction':>24} {bulk:>9.3f} {bulk / articles * 1e3:>11.3f}")
+        assert _counts(db) == _counts(bulk_db)
+        db.conn.close()
+        bulk_db.conn.close()
+    print(f"speedup {row / bulk:.0f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Store stage: per-article commits vs bulk executemany in one transaction")
+    parser.add_argument("--articles", type=int, default=10000)
+    args = parser.parse_args()
+    run(args.articles)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from src.graph.workflow import build_news_processing_graph, build_streaming_news_pipeline
+from src.services.database import Database
+from src.services.dedup_index import DedupIndex
+from src.services.embedding_service import EmbeddingService
+from src.services.ner_service import NERService
+from src.services.vector_db import VectorDB
+from .corpus import generate_corpus
+
+
+def _services(tmp: str):
+    embedder = EmbeddingService("sentence-transformers/all-MiniLM-L6-v2")
+    return (Database(os.path.join(tmp, "news.db")), VectorDB(os.path.join(tmp, "vector_store"), embedder), embedder,
+            NERService(), DedupIndex(os.path.join(tmp, "dedup_index.db")))
+
+
+def _read_jsonl(path: str):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+
+def _measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    first = fn()
+    dt = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return dt, (first - t0) if first else dt, peak
+
+
+def run(articles: int, batch_size: int, max_pending: int, dup_rate: float):
+    with tempfile.TemporaryDirectory() as tmp:
+        feed = os.path.join(tmp, "feed.jsonl")
+        with open(feed, "w", encoding="utf-8") as f:
+            for a in generate_corpus(articles, dup_rate=dup_rate):
+                f.write(json.dumps(a) + "\n")
+        print(f"{articles} articles, dup_rate {dup_rate}, batch_size {batch_size}, max_pending {max_pending}")
+        print(f"{'mode':>10} {'seconds':>9} {'first stored s':>15} {'peak MB':>9} {'unique':>8}")
+
+        batch_dir = os.path.join(tmp, "batch")
+        graph = build_news_processing_graph(*_services(batch_dir))
+        result = {}
+
+        def _batch():
+            result.update(graph.invoke({"mode": "single_article", "raw_articles": list(_read_jsonl(feed))}))
+
+        dt, first, peak = _measure(_batch)
+        print(f"{'batch':>10} {dt:>9.2f} {first:>15.2f} {peak / 2**20:>9.1f} {len(result['unique_articles']):>8}")
+
+        stream_dir = os.path.join(tmp, "stream")
+        pipeline = build_streaming_news_pipeline(*_services(stream_dir), batch_size=batch_size, max_pending=max_pending)
+        first_at, summary = [], {}
+
+        def _stream():
+            summary.update(pipeline.run({"mode": "single_article", "raw_articles": _read_jsonl(feed)},
+                                        on_batch=lambda s: first_at or first_at.append(time.perf_counter())))
+            return first_at[0] if first_at else None
+
+        dt, first, peak = _measure(_stream)
+        print(f"{'streaming':>10} {dt:>9.2f} {first:>15.2f} {peak / 2**20:>9.1f} {summary['unique']:>8}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Whole-list news graph vs streaming micro-batch pipeline")
+    parser.add_argument("--articles", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    parser.add_argument("--max-pending", type=int, default=2)
+    parser.add_argument("--dup-rate", type=float, default=0.2)
+    args = parser.parse_args()
+    run(args.articles, args.batch_size, args.max_pending, args.dup_rate)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import itertools
+import json
+import random
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+
+_SYLLABLES = ["ka", "ri", "to", "man", "dra", "vel", "sun", "pra", "lo", "shi", "nek", "tor", "ba", "gan",
+              "mi", "ur", "sa", "dev", "pol", "che"]
+
+
+def _load(data_dir: str):
+    base = Path(data_dir)
+    with open(base / "mock_news.json", "r", encoding="utf-8") as f:
+        templates = json.load(f)
+    with open(base / "stock_mappings.json", "r", encoding="utf-8") as f:
+        companies = list(json.load(f).get("companies", {}).keys())
+    return templates, companies
+
+
+def _story_term(rng: random.Random) -> str:
+    # Names, places, products and figures that are specific to one story
+    if rng.random() < 0.25:
+        return f"{rng.randint(1, 999)}.{rng.randint(0, 99)}"
+    return "".join(rng.choice(_SYLLABLES) for _ in range(rng.randint(3, 5)))
+
+
+def generate_corpus(n: int, dup_rate: float = 0.2, seed: int = 0, data_dir: str = "data",
+                    story_terms: int = 15, vocab_size: int = 50000) -> List[Dict]:
+    return list(iter_corpus(n, dup_rate, seed, data_dir, story_terms, vocab_size))
+
+
+def write_jsonl(path: str, n: int, **kwargs) -> int:
+    # One article per line, generated lazily: 1M articles never sit in memory at once
+    with open(path, "w", encoding="utf-8") as f:
+        for a in iter_corpus(n, **kwargs):
+            f.write(json.dumps(a) + "\n")
+    return n
+
+
+def iter_corpus(n: int, dup_rate: float = 0.2, seed: int = 0, data_dir: str = "data", story_terms: int = 15,
+                vocab_size: int = 50000, dup_window: Optional[int] = None) -> Iterator[Dict]:
+    # Synthetic articles: general wording follows a Zipf distribution seeded with the mock news
+    # vocabulary, mixed with terms specific to each story. A `dup_rate` share of the output are light
+    # rewrites of an earlier article (same story, different outlet). dup_window: rewrites only pick
+    # from the last `dup_window` stories, which bounds memory for very large corpora.
+    rng = random.Random(seed)
+    templates, companies = _load(data_dir)
+    counts = Counter(w for t in templates for w in re.findall(r"[a-z]+", (t["title"] + " " + t["content"]).lower()))
+    # Mock news words take the head of a Zipf distribution, synthetic words its long tail
+    general = [w for w, _ in counts.most_common()]
+    general += sorted({_story_term(rng) for _ in range(vocab_size)} - set(general))
+    cum = list(itertools.accumulate(1.0 / (rank + 1) for rank in range(len(general))))
+    originals: List[Dict] = []
+    stories = 0
+    for i in range(n):
+        tpl = rng.choice(templates)
+        is_dup = bool(originals) and rng.random() < dup_rate
+        if is_dup:
+            src = rng.choice(originals)
+            title_words = src["title"].split()
+            title_words[rng.randrange(len(title_words))] = rng.choices(general, cum_weights=cum)[0]
+            words = src["content"].split()
+            for w in rng.choices(general, cum_weights=cum, k=max(1, len(words) // 10)):
+                words[rng.randrange(len(words))] = w
+            title, content, category = " ".join(title_words), " ".join(words), src["category"]
+        else:
+            company = rng.choice(companies)
+            terms = [_story_term(rng) for _ in range(story_terms)]
+            title = " ".join([company] + rng.sample(terms, 2) + rng.choices(general, cum_weights=cum, k=rng.randint(3, 5)))
+            words = rng.choices(terms, k=rng.randint(20, 30)) + rng.choices(general, cum_weights=cum, k=rng.randint(25, 40))
+            rng.shuffle(words)
+            content = f"{company} " + " ".join(words)
+            category = tpl.get("category")
+        art = {
+            "id": f"S{i}",
+            "title": title,
+            "content": content,
+            "source": tpl["source"],
+            "published_at": f"2024-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:00:00Z",
+            "url": f"https://example.com/synthetic/{i}",
+            "category": category,
+        }
+        yield art
+        if not is_dup:
+            if dup_window is None or len(originals) < dup_window:
+                originals.append(art)
+            else:
+                originals[stories % dup_window] = art
+            stories += 1
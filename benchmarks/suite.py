@@ -0,0 +1,253 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
+import time
+import numpy as np
+from src.graph.workflow import build_news_processing_graph, build_query_graph, build_streaming_news_pipeline
+from src.services.database import Database
+from src.services.dedup_index import DedupIndex
+from src.services.embedding_service import EmbeddingService
+from src.services.llm_service import LLMService
+from src.services.metrics import metrics
+from src.services.ner_service import NERService
+from src.services.vector_db import VectorDB
+from .corpus import iter_corpus
+
+# articles: corpus size; chunk: articles per news-graph run (each run dedups against the ones before,
+# like successive feed polls); streaming profiles go through StreamingNewsPipeline instead
+PROFILES = {
+    "quick": {"articles": 2000, "chunk": 500, "queries": 200},
+    "standard": {"articles": 20000, "chunk": 2000, "queries": 1000},
+    "large": {"articles": 200000, "chunk": 10000, "queries": 2000},
+    "xl": {"articles": 1000000, "chunk": 10000, "queries": 2000, "streaming": True, "batch_size": 1024},
+}
+STAGES = ("ingest", "dedup", "entity", "impact", "store")
+# (path in the results, True if higher is better) checked by --compare
+KEY_METRICS = [
+    (("ingest", "articles_per_sec"), True),
+    (("query", "p50_ms"), False),
+    (("query", "p99_ms"), False),
+    (("memory", "peak_rss_mb"), False),
+    (("storage", "total_bytes"), False),
+] + [(("ingest", "stages", s, "items_per_sec"), True) for s in STAGES]
+
+_QUERIES = ["{company} news", "{company} quarterly results", "{sector} sector update", "{company} dividend",
+            "RBI policy changes", "interest rate impact", "{sector} stocks outlook", "SEBI action on {company}"]
+
+
+def _services(tmp: str):
+    embedder = EmbeddingService("sentence-transformers/all-MiniLM-L6-v2", os.path.join(tmp, "embedding_cache.db"))
+    db = Database(os.path.join(tmp, "news.db"))
+    vectordb = VectorDB(os.path.join(tmp, "vector_store"), embedder, db=db)
+    return db, vectordb, embedder, NERService(), DedupIndex(os.path.join(tmp, "dedup_index.db"))
+
+
+def _queries(n: int, seed: int, data_dir: str):
+    rng = random.Random(seed)
+    with open(os.path.join(data_dir, "stock_mappings.json"), "r", encoding="utf-8") as f:
+        mappings = json.load(f)
+    companies = list(mappings["companies"])
+    sectors = sorted({s for names in mappings.get("company_to_sector", {}).values() for s in names}) or ["Banking"]
+    # Distinct strings (the query graph has no cache, but the embedding cache would hit repeats)
+    return [rng.choice(_QUERIES).format(company=rng.choice(companies), sector=rng.choice(sectors)) + f" {i}"
+            for i in range(n)]
+
+
+def _size(path: str) -> int:
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (2**20 if sys.platform == "darwin" else 2**10)
+
+
+def _ms(values):
+    return round(float(values) * 1000, 3)
+
+
+def _ingest(config: dict, services, corpus) -> dict:
+    db, vectordb, embedder, ner, dedup_index = services
+    start = time.perf_counter()
+    if config.get("streaming"):
+        graph_name = "streaming"
+        pipeline = build_streaming_news_pipeline(*services, batch_size=config.get("batch_size", 256))
+        summary = pipeline.run({"mode": "single_article", "raw_articles": corpus})
+        ingested, unique = summary["ingested"], summary["unique"]
+    else:
+        graph_name = "news"
+        graph = build_news_processing_graph(*services)
+        ingested = unique = 0
+        while True:
+            chunk = list(itertools.islice(corpus, config["chunk"]))
+            if not chunk:
+                break
+            result = graph.invoke({"mode": "single_article", "skip_known": True, "raw_articles": chunk})
+            ingested += len(chunk)
+            unique += len(result["unique_articles"])
+    seconds = time.perf_counter() - start
+    stages = {}
+    for stage in STAGES:
+        timing = metrics.summary("pipeline_stage_seconds", graph=graph_name, stage=stage)
+        if timing is None:
+            continue
+        items_in = metrics.counter("pipeline_items_in_total", graph=graph_name, stage=stage)
+        stages[stage] = {
+            "runs": timing["count"],
+            "seconds": round(timing["sum"], 4),
+            "items_in": int(items_in),
+            "items_out": int(metrics.counter("pipeline_items_out_total", graph=graph_name, stage=stage)),
+            "items_per_sec": round(items_in / timing["sum"], 1) if timing["sum"] else None,
+            "p50_ms": _ms(timing["p50"]), "p90_ms": _ms(timing["p90"]), "p99_ms": _ms(timing["p99"]),
+            "sql_statements": int(metrics.counter("pipeline_sql_statements_total", graph=graph_name, stage=stage)),
+            "sql_seconds": round(metrics.counter("pipeline_sql_seconds_total", graph=graph_name, stage=stage), 4),
+            "embed_encoded": int(metrics.counter("pipeline_embed_encoded_total", graph=graph_name, stage=stage)),
+            "embed_cache_hits": int(metrics.counter("pipeline_embed_cache_hits_total", graph=graph_name, stage=stage)),
+            "dedup_comparisons": int(metrics.counter("pipeline_dedup_comparisons_total", graph=graph_name, stage=stage)),
+        }
+    return {"mode": graph_name, "articles": ingested, "unique": unique, "seconds": round(seconds, 3),
+            "articles_per_sec": round(ingested / seconds, 1), "stages": stages}
+
+
+def _query(services, queries) -> dict:
+    db, vectordb, embedder, ner, _ = services
+    graph = build_query_graph(db, vectordb, embedder, ner, LLMService())
+    latencies = []
+    start = time.perf_counter()
+    for q in queries:
+        t0 = time.perf_counter()
+        graph.invoke({"query": q, "top_k": 10})
+        latencies.append(time.perf_counter() - t0)
+    seconds = time.perf_counter() - start
+    lat = np.asarray(latencies)
+    return {"queries": len(queries), "seconds": round(seconds, 3), "qps": round(len(queries) / seconds, 1),
+            "mean_ms": _ms(lat.mean()), "p50_ms": _ms(np.percentile(lat, 50)), "p90_ms": _ms(np.percentile(lat, 90)),
+            "p99_ms": _ms(np.percentile(lat, 99)), "max_ms": _ms(lat.max()),
+            "sql_statements_per_query": round(metrics.counter("pipeline_sql_statements_total", graph="query",
+                                                              stage="query") / len(queries), 2)}
+
+
+def run(profile: str, config: dict, seed: int, dup_rate: float, data_dir: str) -> dict:
+    metrics.enabled = True
+    metrics.reset()
+    results = {
+        "profile": profile,
+        "config": dict(config, seed=seed, dup_rate=dup_rate),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(),
+                        "cpus": os.cpu_count(), "numpy": np.__version__},
+    }
+    with tempfile.TemporaryDirectory(prefix="bench_suite_") as tmp:
+        services = _services(tmp)
+        db, vectordb, embedder, ner, dedup_index = services
+        results["environment"].update(
+            embedder="model" if embedder._model is not None else "fallback",
+            ner="spacy" if ner.nlp is not None else "keywords",
+            vector_store="chromadb" if vectordb._collection is not None else "numpy")
+        # Lazy: the corpus is generated while it is ingested; rewrites only reach back 10k stories
+        corpus = iter_corpus(config["articles"], dup_rate=dup_rate, seed=seed, data_dir=data_dir, dup_window=10000)
+        results["ingest"] = _ingest(config, services, corpus)
+        results["query"] = _query(services, _queries(config["queries"], seed, data_dir))
+        results["memory"] = {"peak_rss_mb": round(_peak_rss_mb(), 1)}
+        db.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        dedup_index.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        storage = {
+            "sqlite_bytes": sum(_size(os.path.join(tmp, f)) for f in os.listdir(tmp) if f.startswith("news.db")),
+            "dedup_index_bytes": sum(_size(os.path.join(tmp, f)) for f in os.listdir(tmp) if f.startswith("dedup_index.db")),
+            "embedding_cache_bytes": sum(_size(os.path.join(tmp, f)) for f in os.listdir(tmp)
+                                         if f.startswith("embedding_cache.db")),
+            "vector_store_bytes": _size(os.path.join(tmp, "vector_store")),
+        }
+        storage["total_bytes"] = sum(storage.values())
+        results["storage"] = storage
+    return results
+
+
+def _get(results: dict, path):
+    for key in path:
+        if not isinstance(results, dict) or key not in results:
+            return None
+        results = results[key]
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> bool:
+    # True when no key metric is worse than the baseline by more than `tolerance` (a fraction)
+    ok = True
+    if baseline.get("config") != results.get("config"):
+        print(f"warning: baseline config {baseline.get('config')} differs from {results.get('config')}")
+    print(f"{'metric':<40} {'baseline':>12} {'current':>12} {'change':>8}")
+    for path, higher_is_better in KEY_METRICS:
+        old, new = _get(baseline, path), _get(results, path)
+        if not old or new is None:
+            continue
+        change = new / old - 1
+        worse = -change if higher_is_better else change
+        flag = "  REGRESSION" if worse > tolerance else ""
+        ok = ok and not flag
+        print(f"{'.'.join(path):<40} {old:>12g} {new:>12g} {change:>+7.1%}{flag}")
+    return ok
+
+
+def _print(results: dict):
+    ingest, query = results["ingest"], results["query"]
+    print(f"{results['profile']}: {ingest['articles']} articles ({ingest['unique']} unique) via {ingest['mode']} "
+          f"in {ingest['seconds']:.2f}s = {ingest['articles_per_sec']:.0f} articles/s")
+    print(f"{'stage':>8} {'items/s':>10} {'p50 ms':>9} {'p99 ms':>9} {'SQL stmts':>10} {'SQL s':>7}")
+    for stage, s in ingest["stages"].items():
+        print(f"{stage:>8} {s['items_per_sec'] or 0:>10.0f} {s['p50_ms']:>9.1f} {s['p99_ms']:>9.1f} "
+              f"{s['sql_statements']:>10} {s['sql_seconds']:>7.2f}")
+    print(f"queries: {query['queries']} at {query['qps']:.0f}/s, p50 {query['p50_ms']:.2f} ms, "
+          f"p90 {query['p90_ms']:.2f} ms, p99 {query['p99_ms']:.2f} ms")
+    storage = results["storage"]
+    print(f"peak RSS {results['memory']['peak_rss_mb']:.0f} MB; SQLite {storage['sqlite_bytes'] / 2**20:.1f} MB, "
+          f"dedup index {storage['dedup_index_bytes'] / 2**20:.1f} MB, "
+          f"vector store {storage['vector_store_bytes'] / 2**20:.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-end benchmark: synthetic corpus through the news and query graphs")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="quick")
+    parser.add_argument("--articles", type=int, help="override the profile's corpus size")
+    parser.add_argument("--queries", type=int, help="override the profile's query count")
+    parser.add_argument("--streaming", action="store_true", help="ingest through StreamingNewsPipeline")
+    parser.add_argument("--dup-rate", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default="data")
+    parser.add_argument("--out", help="results JSON (default: benchmarks/results/<profile>.json)")
+    parser.add_argument("--compare", help="baseline results JSON; exit 1 on a regression beyond --tolerance")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    config = dict(PROFILES[args.profile])
+    if args.articles:
+        config["articles"] = args.articles
+    if args.queries:
+        config["queries"] = args.queries
+    if args.streaming:
+        config["streaming"] = True
+    results = run(args.profile, config, args.seed, args.dup_rate, args.data_dir)
+    _print(results)
+
+    out = args.out or os.path.join("benchmarks", "results", f"{args.profile}.json")
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"results written to {out}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
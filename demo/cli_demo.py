@@ -1,14 +1,35 @@
 import argparse
+import json
 from pprint import pprint
 from src.main import create_app
 
 
 def cmd_ingest(app, mode: str):
+    if app.state.news_pipeline is not None:
+        summary = app.state.news_pipeline.run({"mode": mode})
+        print(f"Ingested: {summary['ingested']}, Unique: {summary['unique']} ({summary['batches']} batches)")
+        return
     graph = app.state.news_graph
     result = graph.invoke({"mode": mode})
     print(f"Ingested: {len(result.get('parsed_articles', []))}, Unique: {len(result.get('unique_articles', []))}")
 
 
+def cmd_ingest_jsonl(app, path: str, batch_size: int):
+    # Streams the file: only a few micro-batches of articles are held in memory at a time
+    def _read():
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    from src.graph.workflow import build_streaming_news_pipeline
+    s = app.state
+    pipeline = build_streaming_news_pipeline(s.db, s.vectordb, s.embedder, s.ner, s.dedup_index, batch_size)
+    summary = pipeline.run({"mode": "single_article", "raw_articles": _read()},
+                           on_batch=lambda p: print(f"  batch {p['batches']}: {p['ingested']} read, {p['unique']} stored"))
+    print(f"Ingested: {summary['ingested']}, Unique: {summary['unique']}")
+
+
 def cmd_query(app, query: str, top_k: int):
     graph = app.state.query_graph
     result = graph.invoke({"query": query, "top_k": top_k})
@@ -31,12 +52,22 @@ def cmd_entities(app):
     pprint(app.state.db.list_entities())
 
 
+def cmd_compact(app):
+    removed = app.state.db.compact()
+    # Articles gone from news.db must not stay "known" to the dedup index
+    removed["dedup_index"] = app.state.dedup_index.prune(app.state.db.article_ids())
+    pprint(removed)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Financial News Intelligence CLI Demo")
     sub = parser.add_subparsers(dest="cmd")
 
     p_ingest = sub.add_parser("ingest-mock")
     p_ingest = sub.add_parser("ingest-rss")
+    p_jsonl = sub.add_parser("ingest-jsonl")
+    p_jsonl.add_argument("path")
+    p_jsonl.add_argument("--batch_size", type=int, default=256)
 
     p_query = sub.add_parser("query")
     p_query.add_argument("text")
@@ -48,6 +79,7 @@ def main():
     p_article.add_argument("id")
 
     sub.add_parser("entities")
+    sub.add_parser("compact")
 
     args = parser.parse_args()
     app = create_app()
@@ -56,6 +88,8 @@ def main():
         cmd_ingest(app, "ingest_mock")
     elif args.cmd == "ingest-rss":
         cmd_ingest(app, "ingest_rss")
+    elif args.cmd == "ingest-jsonl":
+        cmd_ingest_jsonl(app, args.path, args.batch_size)
     elif args.cmd == "query":
         cmd_query(app, args.text, args.top_k)
     elif args.cmd == "stats":
@@ -64,6 +98,8 @@ def main():
         cmd_article(app, args.id)
     elif args.cmd == "entities":
         cmd_entities(app)
+    elif args.cmd == "compact":
+        cmd_compact(app)
     else:
         parser.print_help()
 
@@ -1,31 +1,143 @@
 from .base_agent import BaseAgent
-from typing import List
+from typing import Dict, List
 from ..services.embedding_service import EmbeddingService
-from ..utils.similarity import cosine
+from ..utils.similarity import as_matrix, rowwise_similarity
+from ..services.dedup_index import DedupIndex, content_fingerprint
+from ..services.metrics import metrics
+from ..utils.blocking import jaccard_candidate_pairs, embedding_candidate_pairs, merge_pairs
+from ..utils.minhash import MinHasher, jaccard
+from ..utils.text_normalizer import normalize_text, normalize_tokens
 import re
 
+_BPS_RE = re.compile(r"(\d+)[\s]*bps")
+_NUMBER_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(percent|%)?")
+
+
+def dedup_text(article: dict):
+    # Normalized title + body and its tokens: what DeduplicationAgent compares and embeds
+    return normalize_tokens(article["title"] + "\n" + article["content"])
+
 
 class DeduplicationAgent(BaseAgent):
-    def __init__(self, embedder: EmbeddingService, **kwargs):
+    def __init__(self, embedder: EmbeddingService, index: DedupIndex | None = None, blocking: bool = True,
+                 blocking_min_batch: int = 64, **kwargs):
         super().__init__(**kwargs)
         self.embedder = embedder
+        # Cross-batch index of stored stories; entries are written by StorageIndexingAgent after a successful store
+        self.index = index
+        self.minhasher = MinHasher(num_perm=128)
         # Slightly lower threshold for fallback bag-of-words embeddings
         self.threshold = 0.85 if getattr(self.embedder, "_model", None) is not None else 0.75
         self.jaccard_threshold = 0.6
+        self.full_jaccard_threshold = 0.58
+        self.title_jaccard_threshold = 0.7
+        # Candidate generation: only pairs sharing a rare prefix token / embedding cell are verified.
+        # Below `blocking_min_batch` articles the exhaustive comparison is cheaper.
+        self.blocking = blocking
+        self.blocking_min_batch = blocking_min_batch
 
-    def run(self, state: dict) -> dict:
+    def run(self, state: dict, run_index: DedupIndex | None = None) -> dict:
+        # run_index: stories kept by earlier micro-batches of the same streaming run (see graph/streaming.py)
         articles = state.get("parsed_articles", [])
+        # Repeated RSS polls: drop already-stored stories before any normalization or embedding work
+        skip_known = self.index is not None and state.get("skip_known", state.get("mode") == "ingest_rss")
+        indexed = self.index is not None or run_index is not None
+        fingerprints = [content_fingerprint(a["title"], a["content"]) for a in articles] if indexed else []
+        if skip_known and articles:
+            stored = self.index.known([a["id"] for a in articles], fingerprints)
+            state["known_articles"] = [a["id"] for a, m in zip(articles, stored) if m]
+            articles = [a for a, m in zip(articles, stored) if not m]
+            fingerprints = [fp for fp, m in zip(fingerprints, stored) if not m]
         if not articles:
             state["unique_articles"] = []
             state["duplicate_groups"] = []
             return state
-        titles_norm = [self._normalize_text(a["title"]) for a in articles]
+        titles_norm, token_sets_title = [], []
+        for a in articles:
+            t, toks = normalize_tokens(a["title"])
+            titles_norm.append(t)
+            token_sets_title.append(set(toks))
         event_keys = [self._event_key(t) for t in titles_norm]
-        texts = [self._normalize_text(a["title"] + "\n" + a["content"]) for a in articles]
-        token_sets_full = [set(t.split()) for t in texts]
-        token_sets_title = [set(t.split()) for t in titles_norm]
-        embs = self.embedder.embed(texts)
+        texts, token_sets_full = [], []
+        for a in articles:
+            t, toks = dedup_text(a)
+            texts.append(t)
+            token_sets_full.append(set(toks))
+        embs = self.embedder.embed_array(texts)
         n = len(articles)
+        # Every article is checked against the run index first: one kept by an earlier micro-batch is an
+        # earlier leader than any in this batch, as in the whole-list grouping
+        prior: List[str | None] = [None] * n
+        if run_index is not None:
+            full_sigs, title_sigs, unit = self._signatures(token_sets_full, token_sets_title, embs, range(n))
+            prior = run_index.find_near_duplicates(
+                event_keys, full_sigs, title_sigs, unit, self.threshold, self.full_jaccard_threshold,
+                self.title_jaccard_threshold, full_tokens=token_sets_full, title_tokens=token_sets_title
+            )
+        rest = [i for i in range(n) if prior[i] is None]
+        sub = ([event_keys[i] for i in rest], [token_sets_full[i] for i in rest],
+               [token_sets_title[i] for i in rest], embs[rest])
+        if self.blocking and len(rest) >= self.blocking_min_batch:
+            groups = self._group_blocked(*sub)
+        else:
+            groups = self._group_exhaustive(*sub)
+        groups = [[rest[k] for k in g] for g in groups]
+        stored_matches: List[str | None] = [None] * len(groups)
+        if indexed:
+            reps = [g[0] for g in groups]
+            if run_index is not None:
+                full_sigs, title_sigs, unit = full_sigs[reps], title_sigs[reps], unit[reps]
+            else:
+                full_sigs, title_sigs, unit = self._signatures(token_sets_full, token_sets_title, embs, reps)
+            rep_keys = [event_keys[i] for i in reps]
+            if skip_known:
+                stored_matches = self.index.find_near_duplicates(
+                    rep_keys, full_sigs, title_sigs, unit,
+                    self.threshold, self.full_jaccard_threshold, self.title_jaccard_threshold
+                )
+            keep = [gi for gi, m in enumerate(stored_matches) if m is None]
+            # Articles matched in the run index join their leader's group
+            groups += [[i] for i in range(n) if prior[i] is not None]
+            stored_matches += [m for m in prior if m is not None]
+            seen = []
+            for g, match in zip(groups, stored_matches):
+                target = match or articles[g[0]]["id"]
+                for idx in g:
+                    seen.append((f"id:{articles[idx]['id']}", target))
+                    seen.append((f"fp:{fingerprints[idx]}", target))
+            state["dedup_index_entries"] = {
+                "ids": [articles[reps[gi]]["id"] for gi in keep],
+                "event_keys": [rep_keys[gi] for gi in keep],
+                "full_sigs": full_sigs[keep],
+                "title_sigs": title_sigs[keep],
+                "embeddings": unit[keep],
+                "full_tokens": [token_sets_full[reps[gi]] for gi in keep],
+                "title_tokens": [token_sets_title[reps[gi]] for gi in keep],
+                "seen": seen,
+            }
+        unique = [articles[g[0]] for g, m in zip(groups, stored_matches) if m is None]
+        dup_groups_ids = [[articles[idx]["id"] for idx in g] for g, m in zip(groups, stored_matches)
+                          if m is None and len(g) > 1]
+        # Duplicates of stories stored by an earlier batch lead with the stored article id
+        matched: Dict[str, List[str]] = {}
+        for g, m in zip(groups, stored_matches):
+            if m:
+                matched.setdefault(m, []).extend(articles[idx]["id"] for idx in g)
+        dup_groups_ids += [[m] + ids for m, ids in matched.items()]
+        state["unique_articles"] = unique
+        # Reused by the store: the vector index holds these same vectors, nothing is embedded twice
+        state["unique_embeddings"] = embs[[g[0] for g, m in zip(groups, stored_matches) if m is None]]
+        state["duplicate_groups"] = dup_groups_ids
+        return state
+
+    def _signatures(self, token_sets_full, token_sets_title, embs, rows):
+        rows = list(rows)
+        return (self.minhasher.signatures([token_sets_full[i] for i in rows]),
+                self.minhasher.signatures([token_sets_title[i] for i in rows]), as_matrix([embs[i] for i in rows]))
+
+    def _group_exhaustive(self, event_keys, token_sets_full, token_sets_title, embs) -> List[List[int]]:
+        n = len(event_keys)
+        unit = as_matrix(embs)
         used = [False]*n
         groups: List[List[int]] = []
         for i in range(n):
@@ -33,6 +145,8 @@ class DeduplicationAgent(BaseAgent):
                 continue
             group = [i]
             used[i] = True
+            sims = unit[i] @ unit.T
+            metrics.count("dedup_comparisons", n - i - 1)
             for j in range(i+1, n):
                 if used[j]:
                     continue
@@ -41,69 +155,82 @@ class DeduplicationAgent(BaseAgent):
                     used[j] = True
                     group.append(j)
                     continue
-                cos = cosine(embs[i], embs[j])
+                cos = sims[j]
                 jac_full = self._jaccard(token_sets_full[i], token_sets_full[j])
                 jac_title = self._jaccard(token_sets_title[i], token_sets_title[j])
-                if (cos >= self.threshold) or (jac_full >= 0.58) or (jac_title >= 0.7):
+                if (cos >= self.threshold) or (jac_full >= self.full_jaccard_threshold) \
+                        or (jac_title >= self.title_jaccard_threshold):
                     used[j] = True
                     group.append(j)
             groups.append(group)
-        unique = [articles[g[0]] for g in groups]
-        dup_groups_ids = [[articles[idx]["id"] for idx in g] for g in groups if len(g) > 1]
-        state["unique_articles"] = unique
-        state["duplicate_groups"] = dup_groups_ids
-        return state
+        return groups
+
+    def _group_blocked(self, event_keys, token_sets_full, token_sets_title, embs) -> List[List[int]]:
+        # Same greedy grouping as `_group_exhaustive`, but j only ranges over verified candidates of i
+        n = len(event_keys)
+        matches = self._matching_pairs(token_sets_full, token_sets_title, embs)
+        neighbours: Dict[int, List[int]] = {}
+        for i, j in matches:
+            neighbours.setdefault(i, []).append(j)
+        by_key: Dict[str, List[int]] = {}
+        for idx, k in enumerate(event_keys):
+            if k:
+                by_key.setdefault(k, []).append(idx)
+        used = [False]*n
+        groups: List[List[int]] = []
+        for i in range(n):
+            if used[i]:
+                continue
+            used[i] = True
+            members = set(neighbours.get(i, []))
+            if event_keys[i]:
+                members.update(by_key[event_keys[i]])
+            group = [i]
+            for j in sorted(members):
+                if j > i and not used[j]:
+                    used[j] = True
+                    group.append(j)
+            groups.append(group)
+        return groups
+
+    def _matching_pairs(self, token_sets_full, token_sets_title, embs) -> List[tuple]:
+        n = len(token_sets_full)
+        unit = as_matrix(embs)
+        candidates = merge_pairs([
+            jaccard_candidate_pairs(token_sets_full, self.full_jaccard_threshold),
+            jaccard_candidate_pairs(token_sets_title, self.title_jaccard_threshold),
+            # Small slack so float rounding never drops a pair sitting exactly on the threshold
+            embedding_candidate_pairs(unit, self.threshold - 1e-4),
+        ], n)
+        if not len(candidates):
+            return []
+        metrics.count("dedup_comparisons", len(candidates))
+        cos = rowwise_similarity(unit, candidates)
+        out = []
+        for (i, j), c in zip(candidates.tolist(), cos.tolist()):
+            if c >= self.threshold \
+                    or self._jaccard(token_sets_full[i], token_sets_full[j]) >= self.full_jaccard_threshold \
+                    or self._jaccard(token_sets_title[i], token_sets_title[j]) >= self.title_jaccard_threshold:
+                out.append((i, j))
+        return out
 
     def _normalize_text(self, text: str) -> str:
-        t = text.lower()
-        # Normalize regulators
-        t = re.sub(r"\b(reserve bank of india|reserve bank|central bank)\b", "rbi", t)
-        # Normalize rate terms
-        t = re.sub(r"\b(repo rate|policy rate|interest rates|interest rate)\b", "policy rate", t)
-        # Normalize action verbs
-        t = re.sub(r"\b(hike|hikes|hiked|raise|raises|raised|increase|increases|increased)\b", "raise", t)
-        # Business synonyms
-        t = re.sub(r"\b(share repurchase|repurchase)\b", "buyback", t)
-        t = re.sub(r"\b(bags|bagged|wins|won)\b", "win", t)
-        t = re.sub(r"\b(okays|approves|approved)\b", "approve", t)
-        t = re.sub(r"\b(mega deal|mega)\b", "deal", t)
-        # basis points
-        t = re.sub(r"\bbasis points\b", "bps", t)
-        t = re.sub(r"\b(\d+)\s*bps\b", r"\1 bps", t)
-        t = re.sub(r"\b(\d+)bps\b", r"\1 bps", t)
-        # Convert percentages to bps ONLY for interest-rate context; else normalize to ' percent'
-        if re.search(r"\b(policy rate|repo|interest)\b", t):
-            def pct_to_bps(m):
-                try:
-                    val = float(m.group(1))
-                    bps = int(round(val * 100))
-                    return f"{bps} bps"
-                except Exception:
-                    return m.group(0)
-            t = re.sub(r"(\d+(?:\.\d+)?)\s*%", pct_to_bps, t)
-        else:
-            t = re.sub(r"\s*%\b", " percent", t)
-        # Compact whitespace
-        t = re.sub(r"\s+", " ", t).strip()
-        return t
+        # Synonyms, bps/percent rules and whitespace; see utils/text_normalizer.py
+        return normalize_text(text)
 
     def _jaccard(self, a: set, b: set) -> float:
-        if not a and not b:
-            return 1.0
-        inter = len(a & b)
-        union = len(a | b) or 1
-        return inter / union
+        return jaccard(a, b)
 
     def _event_key(self, title_norm: str) -> str | None:
         t = title_norm
         # RBI policy rate change with magnitude
         if "policy rate" in t and "bps" in t and "rbi" in t:
-            m = re.search(r"(\d+)[\s]*bps", t)
+            m = _BPS_RE.search(t)
             if m:
                 return f"event:rbi_policy_rate_{m.group(1)}bps"
         # CPI inflation fixed numeric
         if "cpi" in t and "inflation" in t:
-            m = re.search(r"(\d+(?:\.\d+)?)\s*(percent|%)?", t)
+            m = _NUMBER_RE.search(t)
             if m:
                 val = m.group(1)
                 return f"event:cpi_infl_{val}"
@@ -111,6 +238,6 @@ class DeduplicationAgent(BaseAgent):
         if "hdfc bank" in t and "dividend" in t and "buyback" in t:
             return "event:hdfc_dividend_buyback"
         # TCS European retail deal
-        if "tcs" in t and "deal" in t and "european" in t and re.search(r"retail", t):
+        if "tcs" in t and "deal" in t and "european" in t and "retail" in t:
             return "event:tcs_european_retail_deal"
         return None
@@ -12,8 +12,9 @@ class EntityExtractionAgent(BaseAgent):
         unique = state.get("unique_articles", [])
         all_entities: List[Dict] = []
         article_entity_map = {}
-        for a in unique:
-            ents = self.ner.extract(a["title"] + "\n" + a["content"])
+        # One batched NER call for the whole batch (nlp.pipe when spaCy is available)
+        extracted = self.ner.extract_many([a["title"] + "\n" + a["content"] for a in unique])
+        for a, ents in zip(unique, extracted):
             article_entity_map[a["id"]] = ents
             all_entities.extend(ents)
         state["entities"] = all_entities
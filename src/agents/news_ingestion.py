@@ -1,5 +1,6 @@
 import json
 from pathlib import Path
+from typing import Iterator
 from .base_agent import BaseAgent
 from ..utils.rss_parser import fetch_rss_articles
 
@@ -15,15 +16,29 @@ class NewsIngestionAgent(BaseAgent):
             raw = fetch_rss_articles()
             state["raw_articles"] = raw
         else:
-            p = Path("data/mock_news.json")
-            if p.exists():
-                with open(p, "r", encoding="utf-8") as f:
-                    state["raw_articles"] = json.load(f)
-            else:
-                state["raw_articles"] = []
+            state["raw_articles"] = self._load_mock()
         state["parsed_articles"] = [self._normalize(a) for a in state["raw_articles"]]
         return state
 
+    def iter_parsed(self, state: dict) -> Iterator[dict]:
+        # Streaming ingestion: single_article input may be any iterable, e.g. a generator over a large file
+        mode = state.get("mode", "ingest_mock")
+        if mode == "single_article":
+            raw = state.get("raw_articles", [])
+        elif mode == "ingest_rss":
+            raw = fetch_rss_articles()
+        else:
+            raw = self._load_mock()
+        for a in raw:
+            yield self._normalize(a)
+
+    def _load_mock(self) -> list:
+        p = Path("data/mock_news.json")
+        if not p.exists():
+            return []
+        with open(p, "r", encoding="utf-8") as f:
+            return json.load(f)
+
     def _normalize(self, a: dict) -> dict:
         aid = a.get("id") or a.get("url") or a.get("title")
         return {
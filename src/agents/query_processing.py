@@ -1,14 +1,16 @@
 from .base_agent import BaseAgent
+from ..utils.text_normalizer import normalize_text
 from typing import List, Dict, Any
 
 
 class QueryProcessingAgent(BaseAgent):
-    def __init__(self, db, vectordb, ner, llm):
+    def __init__(self, db, vectordb, ner, llm, rrf_k: int = 60):
         super().__init__()
         self.db = db
         self.vectordb = vectordb
         self.ner = ner
         self.llm = llm
+        self.rrf_k = rrf_k
 
     def run(self, state: dict) -> dict:
         text: str = state.get("query", "")
@@ -18,49 +20,43 @@ class QueryProcessingAgent(BaseAgent):
         companies = [e for e in ents if e["type"] == "COMPANY"]
         regulators = [e for e in ents if e["type"] == "REGULATOR"]
 
-        hits: Dict[str, Dict[str, Any]] = {}
-
-        for c in companies:
-            cname = c.get("normalized") or c["name"]
-            for row in self.db.list_news_by_company(cname, limit=top_k):
-                hits[row["id"]] = {"article": row, "score": hits.get(row["id"], {}).get("score", 0.0) + 0.6}
-            for row in self.db.list_news_by_sector("Banking", limit=top_k):
-                if row["id"] not in hits:
-                    hits[row["id"]] = {"article": row, "score": 0.3}
-                else:
-                    hits[row["id"]]["score"] += 0.3
-
-        for s in sectors:
-            sname = s.get("normalized") or s["name"]
-            for row in self.db.list_news_by_sector(sname, limit=top_k):
-                if row["id"] not in hits:
-                    hits[row["id"]] = {"article": row, "score": 0.5}
-                else:
-                    hits[row["id"]]["score"] += 0.5
-
-        for r in regulators:
-            rname = r.get("normalized") or r["name"]
-            for row in self.db.list_news_by_regulator(rname, limit=top_k):
-                if row["id"] not in hits:
-                    hits[row["id"]] = {"article": row, "score": 0.5}
-                else:
-                    hits[row["id"]]["score"] += 0.5
-
-        qres = self.vectordb.query(text, top_k=top_k)
-        for r in qres:
-            aid = r["metadata"].get("article_id") if isinstance(r.get("metadata"), dict) else None
-            art = self.db.get_article(aid) if aid else None
-            if art:
-                base = 1.0 - float(r.get("distance", 0.0))
-                if aid not in hits:
-                    hits[aid] = {"article": art, "score": base}
-                else:
-                    hits[aid]["score"] += base
-
-        results: List[Dict[str, Any]] = []
-        for aid, item in hits.items():
-            item["explanation"] = self.llm.explain(text, item["article"].get("title", ""))
-            results.append(item)
-        results.sort(key=lambda x: x.get("score", 0.0), reverse=True)
-        state["search_results"] = results[:top_k]
+        # All entity lookups scored in one SQL statement. Company queries also pull in the Banking sector
+        # (once per company, as weights add up).
+        lookups = [("COMPANY", c.get("normalized") or c["name"], 0.6) for c in companies]
+        if companies:
+            lookups.append(("SECTOR", "Banking", 0.3 * len(companies)))
+        lookups += [("SECTOR", s.get("normalized") or s["name"], 0.5) for s in sectors]
+        lookups += [("REGULATOR", r.get("normalized") or r["name"], 0.5) for r in regulators]
+        hits = {h["article"]["id"]: h for h in self.db.score_entity_matches(lookups, limit=top_k)}
+
+        # Stored vectors are of normalized text (see dedup_text), so the query is normalized the same way
+        qres = self.vectordb.query(normalize_text(text), top_k=top_k, include_documents=False)
+        vector_ids = [r["metadata"].get("article_id") if isinstance(r.get("metadata"), dict) else None for r in qres]
+        # One bulk fetch for every vector hit
+        articles = self.db.get_articles([aid for aid in vector_ids if aid])
+        vector_hits: Dict[str, Dict[str, Any]] = {}
+        for aid, r in zip(vector_ids, qres):
+            if aid in articles and aid not in vector_hits:
+                vector_hits[aid] = {"article": articles[aid], "score": 1.0 - float(r.get("distance", 0.0))}
+
+        lexical_hits = {h["article"]["id"]: h for h in self.db.search_text(text, limit=top_k)}
+
+        # Reciprocal rank fusion: entity, vector and BM25 scores live on different scales, so only
+        # each list's ranking counts
+        fused: Dict[str, Dict[str, Any]] = {}
+        for ranked in (hits, vector_hits, lexical_hits):
+            order = sorted(ranked.items(), key=lambda kv: kv[1]["score"], reverse=True)
+            for rank, (aid, item) in enumerate(order, 1):
+                if aid not in fused:
+                    fused[aid] = {"article": item["article"], "score": 0.0}
+                fused[aid]["score"] += 1.0 / (self.rrf_k + rank)
+
+        results: List[Dict[str, Any]] = sorted(fused.values(), key=lambda x: x.get("score", 0.0), reverse=True)[:top_k]
+        # Only the returned hits are explained, in one batched call; explain=False leaves them for later
+        explanations = [None] * len(results)
+        if state.get("explain", True):
+            explanations = self.llm.explain_batch(text, [item["article"] for item in results])
+        for item, explanation in zip(results, explanations):
+            item["explanation"] = explanation
+        state["search_results"] = results
         return state
@@ -15,24 +15,19 @@ class StockImpactAgent(BaseAgent):
             seen_symbols = set()
             for e in ents:
                 if e["type"] == "COMPANY":
-                    symbols = self.mapper.company_to_symbol(e["name"]) or self.mapper.company_to_symbol(e.get("normalized", ""))
-                    for s in symbols:
-                        if s not in seen_symbols:
-                            impacts.append({"article_id": aid, "symbol": s, "confidence": 1.0, "type": "direct"})
-                            seen_symbols.add(s)
-                if e["type"] == "SECTOR":
-                    sector = e.get("normalized") or e["name"]
-                    for comp, secs in self.mapper._stock_map.get("company_to_sector", {}).items():
-                        if sector.lower() in [x.lower() for x in secs]:
-                            for s in self.mapper.company_to_symbol(comp):
-                                if s not in seen_symbols:
-                                    impacts.append({"article_id": aid, "symbol": s, "confidence": 0.7, "type": "sector"})
-                                    seen_symbols.add(s)
-                if e["type"] == "REGULATOR":
-                    for comp in self.mapper._stock_map.get("companies", {}).keys():
-                        for s in self.mapper.company_to_symbol(comp):
-                            if s not in seen_symbols:
-                                impacts.append({"article_id": aid, "symbol": s, "confidence": 0.4, "type": "regulator"})
-                                seen_symbols.add(s)
+                    symbols = self.mapper.symbols_for_company(e["name"]) or self.mapper.symbols_for_company(e.get("normalized") or "")
+                    confidence, kind = 1.0, "direct"
+                elif e["type"] == "SECTOR":
+                    symbols = self.mapper.symbols_for_sector(e.get("normalized") or e["name"])
+                    confidence, kind = 0.7, "sector"
+                elif e["type"] == "REGULATOR":
+                    symbols = self.mapper.symbols_for_regulator(e.get("normalized") or e["name"])
+                    confidence, kind = 0.4, "regulator"
+                else:
+                    continue
+                for s in symbols:
+                    if s not in seen_symbols:
+                        impacts.append({"article_id": aid, "symbol": s, "confidence": confidence, "type": kind})
+                        seen_symbols.add(s)
         state["stock_impacts"] = impacts
         return state
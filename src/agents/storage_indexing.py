@@ -1,28 +1,45 @@
 from .base_agent import BaseAgent
+from .deduplication import dedup_text
 from typing import List, Dict
 
 
+def document_text(article: Dict) -> str:
+    # Document kept next to the vectors (VECTOR_STORE_DOCUMENTS); the vectors are of dedup_text
+    return article["title"] + "\n" + article["content"]
+
+
 class StorageIndexingAgent(BaseAgent):
-    def __init__(self, db, vectordb, embedder):
+    def __init__(self, db, vectordb, embedder, dedup_index=None):
         super().__init__()
         self.db = db
         self.vectordb = vectordb
         self.embedder = embedder
+        self.dedup_index = dedup_index
 
     def run(self, state: dict) -> dict:
         unique = state.get("unique_articles", [])
         article_entity_map = state.get("article_entity_map", {})
         impacts = state.get("stock_impacts", [])
-        for a in unique:
-            self.db.upsert_article(a)
-            ents = article_entity_map.get(a["id"], [])
-            self.db.link_article_entities(a["id"], ents)
+        # All SQLite writes of the run in one transaction (one commit instead of one per article)
+        with self.db.transaction():
+            self.db.upsert_articles(unique)
+            self.db.link_entities_bulk({a["id"]: article_entity_map.get(a["id"], []) for a in unique})
+            self.db.add_stock_impacts_bulk(impacts)
         if unique:
             ids = [a["id"] for a in unique]
-            docs = [a["title"] + "\n" + a["content"] for a in unique]
             metas = [{"article_id": a["id"], "title": a["title"], "source": a["source"], "category": a.get("category")}
                      for a in unique]
-            self.vectordb.add(ids, docs, metas)
-        if impacts:
-            self.db.add_stock_impacts(impacts)
+            embeddings = state.get("unique_embeddings")
+            if embeddings is not None and len(embeddings) == len(unique):
+                docs = [document_text(a) for a in unique] if self.vectordb.store_documents else None
+                self.vectordb.upsert(ids, embeddings, metas, docs)
+            else:
+                # Run without the dedup stage: the vector store embeds the same text dedup would have
+                self.vectordb.add(ids, [dedup_text(a)[0] for a in unique], metas)
+        entries = state.get("dedup_index_entries")
+        if self.dedup_index is not None and entries:
+            self.dedup_index.add(entries)
+        if unique:
+            # Cached query results computed before this store are stale now
+            self.db.bump_generation()
         return state
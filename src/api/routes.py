@@ -1,5 +1,12 @@
+import asyncio
+import json
+import queue
 from fastapi import APIRouter, Depends, Request, HTTPException
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from .schemas import ProcessArticleRequest, QueryRequest, QueryResponse, ArticleResponse, StatsResponse
+from ..services.database import _key
+from ..services.metrics import metrics
+from ..services.query_cache import normalize_query
 from typing import List
 
 router = APIRouter()
@@ -10,39 +17,111 @@ def health():
     return {"status": "ok"}
 
 
+@router.get("/metrics")
+def metrics_text():
+    # Prometheus text format: per-stage timings/counters, SQL statement latency
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+@router.get("/ready")
+def ready(request: Request):
+    # Liveness is /health; this reports whether the models are loaded, without loading them
+    state = request.app.state
+    services = state.services.status(state.model_services)
+    is_ready = all(s == "ready" for s in services.values())
+    return JSONResponse({"ready": is_ready, "services": services}, status_code=200 if is_ready else 503)
+
+
+async def _service(app, name: str):
+    # First use builds the service (and the models behind it) off the event loop
+    services = app.state.services
+    if services.loaded(name):
+        return services.get(name)
+    return await asyncio.to_thread(services.get, name)
+
+
+async def _submit(app, state: dict):
+    # Ingestion runs on the worker thread; the event loop keeps serving queries meanwhile
+    worker = await _service(app, "ingestion_worker")
+    try:
+        return worker.submit(state)
+    except queue.Full:
+        raise HTTPException(status_code=503, detail="Ingestion queue is full, retry later")
+
+
 @router.post("/news/ingest")
-async def ingest_news(request: Request, mode: str = "ingest_mock"):
+async def ingest_news(request: Request, mode: str = "ingest_mock", wait: bool = False):
     app = request.app
     m = "ingest_rss" if mode in ("rss", "ingest_rss") else "ingest_mock"
-    result = app.state.news_graph.invoke({"mode": m})
-    return {"ingested": len(result.get("parsed_articles", [])), "unique": len(result.get("unique_articles", []))}
+    job = await _submit(app, {"mode": m})
+    if wait:
+        await asyncio.to_thread(job.wait)
+    return job.to_dict()
+
+
+@router.get("/news/jobs/{job_id}")
+async def ingest_job_status(request: Request, job_id: str):
+    worker = request.app.state.services.peek("ingestion_worker")
+    job = worker.get(job_id) if worker is not None else None
+    if not job:
+        raise HTTPException(status_code=404, detail="Not found")
+    return job.to_dict()
 
 
 @router.post("/news/process")
 async def process_news(request: Request, body: ProcessArticleRequest):
     app = request.app
-    state = {"mode": "single_article", "raw_articles": [body.dict()]}
-    result = app.state.news_graph.invoke(state)
-    return {"unique_processed": len(result.get("unique_articles", []))}
+    job = await _submit(app, {"mode": "single_article", "raw_articles": [body.model_dump()]})
+    await asyncio.to_thread(job.wait)
+    if job.status != "done":
+        raise HTTPException(status_code=500, detail=job.error)
+    return {"unique_processed": job.to_dict()["unique"]}
 
 
-@router.get("/query", response_model=QueryResponse)
-async def query_news(request: Request, q: str, top_k: int = 10):
-    app = request.app
-    result = app.state.query_graph.invoke({"query": q, "top_k": top_k})
+def _cached(app, key, compute):
+    return app.state.query_cache.get_or_compute(key, app.state.db.generation, compute)
+
+
+def _search(graph, q: str, top_k: int, explain: bool):
+    result = graph.invoke({"query": q, "top_k": top_k, "explain": explain})
     items = []
+    # Articles in search results are complete rows already (metadata deserialized)
     for hit in result.get("search_results", []):
-        a = hit.get("article", {})
-        aid = a.get("id")
-        article = app.state.db.get_article(aid) if aid else a
         items.append({
-            "article": article,
+            "article": hit.get("article", {}),
             "score": hit.get("score", 0.0),
             "explanation": hit.get("explanation")
         })
     return {"results": items}
 
 
+@router.get("/query", response_model=QueryResponse)
+async def query_news(request: Request, q: str, top_k: int = 10, explain: bool = True):
+    # explain=false answers without waiting for the LLM; /query/stream delivers explanations afterwards
+    app = request.app
+    graph = await _service(app, "query_graph")
+    # The graph (and with explain, the LLM round trip) runs on a thread: the loop keeps serving
+    return await asyncio.to_thread(_cached, app, ("query", normalize_query(q), top_k, explain),
+                                   lambda: _search(graph, q, top_k, explain))
+
+
+@router.get("/query/stream")
+async def query_news_stream(request: Request, q: str, top_k: int = 10):
+    # NDJSON: the results first (no explanations), then one line per explanation as it arrives
+    app = request.app
+    graph = await _service(app, "query_graph")
+    llm = await _service(app, "llm")
+    out = await asyncio.to_thread(_cached, app, ("query", normalize_query(q), top_k, False),
+                                  lambda: _search(graph, q, top_k, False))
+
+    async def _lines():
+        yield json.dumps(out, default=str) + "\n"
+        async for article_id, explanation in llm.stream(q, [item["article"] for item in out["results"]]):
+            yield json.dumps({"article_id": article_id, "explanation": explanation}) + "\n"
+
+    return StreamingResponse(_lines(), media_type="application/x-ndjson")
+
+
 @router.get("/news/{article_id}", response_model=ArticleResponse)
 async def get_article(request: Request, article_id: str):
     app = request.app
@@ -61,16 +140,24 @@ async def list_entities(request: Request):
 @router.get("/stocks/{symbol}/news")
 async def news_by_stock(request: Request, symbol: str, top_k: int = 20):
     app = request.app
-    return app.state.db.list_news_by_stock(symbol, limit=top_k)
+    sym = symbol.upper()
+    return _cached(app, ("stock", sym, top_k), lambda: app.state.db.list_news_by_stock(sym, limit=top_k))
 
 
 @router.get("/sectors/{sector}/news")
 async def news_by_sector(request: Request, sector: str, top_k: int = 20):
     app = request.app
-    return app.state.db.list_news_by_sector(sector, limit=top_k)
+    # Keyed on the DB's own case folding: inputs that share an entry get the same rows
+    return _cached(app, ("sector", _key(sector), top_k),
+                   lambda: app.state.db.list_news_by_sector(sector, limit=top_k))
 
 
 @router.get("/stats", response_model=StatsResponse)
 async def stats(request: Request):
     app = request.app
-    return app.state.db.stats()
+    out = app.state.db.stats()
+    # Cache stats only once the embedder is up; /stats never loads a model
+    embedder = app.state.services.peek("embedder")
+    out["embedding_cache"] = embedder.cache.stats() if embedder is not None else None
+    out["query_cache"] = app.state.query_cache.stats()
+    return out
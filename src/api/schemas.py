@@ -43,3 +43,5 @@ class StatsResponse(BaseModel):
     stocks: int
     duplicates: int
     last_ingested_at: Optional[str] = None
+    embedding_cache: Optional[Dict[str, float]] = None
+    query_cache: Optional[Dict[str, float]] = None
@@ -6,12 +6,39 @@ class Settings(BaseModel):
     environment: str = os.getenv("ENVIRONMENT", "development")
     db_path: str = os.getenv("DB_PATH", "./data/news.db")
     vector_db_path: str = os.getenv("VECTOR_DB_PATH", "./data/vector_store")
+    vector_index_mode: str = os.getenv("VECTOR_INDEX_MODE", "exact")
+    vector_index_nprobe: int = int(os.getenv("VECTOR_INDEX_NPROBE", "8"))
+    vector_store_documents: bool = os.getenv("VECTOR_STORE_DOCUMENTS", "false").lower() in ("1", "true", "yes", "on")
+    dedup_index_path: str = os.getenv(
+        "DEDUP_INDEX_PATH", os.path.join(os.path.dirname(os.getenv("DB_PATH", "./data/news.db")), "dedup_index.db")
+    )
     embedding_model: str = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    embedding_cache_path: str = os.getenv(
+        "EMBEDDING_CACHE_PATH", os.path.join(os.path.dirname(os.getenv("DB_PATH", "./data/news.db")), "embedding_cache.db")
+    )
+    embedding_cache_size: int = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+    ner_batch_size: int = int(os.getenv("NER_BATCH_SIZE", "64"))
+    ner_n_process: int = int(os.getenv("NER_N_PROCESS", "1"))
+    ner_max_chars: int = int(os.getenv("NER_MAX_CHARS", "20000"))
+    query_cache_size: int = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+    query_cache_ttl_sec: float = float(os.getenv("QUERY_CACHE_TTL_SEC", "300"))
     llm_provider: str = os.getenv("LLM_PROVIDER", "none")
+    llm_model: str | None = os.getenv("LLM_MODEL")
+    llm_max_concurrency: int = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+    llm_batch_size: int = int(os.getenv("LLM_BATCH_SIZE", "5"))
+    llm_timeout_sec: float = float(os.getenv("LLM_TIMEOUT_SEC", "10"))
+    llm_cache_size: int = int(os.getenv("LLM_CACHE_SIZE", "2048"))
     openai_api_key: str | None = os.getenv("OPENAI_API_KEY")
     anthropic_api_key: str | None = os.getenv("ANTHROPIC_API_KEY")
     rss_poll_enabled: bool = os.getenv("RSS_POLL_ENABLED", "false").lower() in ("1", "true", "yes", "on")
     rss_poll_interval_sec: int = int(os.getenv("RSS_POLL_INTERVAL_SEC", "600"))
+    ingest_queue_size: int = int(os.getenv("INGEST_QUEUE_SIZE", "8"))
+    ingest_batch_size: int = int(os.getenv("INGEST_BATCH_SIZE", "0"))
+    ingest_max_pending_batches: int = int(os.getenv("INGEST_MAX_PENDING_BATCHES", "2"))
+    ingest_embed_workers: int = int(os.getenv("INGEST_EMBED_WORKERS", "0"))
+    ingest_ner_workers: int = int(os.getenv("INGEST_NER_WORKERS", "0"))
+    metrics_enabled: bool = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes", "on")
+    warmup_on_startup: bool = os.getenv("WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes", "on")
 
 
 settings = Settings()
@@ -5,45 +5,70 @@ from ..agents.entity_extraction import EntityExtractionAgent
 from ..agents.stock_impact import StockImpactAgent
 from ..agents.storage_indexing import StorageIndexingAgent
 from ..agents.query_processing import QueryProcessingAgent
+from ..services.metrics import metrics
+
+# State keys whose sizes are reported as a stage's items in / out
+STAGE_ITEMS = {
+    "ingest": ("raw_articles", "parsed_articles"),
+    "dedup": ("parsed_articles", "unique_articles"),
+    "entity": ("unique_articles", "entities"),
+    "impact": ("unique_articles", "stock_impacts"),
+    "store": ("unique_articles", "unique_articles"),
+    "query": ("query", "search_results"),
+}
+
+
+def _size(value):
+    if isinstance(value, str):
+        return 1
+    return len(value) if hasattr(value, "__len__") else None
+
+
+def instrumented(graph: str, stage: str, run):
+    # Wall time, items in/out and what the stage's SQL/embedding/dedup work reported, into
+    # state["processing_stats"][stage] and the metrics registry
+    key_in, key_out = STAGE_ITEMS[stage]
+
+    def _run(state):
+        if not metrics.enabled:
+            return run(state)
+        with metrics.stage(graph, stage) as stats:
+            n_in = _size(state.get(key_in))
+            if n_in is not None:
+                stats["items_in"] = n_in
+            state = run(state)
+            stats["items_out"] = _size(state.get(key_out)) or 0
+        state.setdefault("processing_stats", {})[stage] = stats
+        return state
+    return _run
 
 
 def ingest_node(ctx):
     agent = NewsIngestionAgent()
-    def _run(state: NewsProcessingState) -> NewsProcessingState:
-        return agent.run(state)
-    return _run
+    return instrumented("news", "ingest", agent.run)
 
 
 def dedup_node(ctx):
-    agent = DeduplicationAgent(embedder=ctx["embedder"]) 
-    def _run(state: NewsProcessingState) -> NewsProcessingState:
-        return agent.run(state)
-    return _run
+    agent = DeduplicationAgent(embedder=ctx["embedder"], index=ctx.get("dedup_index"))
+    return instrumented("news", "dedup", agent.run)
 
 
 def entity_node(ctx):
     agent = EntityExtractionAgent(ner=ctx["ner"]) 
-    def _run(state: NewsProcessingState) -> NewsProcessingState:
-        return agent.run(state)
-    return _run
+    return instrumented("news", "entity", agent.run)
 
 
 def impact_node(ctx):
     agent = StockImpactAgent(data_dir="data")
-    def _run(state: NewsProcessingState) -> NewsProcessingState:
-        return agent.run(state)
-    return _run
+    return instrumented("news", "impact", agent.run)
 
 
 def store_node(ctx):
-    agent = StorageIndexingAgent(db=ctx["db"], vectordb=ctx["vectordb"], embedder=ctx["embedder"]) 
-    def _run(state: NewsProcessingState) -> NewsProcessingState:
-        return agent.run(state)
-    return _run
+    agent = StorageIndexingAgent(db=ctx["db"], vectordb=ctx["vectordb"], embedder=ctx["embedder"],
+                                 dedup_index=ctx.get("dedup_index"))
+    return instrumented("news", "store", agent.run)
 
 
 def query_node(ctx):
     agent = QueryProcessingAgent(db=ctx["db"], vectordb=ctx["vectordb"], ner=ctx["ner"], llm=ctx["llm"]) 
-    def _run(state: QueryState) -> QueryState:
-        return agent.run(state)
-    return _run
+    return instrumented("query", "query", agent.run)
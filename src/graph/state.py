@@ -1,12 +1,16 @@
-from typing import TypedDict, List, Dict
+from typing import Any, TypedDict, List, Dict
 
 
 class NewsProcessingState(TypedDict, total=False):
     mode: str
+    skip_known: bool
     raw_articles: List[dict]
     parsed_articles: List[dict]
     unique_articles: List[dict]
+    unique_embeddings: Any
     duplicate_groups: List[List[str]]
+    known_articles: List[str]
+    dedup_index_entries: dict
     entities: List[dict]
     article_entity_map: Dict[str, List[dict]]
     stock_impacts: List[dict]
@@ -17,4 +21,6 @@ class NewsProcessingState(TypedDict, total=False):
 class QueryState(TypedDict, total=False):
     query: str
     top_k: int
+    explain: bool
     search_results: List[dict]
+    processing_stats: dict
@@ -0,0 +1,275 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+import itertools
+import multiprocessing
+import os
+import queue
+import tempfile
+import threading
+import numpy as np
+from ..agents.news_ingestion import NewsIngestionAgent
+from ..agents.deduplication import DeduplicationAgent, dedup_text
+from ..agents.entity_extraction import EntityExtractionAgent
+from ..agents.stock_impact import StockImpactAgent
+from ..agents.storage_indexing import StorageIndexingAgent
+from ..services.dedup_index import DedupIndex
+from ..services.embedding_cache import text_hash
+from .nodes import instrumented
+
+_DONE = object()
+
+# Services used inside pool workers. With fork these are the parent's objects, so loaded models are
+# shared copy-on-write; with spawn each worker builds its own in _init_worker.
+_worker_services: Dict[str, Any] = {}
+
+
+def _init_worker(embedding_model: str, ner_settings: dict):
+    if _worker_services:
+        return
+    from ..services.embedding_service import EmbeddingService
+    from ..services.ner_service import NERService
+    _worker_services["embedder"] = EmbeddingService(embedding_model)
+    _worker_services["entity"] = EntityExtractionAgent(ner=NERService(**ner_settings))
+
+
+def _embed_job(articles: List[dict]) -> Dict[str, np.ndarray]:
+    # Vectors for the texts the dedup stage will embed (the store reuses them), keyed like the embedding
+    # cache. Goes straight to the model: the cache (and its SQLite connection) stays in the parent.
+    texts = [dedup_text(a)[0] for a in articles]
+    vectors = _worker_services["embedder"]._encode(texts)
+    return {text_hash(t): np.asarray(v, dtype=np.float32) for t, v in zip(texts, vectors)}
+
+
+def _ner_job(articles: List[dict]):
+    state = _worker_services["entity"].run({"unique_articles": articles})
+    return state["entities"], state["article_entity_map"]
+
+
+class _PoolStage:
+    # Pipeline stage whose work runs on a process pool. Up to `window` batches are in the pool at once,
+    # and they are passed on in input order.
+    def __init__(self, pool: ProcessPoolExecutor, job: Callable, args: Callable[[dict], Any],
+                 merge: Callable[[dict, Any], dict], window: int):
+        self.pool, self.job, self.args, self.merge, self.window = pool, job, args, merge, window
+        self.__name__ = job.__name__
+
+
+class WorkerPools:
+    # Process pools for the streaming pipeline's embed and NER stages, started on creation and kept until
+    # close(). Created while the process has a single thread, the pools fork after the models are loaded
+    # and workers share them copy-on-write; create_app does this before any other thread starts. With
+    # other threads running, forking could copy a lock one of them holds, so the pools use forkserver (or
+    # spawn) instead and every worker loads its own embedding model and spaCy pipeline.
+    def __init__(self, embedder, ner, embed_workers: int = 0, ner_workers: int = 0):
+        self.embed_workers = max(0, embed_workers)
+        self.ner_workers = max(0, ner_workers)
+        methods = multiprocessing.get_all_start_methods()
+        if "fork" in methods and threading.active_count() == 1:
+            self.method = "fork"
+        else:
+            self.method = "forkserver" if "forkserver" in methods else "spawn"
+        _worker_services.update(embedder=embedder, entity=EntityExtractionAgent(ner=ner))
+        ner_settings = {"company_keywords": ner.company_keywords, "regulator_keywords": ner.regulator_keywords,
+                        "sector_keywords": ner.sector_keywords, "batch_size": ner.batch_size,
+                        "max_chars": ner.max_chars}
+        initargs = (embedder.model_name, ner_settings)
+        self.embed = self._start(self.embed_workers, initargs) if self.embed_workers else None
+        self.ner = self._start(self.ner_workers, initargs) if self.ner_workers else None
+
+    def _start(self, workers: int, initargs: tuple) -> ProcessPoolExecutor:
+        pool = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context(self.method),
+                                   initializer=_init_worker, initargs=initargs)
+        # With fork all workers start on the first submit: do it now, while the process is single-threaded
+        pool.submit(int).result()
+        return pool
+
+    def close(self):
+        for pool in (self.embed, self.ner):
+            if pool is not None:
+                pool.shutdown()
+        self.embed = self.ner = None
+
+
+class StreamingNewsPipeline:
+    # Same agents as build_news_processing_graph, but articles move through dedup -> entity -> impact ->
+    # store in micro-batches of `batch_size`, one thread per stage joined by queues of `max_pending`
+    # batches. Stages overlap (batch N is stored while N+1 is in NER), the first batch is searchable
+    # before the last one is read, and only a few batches are in memory at a time.
+    # Duplicates across micro-batches are caught through a run-scoped DedupIndex (on disk, in a temp
+    # dir, exact Jaccard) that the dedup stage fills as it goes. Each article joins the earliest matching
+    # leader of an earlier batch, as in the whole-list grouping; the groups match it except where LSH
+    # candidate generation misses a pair (about 2% at the Jaccard threshold).
+    # embed_workers / ner_workers > 0 move embedding and NER onto process pools: an embed stage ahead of
+    # dedup fills the embedding cache for the texts dedup will embed, and NER batches run
+    # side by side on the pool while dedup and store keep their order. The pools come from `pools`
+    # (WorkerPools started ahead of time), else they are started on the first run and reused until close().
+    def __init__(self, db, vectordb, embedder, ner, dedup_index=None, batch_size: int = 64, max_pending: int = 2,
+                 embed_workers: int = 0, ner_workers: int = 0, pools: Optional[WorkerPools] = None):
+        self.batch_size = max(1, batch_size)
+        self.max_pending = max(1, max_pending)
+        self.embed_workers = max(0, embed_workers)
+        self.ner_workers = max(0, ner_workers)
+        self.dedup_index = dedup_index
+        self.embedder = embedder
+        self.ner = ner
+        self.ingest = NewsIngestionAgent()
+        self.dedup = DeduplicationAgent(embedder=embedder, index=dedup_index)
+        self.entity = EntityExtractionAgent(ner=ner)
+        self.impact = StockImpactAgent(data_dir="data")
+        self.store = StorageIndexingAgent(db=db, vectordb=vectordb, embedder=embedder, dedup_index=dedup_index)
+        self.pools = pools
+        self._own_pools = pools is None
+
+    def run(self, state: dict, on_batch: Optional[Callable[[dict], None]] = None) -> dict:
+        # Returns a summary (counts, ids, merged duplicate groups) instead of the full article lists;
+        # on_batch gets the summary after every stored batch
+        mode = state.get("mode", "ingest_mock")
+        skip_known = self.dedup_index is not None and state.get("skip_known", mode == "ingest_rss")
+        summary = {"mode": mode, "ingested": 0, "unique": 0, "batches": 0, "unique_ids": [],
+                   "duplicate_groups": [], "known_articles": [], "processing_stats": {}}
+        groups: Dict[str, List[str]] = {}
+        with tempfile.TemporaryDirectory(prefix="stream_dedup_") as tmp:
+            run_index = DedupIndex(os.path.join(tmp, "run_index.db"), exact=True)
+            # Scratch data, dropped with the temp dir: no journal, no fsync
+            run_index.conn.execute("PRAGMA journal_mode=OFF")
+            run_index.conn.execute("PRAGMA synchronous=OFF")
+
+            def _dedup(batch: dict) -> dict:
+                batch = self.dedup.run(batch, run_index=run_index)
+                # Registered right away: the next batch is deduplicated before this one is stored
+                if batch.get("dedup_index_entries"):
+                    run_index.add(batch["dedup_index_entries"])
+                return batch
+
+            store = instrumented("streaming", "store", self.store.run)
+
+            def _store(batch: dict) -> dict:
+                batch = store(batch)
+                # Per-stage processing_stats of every batch, summed (empty with metrics disabled)
+                for stage, stats in batch.get("processing_stats", {}).items():
+                    total = summary["processing_stats"].setdefault(stage, {})
+                    for key, value in stats.items():
+                        total[key] = total.get(key, 0) + value
+                summary["ingested"] += len(batch["parsed_articles"])
+                summary["unique"] += len(batch["unique_articles"])
+                summary["batches"] += 1
+                summary["unique_ids"].extend(a["id"] for a in batch["unique_articles"])
+                summary["known_articles"].extend(batch.get("known_articles", []))
+                for g in batch.get("duplicate_groups", []):
+                    merged = groups.setdefault(g[0], [g[0]])
+                    merged.extend(aid for aid in g[1:] if aid not in merged)
+                if on_batch is not None:
+                    on_batch(dict(summary))
+                return batch
+
+            entity = instrumented("streaming", "entity", self.entity.run)
+            stages = [instrumented("streaming", "dedup", _dedup), entity,
+                      instrumented("streaming", "impact", self.impact.run), _store]
+            try:
+                if (self.embed_workers or self.ner_workers) and self.pools is None:
+                    self.pools = WorkerPools(self.embedder, self.ner, self.embed_workers, self.ner_workers)
+                if self.embed_workers:
+                    stages.insert(0, _PoolStage(self.pools.embed, _embed_job, lambda b: b["parsed_articles"],
+                                                self._cache_vectors, self.embed_workers))
+                if self.ner_workers:
+                    stages[stages.index(entity)] = _PoolStage(self.pools.ner, _ner_job, lambda b: b["unique_articles"],
+                                                              self._merge_entities, self.ner_workers)
+                self._pipe(self._batches(state, skip_known), stages)
+            finally:
+                run_index.conn.close()
+        summary["duplicate_groups"] = list(groups.values())
+        return summary
+
+    def close(self):
+        # Shuts down the pools this pipeline started; ones passed in belong to the caller
+        if self._own_pools and self.pools is not None:
+            self.pools.close()
+            self.pools = None
+
+    def _cache_vectors(self, batch: dict, vectors: Dict[str, np.ndarray]) -> dict:
+        # Dedup and store now find these texts in the cache (as long as it holds a few batches)
+        self.embedder.cache.put_many(self.embedder.cache_key, vectors)
+        return batch
+
+    def _merge_entities(self, batch: dict, result) -> dict:
+        batch["entities"], batch["article_entity_map"] = result
+        return batch
+
+    def _batches(self, state: dict, skip_known: bool) -> Iterator[dict]:
+        articles = self.ingest.iter_parsed(state)
+        while True:
+            batch = list(itertools.islice(articles, self.batch_size))
+            if not batch:
+                return
+            yield {"mode": state.get("mode", "ingest_mock"), "skip_known": skip_known, "parsed_articles": batch}
+
+    def _pipe(self, source: Iterable[dict], stages: List[Callable[[dict], dict]]):
+        queues = [queue.Queue(maxsize=self.max_pending) for _ in stages]
+        errors: List[BaseException] = []
+
+        def _worker(fn, inbox, outbox):
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    break
+                if errors:
+                    continue  # keep draining so upstream stages never block on a full queue
+                try:
+                    out = fn(item)
+                except BaseException as e:
+                    errors.append(e)
+                    continue
+                if outbox is not None:
+                    outbox.put(out)
+            if outbox is not None:
+                outbox.put(_DONE)
+
+        def _pool_worker(stage: _PoolStage, inbox, outbox):
+            in_pool = deque()
+
+            def _emit():
+                item, future = in_pool.popleft()
+                try:
+                    out = stage.merge(item, future.result())
+                except BaseException as e:
+                    errors.append(e)
+                    return
+                if not errors:
+                    outbox.put(out)
+
+            while True:
+                item = inbox.get()
+                if item is _DONE:
+                    break
+                if errors:
+                    continue
+                try:
+                    in_pool.append((item, stage.pool.submit(stage.job, stage.args(item))))
+                except BaseException as e:
+                    errors.append(e)
+                    continue
+                while in_pool and (len(in_pool) >= stage.window or in_pool[0][1].done()):
+                    _emit()
+            while in_pool:
+                _emit()
+            outbox.put(_DONE)
+
+        threads = [threading.Thread(target=_pool_worker if isinstance(fn, _PoolStage) else _worker,
+                                    args=(fn, queues[i], queues[i + 1] if i + 1 < len(stages) else None),
+                                    name=f"stream-{getattr(fn, '__name__', i)}", daemon=True)
+                   for i, fn in enumerate(stages)]
+        for t in threads:
+            t.start()
+        try:
+            for batch in source:
+                if errors:
+                    break
+                queues[0].put(batch)
+        finally:
+            queues[0].put(_DONE)
+            for t in threads:
+                t.join()
+        if errors:
+            raise errors[0]
+
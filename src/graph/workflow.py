@@ -1,10 +1,11 @@
 from langgraph.graph import StateGraph, END
 from .state import NewsProcessingState, QueryState
 from .nodes import ingest_node, dedup_node, entity_node, impact_node, store_node, query_node
+from .streaming import StreamingNewsPipeline
 
 
-def build_news_processing_graph(db, vectordb, embedder, ner):
-    ctx = {"db": db, "vectordb": vectordb, "embedder": embedder, "ner": ner}
+def build_news_processing_graph(db, vectordb, embedder, ner, dedup_index=None):
+    ctx = {"db": db, "vectordb": vectordb, "embedder": embedder, "ner": ner, "dedup_index": dedup_index}
     graph = StateGraph(NewsProcessingState)
     graph.add_node("ingest", ingest_node(ctx))
     graph.add_node("dedup", dedup_node(ctx))
@@ -22,6 +23,13 @@ def build_news_processing_graph(db, vectordb, embedder, ner):
     return graph.compile()
 
 
+def build_streaming_news_pipeline(db, vectordb, embedder, ner, dedup_index=None, batch_size: int = 64,
+                                  max_pending: int = 2, embed_workers: int = 0, ner_workers: int = 0,
+                                  pools=None) -> StreamingNewsPipeline:
+    return StreamingNewsPipeline(db, vectordb, embedder, ner, dedup_index, batch_size, max_pending,
+                                 embed_workers, ner_workers, pools)
+
+
 def build_query_graph(db, vectordb, embedder, ner, llm):
     ctx = {"db": db, "vectordb": vectordb, "embedder": embedder, "ner": ner, "llm": llm}
     graph = StateGraph(QueryState)
@@ -1,49 +1,127 @@
 from fastapi import FastAPI
+from starlette.datastructures import State
 import asyncio
 import logging
+import queue
 from .config import settings
 from .api.routes import router as api_router
 from .services.database import Database
+from .services.dedup_index import DedupIndex
 from .services.embedding_service import EmbeddingService
+from .services.ingestion_worker import IngestionWorker
 from .services.vector_db import VectorDB
 from .services.ner_service import NERService
 from .services.llm_service import LLMService
-from .graph.workflow import build_news_processing_graph, build_query_graph
+from .services.metrics import metrics
+from .services.query_cache import QueryCache
+from .services.registry import ServiceRegistry
 
 
-def create_app() -> FastAPI:
-    app = FastAPI(title="Financial News Intelligence", version="0.1.0")
+# Services that load models (or build on them); warmed up in the background after startup
+MODEL_SERVICES = ("embedder", "ner", "vectordb", "query_graph", "news_graph")
+
+
+class _ServiceState(State):
+    # app.state that builds registry services on first attribute access
+    def __getattr__(self, key):
+        state = self._state
+        if key in state:
+            return state[key]
+        services = state.get("services")
+        if services is not None and key in services:
+            return services.get(key)
+        return super().__getattr__(key)
+
+
+def _register_services(services: ServiceRegistry):
+    # Nothing is constructed here: SentenceTransformer, spaCy and chromadb load when first used
+    get = services.get
+
+    def _graphs():
+        from .graph import workflow
+        return workflow
 
-    db = Database(settings.db_path)
-    embedder = EmbeddingService(settings.embedding_model)
-    vectordb = VectorDB(settings.vector_db_path, embedder)
-    ner = NERService()
-    llm = LLMService(settings.llm_provider)
+    def _pipeline():
+        # INGEST_BATCH_SIZE > 0: ingest jobs stream through the stages in micro-batches
+        if settings.ingest_batch_size <= 0:
+            return None
+        return _graphs().build_streaming_news_pipeline(
+            get("db"), get("vectordb"), get("embedder"), get("ner"), get("dedup_index"), settings.ingest_batch_size,
+            settings.ingest_max_pending_batches, settings.ingest_embed_workers, settings.ingest_ner_workers,
+            get("worker_pools"))
 
-    news_graph = build_news_processing_graph(db, vectordb, embedder, ner)
-    query_graph = build_query_graph(db, vectordb, embedder, ner, llm)
+    def _worker_pools():
+        if not _uses_worker_pools():
+            return None
+        from .graph.streaming import WorkerPools
+        return WorkerPools(get("embedder"), get("ner"), settings.ingest_embed_workers, settings.ingest_ner_workers)
 
-    app.state.db = db
-    app.state.embedder = embedder
-    app.state.vectordb = vectordb
-    app.state.ner = ner
-    app.state.llm = llm
-    app.state.news_graph = news_graph
-    app.state.query_graph = query_graph
+    def _worker():
+        worker = IngestionWorker(get("news_graph"), settings.ingest_queue_size, pipeline=get("news_pipeline"))
+        worker.start()
+        return worker
+
+    services.register("db", lambda: Database(settings.db_path))
+    services.register("dedup_index", lambda: DedupIndex(settings.dedup_index_path))
+    services.register("embedder", lambda: EmbeddingService(settings.embedding_model, settings.embedding_cache_path,
+                                                           settings.embedding_cache_size))
+    services.register("vectordb", lambda: VectorDB(settings.vector_db_path, get("embedder"), settings.vector_index_mode,
+                                                   settings.vector_index_nprobe, settings.vector_store_documents,
+                                                   get("db")))
+    services.register("ner", lambda: NERService(batch_size=settings.ner_batch_size, n_process=settings.ner_n_process,
+                                                max_chars=settings.ner_max_chars))
+    services.register("llm", lambda: LLMService(
+        settings.llm_provider, api_key=settings.anthropic_api_key if settings.llm_provider == "anthropic"
+        else settings.openai_api_key, model=settings.llm_model, max_concurrency=settings.llm_max_concurrency,
+        batch_size=settings.llm_batch_size, timeout_sec=settings.llm_timeout_sec, cache_size=settings.llm_cache_size))
+    services.register("query_cache", lambda: QueryCache(settings.query_cache_size, settings.query_cache_ttl_sec))
+    services.register("news_graph", lambda: _graphs().build_news_processing_graph(
+        get("db"), get("vectordb"), get("embedder"), get("ner"), get("dedup_index")))
+    services.register("query_graph", lambda: _graphs().build_query_graph(
+        get("db"), get("vectordb"), get("embedder"), get("ner"), get("llm")))
+    services.register("worker_pools", _worker_pools)
+    services.register("news_pipeline", _pipeline)
+    services.register("ingestion_worker", _worker)
+
+
+def _uses_worker_pools() -> bool:
+    return settings.ingest_batch_size > 0 and (settings.ingest_embed_workers > 0 or settings.ingest_ner_workers > 0)
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(title="Financial News Intelligence", version="0.1.0")
+    metrics.enabled = settings.metrics_enabled
+    services = ServiceRegistry()
+    _register_services(services)
+    if _uses_worker_pools():
+        # Loads the embedder and NER and forks the pool workers now, while this is still the only
+        # thread, so the workers share the loaded models (see WorkerPools)
+        services.get("worker_pools")
+    app.state = _ServiceState()
+    app.state.services = services
+    app.state.model_services = MODEL_SERVICES
 
     app.include_router(api_router, prefix="/api/v1")
     logger = logging.getLogger("rss_poller")
 
     async def _rss_poller():
         interval = max(5, int(settings.rss_poll_interval_sec))
+        # Built off the event loop: the worker needs the news graph and its models
+        worker = await asyncio.to_thread(services.get, "ingestion_worker")
         while True:
             try:
-                app.state.news_graph.invoke({"mode": "ingest_rss"})
+                # Skip this tick while the previous poll is still queued or running
+                if not worker.pending("ingest_rss"):
+                    worker.submit({"mode": "ingest_rss"})
+            except queue.Full:
+                logger.warning("Ingestion queue is full, skipping RSS poll")
             except Exception:
                 logger.exception("RSS poller run failed")
             await asyncio.sleep(interval)
 
     async def _on_startup():
+        if settings.warmup_on_startup:
+            services.warm_up(MODEL_SERVICES)
         if settings.rss_poll_enabled:
             app.state._rss_poller_task = asyncio.create_task(_rss_poller())
 
@@ -55,6 +133,13 @@ def create_app() -> FastAPI:
                 await task
             except Exception:
                 pass
+        # Let a running job finish its store before the process exits
+        worker = services.peek("ingestion_worker")
+        if worker is not None:
+            await asyncio.to_thread(worker.stop, 30)
+        pools = services.peek("worker_pools")
+        if pools is not None:
+            pools.close()
 
     app.add_event_handler("startup", _on_startup)
     app.add_event_handler("shutdown", _on_shutdown)
@@ -1,17 +1,131 @@
 import sqlite3
-from typing import Any, Dict, List, Optional
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import os
 import json
 import ast
+import re
+import threading
+import time
+from .metrics import metrics
+
+# Lookup queries; each starts from an index (see Database._migrate) instead of scanning articles
+NEWS_BY_STOCK_SQL = """
+    SELECT a.* FROM articles a
+    JOIN stock_impacts s ON a.id = s.article_id
+    WHERE s.symbol = ?
+    ORDER BY a.published_at DESC
+    LIMIT ?
+"""
+NEWS_BY_SECTOR_SQL = """
+    SELECT a.* FROM articles a
+    WHERE a.id IN (
+        SELECT ae.article_id FROM entities e
+        JOIN article_entities ae ON ae.entity_id = e.id
+        WHERE e.name_key = ? AND e.type = 'SECTOR'
+        UNION
+        SELECT id FROM articles WHERE category = ? COLLATE NOCASE
+    )
+    ORDER BY a.published_at DESC
+    LIMIT ?
+"""
+NEWS_BY_ENTITY_SQL = """
+    SELECT a.* FROM articles a
+    WHERE a.id IN (
+        SELECT ae.article_id FROM entities e
+        JOIN article_entities ae ON ae.entity_id = e.id
+        WHERE e.key = ? AND e.type = ?
+    )
+    ORDER BY a.published_at DESC
+    LIMIT ?
+"""
+
+
+def _record_sql(seconds: float):
+    metrics.observe("sql_statement_seconds", seconds)
+    metrics.count("sql_statements")
+    metrics.count("sql_seconds", seconds)
+
+
+class _TimedCursor(sqlite3.Cursor):
+    # Statement count and execute() latency for METRICS_ENABLED; a flag check otherwise
+    def execute(self, sql, parameters=()):
+        if not metrics.enabled:
+            return super().execute(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _record_sql(time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        if not metrics.enabled:
+            return super().executemany(sql, seq_of_parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _record_sql(time.perf_counter() - start)
+
+
+class TimedConnection(sqlite3.Connection):
+    # sqlite3.connect(..., factory=TimedConnection): every statement goes through _TimedCursor
+    def cursor(self, factory=_TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
 
 
 class Database:
     def __init__(self, path: str):
         os.makedirs(os.path.dirname(path), exist_ok=True)
-        self.conn = sqlite3.connect(path, check_same_thread=False)
-        self.conn.row_factory = sqlite3.Row
+        self.path = path
+        # One connection per thread: API reads don't queue behind the ingestion worker's open write
+        # transaction on a shared connection, and WAL lets them read the last committed state meanwhile
+        self._local = threading.local()
+        # Bumped after every successful store; read-side caches key their entries on it
+        self.generation = 0
         self._init()
 
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, factory=TimedConnection)
+            conn.row_factory = sqlite3.Row
+            # WAL + synchronous=NORMAL: commits append to the WAL without an fsync each; readers don't block the writer
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA cache_size=-65536")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn, self._local.tx_depth = conn, 0
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        # One commit for everything written inside; nested uses join the outer transaction
+        conn = self.conn
+        self._local.tx_depth += 1
+        try:
+            yield
+            if self._local.tx_depth == 1:
+                conn.commit()
+        except BaseException:
+            if self._local.tx_depth == 1:
+                conn.rollback()
+            raise
+        finally:
+            self._local.tx_depth -= 1
+
+    def bump_generation(self) -> int:
+        self.generation += 1
+        return self.generation
+
     def _init(self):
         cur = self.conn.cursor()
         cur.execute("""
@@ -31,7 +145,9 @@ class Database:
             id TEXT PRIMARY KEY,
             type TEXT,
             name TEXT,
-            normalized TEXT
+            normalized TEXT,
+            key TEXT,
+            name_key TEXT
         );
         """)
         cur.execute("""
@@ -48,20 +164,116 @@ class Database:
             type TEXT
         );
         """)
+        self._migrate(cur)
         self.conn.commit()
 
+    def _migrate(self, cur):
+        # Lookup keys on entities: key = lower(normalized, falling back to name), name_key = lower(name)
+        cols = {r[1] for r in cur.execute("PRAGMA table_info(entities)")}
+        if "key" not in cols:
+            cur.execute("ALTER TABLE entities ADD COLUMN key TEXT")
+            cur.execute("ALTER TABLE entities ADD COLUMN name_key TEXT")
+            cur.execute("UPDATE entities SET key = LOWER(COALESCE(normalized, name)), name_key = LOWER(name)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_entities_key ON entities (key, type)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_entities_name_key ON entities (name_key, type)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_article_entities_entity ON article_entities (entity_id, article_id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_stock_impacts_symbol ON stock_impacts (symbol, article_id)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_at)")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_articles_category ON articles (category COLLATE NOCASE)")
+        # Composite unique keys; tables written before they existed may hold duplicates that must go first
+        existing = {r[0] for r in cur.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        if not {"ux_article_entities", "ux_stock_impacts"} <= existing:
+            self._remove_duplicate_rows(cur)
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_article_entities ON article_entities (article_id, entity_id)")
+        cur.execute("CREATE UNIQUE INDEX IF NOT EXISTS ux_stock_impacts ON stock_impacts (article_id, symbol)")
+        self.fts = self._init_fts(cur)
+
+    def _init_fts(self, cur) -> bool:
+        # Full-text index over title/content (external content: the text is stored once, in articles).
+        # Triggers keep it in sync with every insert / update / delete on articles.
+        exists = cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'articles_fts'").fetchone() is not None
+        if not exists:
+            try:
+                cur.execute("""
+                CREATE VIRTUAL TABLE articles_fts USING fts5(
+                    title, content, content='articles', content_rowid='rowid', tokenize='porter unicode61'
+                );
+                """)
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5: search_text returns nothing
+                return False
+        cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+            INSERT INTO articles_fts (rowid, title, content) VALUES (new.rowid, new.title, new.content);
+        END;
+        """)
+        cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+            INSERT INTO articles_fts (articles_fts, rowid, title, content) VALUES ('delete', old.rowid, old.title, old.content);
+        END;
+        """)
+        cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, content ON articles BEGIN
+            INSERT INTO articles_fts (articles_fts, rowid, title, content) VALUES ('delete', old.rowid, old.title, old.content);
+            INSERT INTO articles_fts (rowid, title, content) VALUES (new.rowid, new.title, new.content);
+        END;
+        """)
+        if not exists:
+            cur.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+        return True
+
+    def _remove_duplicate_rows(self, cur) -> Dict[str, int]:
+        removed = {}
+        # Keep the newest row per key (the last insert carried the latest confidence / type)
+        for table, key in (("article_entities", "article_id, entity_id"), ("stock_impacts", "article_id, symbol")):
+            cur.execute(f"DELETE FROM {table} WHERE rowid NOT IN (SELECT MAX(rowid) FROM {table} GROUP BY {key})")
+            removed[f"duplicate_{table}"] = cur.rowcount
+        return removed
+
+    def compact(self) -> Dict[str, int]:
+        # One-off cleanup for databases written before the unique keys: duplicates, rows of
+        # articles that no longer exist, unreferenced entities; then VACUUM to return the space
+        with self.transaction():
+            cur = self.conn.cursor()
+            removed = self._remove_duplicate_rows(cur)
+            for table in ("article_entities", "stock_impacts"):
+                cur.execute(f"DELETE FROM {table} WHERE article_id NOT IN (SELECT id FROM articles)")
+                removed[f"orphan_{table}"] = cur.rowcount
+            cur.execute("DELETE FROM entities WHERE id NOT IN (SELECT entity_id FROM article_entities)")
+            removed["orphan_entities"] = cur.rowcount
+        self.conn.execute("VACUUM")
+        if self.fts:
+            # VACUUM may renumber the articles rowids the full-text index points at
+            with self.transaction():
+                self.conn.execute("INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')")
+        return removed
+
+    def article_ids(self) -> List[str]:
+        return [r[0] for r in self.conn.execute("SELECT id FROM articles")]
+
     def upsert_article(self, article: Dict[str, Any]):
-        cur = self.conn.cursor()
-        cur.execute(
-            """INSERT OR REPLACE INTO articles (id, title, content, source, published_at, url, category, metadata)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            (
-                article["id"], article["title"], article["content"], article["source"],
-                article["published_at"], article["url"], article.get("category"), str(article.get("metadata"))
+        self.upsert_articles([article])
+
+    def upsert_articles(self, articles: Iterable[Dict[str, Any]]):
+        rows = [(
+            a["id"], a["title"], a["content"], a["source"],
+            a["published_at"], a["url"], a.get("category"), str(a.get("metadata"))
+        ) for a in articles]
+        ids = [(r[0],) for r in rows]
+        with self.transaction():
+            # A replaced article gets its entity links and impacts rewritten by the caller
+            self.conn.executemany("DELETE FROM article_entities WHERE article_id = ?", ids)
+            self.conn.executemany("DELETE FROM stock_impacts WHERE article_id = ?", ids)
+            self.conn.executemany(
+                """INSERT INTO articles (id, title, content, source, published_at, url, category, metadata)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    title = excluded.title, content = excluded.content, source = excluded.source,
+                    published_at = excluded.published_at, url = excluded.url, category = excluded.category,
+                    metadata = excluded.metadata
+                """,
+                rows
             )
-        )
-        self.conn.commit()
 
     def get_article(self, article_id: str) -> Optional[Dict[str, Any]]:
         cur = self.conn.cursor()
@@ -75,70 +287,168 @@ class Database:
 
     def list_entities(self) -> List[Dict[str, Any]]:
         cur = self.conn.cursor()
-        cur.execute("SELECT * FROM entities")
+        cur.execute("SELECT id, type, name, normalized FROM entities")
         return [dict(r) for r in cur.fetchall()]
 
     def link_article_entities(self, article_id: str, entities: List[Dict[str, Any]]):
-        cur = self.conn.cursor()
-        for e in entities:
-            cur.execute("INSERT OR REPLACE INTO entities (id, type, name, normalized) VALUES (?, ?, ?, ?)",
-                        (e["id"], e["type"], e["name"], e.get("normalized")))
-            cur.execute("INSERT INTO article_entities (article_id, entity_id) VALUES (?, ?)", (article_id, e["id"]))
-        self.conn.commit()
+        self.link_entities_bulk({article_id: entities})
+
+    def link_entities_bulk(self, article_entity_map: Dict[str, List[Dict[str, Any]]]):
+        entity_rows = {}
+        link_rows = []
+        for article_id, entities in article_entity_map.items():
+            for e in entities:
+                norm = e.get("normalized")
+                entity_rows[e["id"]] = (e["id"], e["type"], e["name"], norm,
+                                        _key(norm if norm is not None else e["name"]), _key(e["name"]))
+                link_rows.append((article_id, e["id"]))
+        with self.transaction():
+            self.conn.executemany(
+                """INSERT INTO entities (id, type, name, normalized, key, name_key) VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET
+                    type = excluded.type, name = excluded.name, normalized = excluded.normalized,
+                    key = excluded.key, name_key = excluded.name_key
+                """,
+                list(entity_rows.values())
+            )
+            self.conn.executemany(
+                "INSERT INTO article_entities (article_id, entity_id) VALUES (?, ?) "
+                "ON CONFLICT (article_id, entity_id) DO NOTHING", link_rows
+            )
 
     def add_stock_impacts(self, impacts: List[Dict[str, Any]]):
-        cur = self.conn.cursor()
-        for i in impacts:
-            cur.execute("INSERT INTO stock_impacts (article_id, symbol, confidence, type) VALUES (?, ?, ?, ?)",
-                        (i["article_id"], i["symbol"], i["confidence"], i["type"]))
-        self.conn.commit()
+        self.add_stock_impacts_bulk(impacts)
+
+    def add_stock_impacts_bulk(self, impacts: Iterable[Dict[str, Any]]):
+        with self.transaction():
+            self.conn.executemany(
+                """INSERT INTO stock_impacts (article_id, symbol, confidence, type) VALUES (?, ?, ?, ?)
+                ON CONFLICT (article_id, symbol) DO UPDATE SET confidence = excluded.confidence, type = excluded.type
+                """,
+                [(i["article_id"], i["symbol"], i["confidence"], i["type"]) for i in impacts]
+            )
 
     def list_news_by_stock(self, symbol: str, limit: int = 20) -> List[Dict[str, Any]]:
         cur = self.conn.cursor()
-        cur.execute(
-            """
-            SELECT a.* FROM articles a
-            JOIN stock_impacts s ON a.id = s.article_id
-            WHERE s.symbol = ?
-            ORDER BY a.published_at DESC
-            LIMIT ?
-            """, (symbol, limit)
-        )
+        cur.execute(NEWS_BY_STOCK_SQL, (symbol, limit))
         return [dict(r) for r in cur.fetchall()]
 
     def list_news_by_sector(self, sector: str, limit: int = 20) -> List[Dict[str, Any]]:
         cur = self.conn.cursor()
-        cur.execute(
-            """
-            SELECT DISTINCT a.* FROM articles a
-            JOIN entities e ON e.id IN (
-                SELECT entity_id FROM article_entities WHERE article_id = a.id
-            )
-            WHERE (e.type = 'SECTOR' AND LOWER(e.name) = LOWER(?))
-               OR (a.category IS NOT NULL AND LOWER(a.category) = LOWER(?))
-            ORDER BY a.published_at DESC
-            LIMIT ?
-            """, (sector, sector, limit)
-        )
+        cur.execute(NEWS_BY_SECTOR_SQL, (_key(sector), sector, limit))
         return [dict(r) for r in cur.fetchall()]
 
     def list_news_by_entity(self, entity_type: str, name_or_normalized: str, limit: int = 20) -> List[Dict[str, Any]]:
         cur = self.conn.cursor()
+        cur.execute(NEWS_BY_ENTITY_SQL, (_key(name_or_normalized), entity_type, limit))
+        return [dict(r) for r in cur.fetchall()]
+
+    def search_text(self, query: str, limit: int = 20, max_postings: int = 5000) -> List[Dict[str, Any]]:
+        # BM25 over title (weighted x2) and content, OR over the query terms. bm25() costs time per
+        # matching row, so very common terms are left out: terms are taken rarest first until their
+        # estimated document counts reach max_postings (the rarest is always kept), and if that one
+        # alone is too common only the most recent matches are ranked.
+        # Both cutoffs are silent: counts are estimated from the newest _FTS_DF_SAMPLE rowids only, and
+        # when the rarest term is over max_postings, older matching articles are never ranked (the
+        # caller gets no sign of it). Raise max_postings to search further back.
+        terms = list(dict.fromkeys(_FTS_TERM_RE.findall(query.lower())))
+        if not self.fts or not terms:
+            return []
+        cur = self.conn.cursor()
+        # Document counts estimated from the newest rows (a rowid range keeps this cheap for common
+        # terms), all terms in one statement
+        counts = ", ".join(["(SELECT COUNT(*) FROM articles_fts WHERE articles_fts MATCH ? AND rowid > "
+                            "(SELECT MAX(rowid) FROM articles) - ?)"] * len(terms))
+        row = cur.execute(f"SELECT (SELECT MAX(rowid) FROM articles), {counts}",
+                          [x for t in terms for x in (f'"{t}"', _FTS_DF_SAMPLE)]).fetchone()
+        last = row[0] or 0
+        scale = last / max(1, min(last, _FTS_DF_SAMPLE))
+        estimates = sorted((n * scale, t) for n, t in zip(row[1:], terms))
+        selected, postings = [], 0.0
+        for est, t in estimates:
+            if selected and postings + est > max_postings:
+                break
+            selected.append(t)
+            postings += est
+        since = int(last - last * max_postings / postings) if postings > max_postings else 0
         cur.execute(
             """
-            SELECT DISTINCT a.* FROM articles a
-            JOIN article_entities ae ON a.id = ae.article_id
-            JOIN entities e ON e.id = ae.entity_id
-            WHERE e.type = ? AND (
-                (e.normalized IS NOT NULL AND LOWER(e.normalized) = LOWER(?))
-                OR (e.normalized IS NULL AND LOWER(e.name) = LOWER(?))
+            SELECT a.*, -f.bm25 AS bm25 FROM (
+                SELECT rowid, bm25(articles_fts, 2.0, 1.0) AS bm25 FROM articles_fts
+                WHERE articles_fts MATCH ? AND rowid > ?
+                ORDER BY bm25
+                LIMIT ?
+            ) f
+            JOIN articles a ON a.rowid = f.rowid
+            ORDER BY f.bm25
+            """, (" OR ".join(f'"{t}"' for t in selected), since, limit)
+        )
+        return self._scored_articles(cur.fetchall(), "bm25")
+
+    def score_entity_matches(self, lookups: List[Tuple[str, str, float]], limit: int = 20) -> List[Dict[str, Any]]:
+        # One statement for all entity lookups of a query. lookups: (entity type, name or normalized, weight);
+        # SECTOR lookups match sector entities by name or the article category, like list_news_by_sector.
+        # Each lookup contributes its `limit` most recent articles; an article's score is the sum of the
+        # weights of the lookups that returned it.
+        if not lookups:
+            return []
+        values = ", ".join(["(?, ?, ?, ?, ?)"] * len(lookups))
+        args: List[Any] = []
+        for n, (etype, name, weight) in enumerate(lookups):
+            if etype == "SECTOR":
+                args += [n, None, None, _key(name), weight]
+            else:
+                args += [n, etype, _key(name), None, weight]
+        cur = self.conn.cursor()
+        cur.execute(
+            f"""
+            WITH lookups (n, etype, ekey, sector, w) AS (VALUES {values}),
+            matches AS (
+                SELECT l.n, ae.article_id AS id, l.w FROM lookups l
+                JOIN entities e ON e.key = l.ekey AND e.type = l.etype
+                JOIN article_entities ae ON ae.entity_id = e.id
+                UNION
+                SELECT l.n, ae.article_id, l.w FROM lookups l
+                JOIN entities e ON e.name_key = l.sector AND e.type = 'SECTOR'
+                JOIN article_entities ae ON ae.entity_id = e.id
+                UNION
+                SELECT l.n, a.id, l.w FROM lookups l
+                JOIN articles a ON a.category = l.sector COLLATE NOCASE
+            ),
+            ranked AS (
+                SELECT m.id, m.w, ROW_NUMBER() OVER (PARTITION BY m.n ORDER BY a.published_at DESC) AS r
+                FROM matches m JOIN articles a ON a.id = m.id
             )
-            ORDER BY a.published_at DESC
-            LIMIT ?
-            """,
-            (entity_type, name_or_normalized, name_or_normalized, limit)
+            SELECT a.*, SUM(ranked.w) AS entity_score FROM ranked
+            JOIN articles a ON a.id = ranked.id
+            WHERE ranked.r <= ?
+            GROUP BY a.id
+            ORDER BY entity_score DESC, a.published_at DESC
+            """, args + [limit]
         )
-        return [dict(r) for r in cur.fetchall()]
+        return self._scored_articles(cur.fetchall(), "entity_score")
+
+    def get_articles(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return {}
+        cur = self.conn.cursor()
+        cur.execute(f"SELECT * FROM articles WHERE id IN ({', '.join('?' * len(ids))})", ids)
+        out = {}
+        for row in cur.fetchall():
+            d = dict(row)
+            d["metadata"] = self._deserialize_metadata(d.get("metadata"))
+            out[d["id"]] = d
+        return out
+
+    def _scored_articles(self, rows, score_column: str) -> List[Dict[str, Any]]:
+        out = []
+        for r in rows:
+            d = dict(r)
+            score = d.pop(score_column)
+            d["metadata"] = self._deserialize_metadata(d.get("metadata"))
+            out.append({"article": d, "score": score})
+        return out
 
     def list_news_by_company(self, company_name: str, limit: int = 20) -> List[Dict[str, Any]]:
         return self.list_news_by_entity("COMPANY", company_name, limit)
@@ -175,3 +485,15 @@ class Database:
                 except Exception:
                     return None
         return None
+
+
+def _key(value: Optional[str]) -> Optional[str]:
+    # Same ASCII-only case folding as SQLite's LOWER() / NOCASE
+    if value is None:
+        return None
+    return value.translate(_ASCII_LOWER)
+
+
+_FTS_TERM_RE = re.compile(r"\w+")
+_FTS_DF_SAMPLE = 20000
+_ASCII_LOWER = str.maketrans("ABCDEFGHIJKLMNOPQRSTUVWXYZ", "abcdefghijklmnopqrstuvwxyz")
@@ -0,0 +1,226 @@
+import sqlite3
+from typing import Any, Dict, List, Optional, Sequence
+import hashlib
+import os
+import threading
+import numpy as np
+from ..utils.minhash import band_keys, estimate_jaccard, jaccard
+from .database import TimedConnection
+
+
+def content_fingerprint(title: str, content: str) -> str:
+    text = " ".join((title + "\n" + content).lower().split())
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class DedupIndex:
+    # Persistent record of already-stored stories so repeated RSS polls only pay for new articles.
+    # Exact matches (article id or content fingerprint) are plain key lookups; near-duplicates are
+    # found through MinHash LSH buckets and verified against the stored signatures / embeddings.
+    # exact=True also keeps each entry's token sets and verifies candidates by exact Jaccard, as the
+    # in-batch grouping does (used for the streaming pipeline's run-scoped index).
+    _CHUNK = 500
+
+    def __init__(self, path: str, bands: int = 32, rows: int = 4, exact: bool = False):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.bands = bands
+        self.rows = rows
+        self.exact = exact
+        self.conn = sqlite3.connect(path, check_same_thread=False, factory=TimedConnection)
+        # Same settings as news.db: streaming ingest commits once per micro-batch, without an fsync each
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA cache_size=-65536")
+        self._lock = threading.Lock()
+        self._init()
+
+    def _init(self):
+        cur = self.conn.cursor()
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS seen (
+            key TEXT PRIMARY KEY,
+            article_id TEXT
+        );
+        """)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS signatures (
+            article_id TEXT PRIMARY KEY,
+            event_key TEXT,
+            full_sig BLOB,
+            title_sig BLOB,
+            embedding BLOB
+        );
+        """)
+        cur.execute("""
+        CREATE TABLE IF NOT EXISTS lsh_buckets (
+            band INTEGER,
+            bucket INTEGER,
+            article_id TEXT
+        );
+        """)
+        # One row per (band, bucket, id), so re-adding an id adds nothing. Files written before the unique
+        # key may hold repeats, which go first; the unique index also serves the (band, bucket) lookups.
+        if cur.execute("SELECT 1 FROM sqlite_master WHERE name = 'ux_lsh_buckets'").fetchone() is None:
+            cur.execute("DELETE FROM lsh_buckets WHERE rowid NOT IN "
+                        "(SELECT MIN(rowid) FROM lsh_buckets GROUP BY band, bucket, article_id)")
+            cur.execute("CREATE UNIQUE INDEX ux_lsh_buckets ON lsh_buckets(band, bucket, article_id)")
+            cur.execute("DROP INDEX IF EXISTS idx_lsh_buckets")
+        cur.execute("CREATE INDEX IF NOT EXISTS idx_signatures_event ON signatures(event_key)")
+        if self.exact:
+            cur.execute("""
+            CREATE TABLE IF NOT EXISTS token_sets (
+                article_id TEXT PRIMARY KEY,
+                full_tokens TEXT,
+                title_tokens TEXT
+            );
+            """)
+        self.conn.commit()
+
+    def known(self, ids: Sequence[str], fingerprints: Sequence[str]) -> List[Optional[str]]:
+        # Stored article id each input maps to (by id or content fingerprint), else None
+        keys = {}
+        for pos, (aid, fp) in enumerate(zip(ids, fingerprints)):
+            keys.setdefault(f"id:{aid}", []).append(pos)
+            keys.setdefault(f"fp:{fp}", []).append(pos)
+        out: List[Optional[str]] = [None] * len(ids)
+        with self._lock:
+            for chunk in self._chunks(list(keys)):
+                rows = self.conn.execute(
+                    f"SELECT key, article_id FROM seen WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, aid in rows:
+                    for pos in keys[key]:
+                        out[pos] = out[pos] or aid
+        return out
+
+    def find_near_duplicates(self, event_keys: Sequence[Optional[str]], full_sigs: np.ndarray,
+                             title_sigs: np.ndarray, embeddings: np.ndarray, cos_threshold: float,
+                             full_jaccard_threshold: float, title_jaccard_threshold: float,
+                             full_tokens: Optional[Sequence[set]] = None,
+                             title_tokens: Optional[Sequence[set]] = None) -> List[Optional[str]]:
+        # Earliest added matching entry per input, else None. full_tokens / title_tokens are required with exact=True.
+        n = len(event_keys)
+        out: List[Optional[str]] = [None] * n
+        if n == 0:
+            return out
+        full_keys = band_keys(full_sigs, self.bands, self.rows)
+        title_keys = band_keys(title_sigs, self.bands, self.rows)
+        with self._lock:
+            for i in range(n):
+                cands = self._bucket_members(full_keys[i], title_keys[i])
+                if event_keys[i]:
+                    row = self.conn.execute(
+                        "SELECT article_id FROM signatures WHERE event_key = ? ORDER BY rowid LIMIT 1", (event_keys[i],)
+                    ).fetchone()
+                    if row:
+                        cands.append(row[0])
+                if not cands:
+                    continue
+                rows = list(self._signatures(list(set(cands))))
+                # All candidates of an input verified in one vectorized pass; the earliest match wins
+                stored_emb = np.frombuffer(b"".join(r[5] for r in rows), dtype=np.float32).reshape(len(rows), -1)
+                same_event = np.array([bool(event_keys[i]) and r[2] == event_keys[i] for r in rows])
+                hit = same_event | (stored_emb @ embeddings[i] >= cos_threshold)
+                if self.exact:
+                    tokens = self._token_sets([r[1] for r in rows])
+                    hit |= np.array([jaccard(tokens[r[1]][0], full_tokens[i]) >= full_jaccard_threshold
+                                     or jaccard(tokens[r[1]][1], title_tokens[i]) >= title_jaccard_threshold
+                                     for r in rows])
+                else:
+                    stored_full = np.frombuffer(b"".join(r[3] for r in rows), dtype=np.uint32).reshape(len(rows), -1)
+                    stored_title = np.frombuffer(b"".join(r[4] for r in rows), dtype=np.uint32).reshape(len(rows), -1)
+                    hit |= (estimate_jaccard(stored_full, full_sigs[i]) >= full_jaccard_threshold) \
+                        | (estimate_jaccard(stored_title, title_sigs[i]) >= title_jaccard_threshold)
+                match = np.flatnonzero(hit)
+                if len(match):
+                    out[i] = min((rows[m] for m in match), key=lambda r: r[0])[1]
+        return out
+
+    def add(self, entries: Dict[str, Any]):
+        # entries: ids, event_keys, full_sigs, title_sigs, embeddings for stored articles, plus
+        # seen: (fingerprint-or-id key, stored article id) pairs covering their in-batch duplicates
+        ids = entries.get("ids", [])
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.executemany("INSERT OR REPLACE INTO seen (key, article_id) VALUES (?, ?)", entries.get("seen", []))
+            if ids:
+                full_sigs = np.ascontiguousarray(entries["full_sigs"], dtype=np.uint32)
+                title_sigs = np.ascontiguousarray(entries["title_sigs"], dtype=np.uint32)
+                embs = np.ascontiguousarray(entries["embeddings"], dtype=np.float32)
+                cur.executemany(
+                    "INSERT OR REPLACE INTO signatures (article_id, event_key, full_sig, title_sig, embedding) VALUES (?, ?, ?, ?, ?)",
+                    [(aid, ek, full_sigs[i].tobytes(), title_sigs[i].tobytes(), embs[i].tobytes())
+                     for i, (aid, ek) in enumerate(zip(ids, entries["event_keys"]))]
+                )
+                rows = []
+                id_col = np.asarray(ids, dtype=object)
+                for keys, offset in ((band_keys(full_sigs, self.bands, self.rows), 0),
+                                     (band_keys(title_sigs, self.bands, self.rows), self.bands)):
+                    bands = np.tile(np.arange(offset, offset + keys.shape[1]), len(ids))
+                    rows.extend(zip(bands.tolist(), keys.ravel().tolist(), np.repeat(id_col, keys.shape[1]).tolist()))
+                cur.executemany("INSERT OR IGNORE INTO lsh_buckets (band, bucket, article_id) VALUES (?, ?, ?)", rows)
+                if self.exact:
+                    cur.executemany(
+                        "INSERT OR REPLACE INTO token_sets (article_id, full_tokens, title_tokens) VALUES (?, ?, ?)",
+                        [(aid, " ".join(f), " ".join(t))
+                         for aid, f, t in zip(ids, entries["full_tokens"], entries["title_tokens"])]
+                    )
+            self.conn.commit()
+
+    def remove(self, article_ids: Sequence[str]) -> Dict[str, int]:
+        # Forget deleted articles: they are no longer "known" to skip_known, nor near-duplicate leaders
+        return self._delete("IN", article_ids)
+
+    def prune(self, stored_ids: Sequence[str]) -> Dict[str, int]:
+        # Drop every entry whose article is not in stored_ids (all ids left in news.db)
+        return self._delete("NOT IN", stored_ids)
+
+    def _delete(self, op: str, article_ids: Sequence[str]) -> Dict[str, int]:
+        removed = {}
+        with self._lock:
+            cur = self.conn.cursor()
+            cur.execute("CREATE TEMP TABLE IF NOT EXISTS _ids (id TEXT PRIMARY KEY)")
+            cur.execute("DELETE FROM _ids")
+            cur.executemany("INSERT OR IGNORE INTO _ids (id) VALUES (?)", [(aid,) for aid in article_ids])
+            for table in ("seen", "signatures", "lsh_buckets") + (("token_sets",) if self.exact else ()):
+                cur.execute(f"DELETE FROM {table} WHERE article_id {op} (SELECT id FROM _ids)")
+                removed[table] = cur.rowcount
+            cur.execute("DELETE FROM _ids")
+            self.conn.commit()
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            seen = self.conn.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+            sigs = self.conn.execute("SELECT COUNT(*) FROM signatures").fetchone()[0]
+        return {"seen_keys": seen, "signatures": sigs}
+
+    def _bucket_members(self, full_keys: np.ndarray, title_keys: np.ndarray) -> List[str]:
+        clauses = [(b, int(k)) for b, k in enumerate(full_keys)] + [(self.bands + b, int(k)) for b, k in enumerate(title_keys)]
+        where = " OR ".join(["(band = ? AND bucket = ?)"] * len(clauses))
+        params = [v for c in clauses for v in c]
+        rows = self.conn.execute(f"SELECT DISTINCT article_id FROM lsh_buckets WHERE {where}", params).fetchall()
+        return [r[0] for r in rows]
+
+    def _signatures(self, ids: List[str]):
+        for chunk in self._chunks(ids):
+            yield from self.conn.execute(
+                "SELECT rowid, article_id, event_key, full_sig, title_sig, embedding FROM signatures "
+                f"WHERE article_id IN ({','.join('?' * len(chunk))})",
+                chunk
+            ).fetchall()
+
+    def _token_sets(self, ids: List[str]) -> Dict[str, tuple]:
+        out = {}
+        for chunk in self._chunks(ids):
+            for aid, full, title in self.conn.execute(
+                f"SELECT article_id, full_tokens, title_tokens FROM token_sets WHERE article_id IN ({','.join('?' * len(chunk))})",
+                chunk
+            ):
+                out[aid] = (set(full.split()), set(title.split()))
+        return out
+
+    def _chunks(self, items: List[Any]):
+        for s in range(0, len(items), self._CHUNK):
+            yield items[s:s + self._CHUNK]
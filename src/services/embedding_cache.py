@@ -0,0 +1,88 @@
+import sqlite3
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+import hashlib
+import os
+import threading
+import numpy as np
+
+
+def text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class EmbeddingCache:
+    # Content-addressed embedding cache: in-process LRU in front of an optional SQLite store,
+    # keyed by (model, hash of the exact input text).
+    def __init__(self, path: Optional[str] = None, max_items: int = 10000):
+        self.path = path
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self._lru: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.conn = None
+        if path:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self.conn = sqlite3.connect(path, check_same_thread=False)
+            self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT,
+                text_hash TEXT,
+                vector BLOB,
+                PRIMARY KEY (model, text_hash)
+            );
+            """)
+            self.conn.commit()
+
+    def get_many(self, model: str, hashes: Sequence[str]) -> Dict[str, np.ndarray]:
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            missing = []
+            for h in hashes:
+                v = self._lru.get((model, h))
+                if v is not None:
+                    self._lru.move_to_end((model, h))
+                    found[h] = v
+                else:
+                    missing.append(h)
+            if self.conn is not None and missing:
+                for s in range(0, len(missing), 500):
+                    chunk = missing[s:s + 500]
+                    rows = self.conn.execute(
+                        f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({','.join('?' * len(chunk))})",
+                        [model] + chunk
+                    ).fetchall()
+                    for h, blob in rows:
+                        v = np.frombuffer(blob, dtype=np.float32)
+                        found[h] = v
+                        self._remember((model, h), v)
+            # Per input position: a cached text repeated in the batch is a hit each time
+            hits = sum(h in found for h in hashes)
+            self.hits += hits
+            self.misses += len(hashes) - hits
+        return found
+
+    def put_many(self, model: str, items: Dict[str, np.ndarray]):
+        if not items:
+            return
+        with self._lock:
+            for h, v in items.items():
+                self._remember((model, h), np.asarray(v, dtype=np.float32))
+            if self.conn is not None:
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, text_hash, vector) VALUES (?, ?, ?)",
+                    [(model, h, np.asarray(v, dtype=np.float32).tobytes()) for h, v in items.items()]
+                )
+                self.conn.commit()
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+                "memory_items": len(self._lru)}
+
+    def _remember(self, key: tuple, v: np.ndarray):
+        self._lru[key] = v
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_items:
+            self._lru.popitem(last=False)
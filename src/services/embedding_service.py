@@ -1,7 +1,60 @@
-from typing import List
+from typing import List, Optional
+import numpy as np
+from .embedding_cache import EmbeddingCache, text_hash
+from .metrics import metrics
+
+# Fallback embedder: tokens are runs of [a-z0-9%] after lowercasing, with a break between a digit
+# and a following letter (25bps -> 25 bps). A batch is joined with \x00 and tokenized/hashed as one
+# uint8 array. A token's hash is sum((byte + 1) * P^offset) mod 2^32, computed for all tokens at once
+# as a segment sum of (byte + 1) * P^position scaled back by P^-start; stable across processes.
+_POLY = 0x01000193
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_INV_POLY = pow(_POLY, -1, 1 << 32)
+_BLOCK_BITS = 16
+_pow_tables = {}
+
+
+def _pow_table(base: int, n: int) -> np.ndarray:
+    t = np.full(n, base, dtype=np.uint32)
+    t[0] = 1
+    return np.cumprod(t, dtype=np.uint32)
+
+
+def _tables(base: int, nblocks: int):
+    low, high = _pow_tables.get(base, (None, None))
+    if low is None or len(high) < nblocks:
+        low = _pow_table(base, 1 << _BLOCK_BITS)
+        high = _pow_table(pow(base, 1 << _BLOCK_BITS, 1 << 32), max(64, 2 * nblocks))
+        _pow_tables[base] = (low, high)
+    return low, high
+
+
+def _powers(positions: np.ndarray, base: int = _POLY) -> np.ndarray:
+    # base^pos mod 2^32 as base^(pos % 2^16) * (base^(2^16))^(pos >> 16), from two cached tables
+    low, high = _tables(base, (int(positions.max()) >> _BLOCK_BITS) + 1 if len(positions) else 1)
+    return low[positions & ((1 << _BLOCK_BITS) - 1)] * high[positions >> _BLOCK_BITS]
+
+
+def _power_range(n: int, base: int = _POLY) -> np.ndarray:
+    # base^0 .. base^(n-1), as the outer product of the two tables
+    nblocks = (n >> _BLOCK_BITS) + 1
+    low, high = _tables(base, nblocks)
+    return (high[:nblocks, None] * low[None, :]).reshape(-1)[:n]
+
+
+def _finalize(h: np.ndarray) -> np.ndarray:
+    h = h ^ (h >> np.uint64(33))
+    h = h * _MIX
+    return h ^ (h >> np.uint64(29))
+
+
+def _bucket(h: np.ndarray, dim: int) -> np.ndarray:
+    # Maps a 64-bit hash to [0, dim) from its top 32 bits (multiply-shift, no modulo)
+    return (((h >> np.uint64(32)) * np.uint64(dim)) >> np.uint64(32)).astype(np.int64)
+
 
 class EmbeddingService:
-    def __init__(self, model_name: str):
+    def __init__(self, model_name: str, cache_path: Optional[str] = None, cache_size: int = 10000):
         self.model_name = model_name
         self._model = None
         try:
@@ -11,32 +64,77 @@ class EmbeddingService:
         except Exception:
             self._model = None
             self.dim = 384
+        # Fallback vectors are not comparable with model vectors, so they get their own cache namespace
+        self.cache_key = model_name if self._model is not None else f"{model_name}:fallback-v2:{self.dim}"
+        self.cache = EmbeddingCache(cache_path, cache_size)
 
     def embed(self, texts: List[str]) -> List[List[float]]:
+        return [row.tolist() for row in self._embed_rows(texts)]
+
+    def embed_array(self, texts: List[str]) -> np.ndarray:
+        # float32 matrix, one row per text; no per-element Python lists
+        rows = self._embed_rows(texts)
+        return np.stack(rows).astype(np.float32, copy=False) if rows else np.zeros((0, 0), dtype=np.float32)
+
+    def _embed_rows(self, texts: List[str]) -> List[np.ndarray]:
+        hashes = [text_hash(t) for t in texts]
+        found = self.cache.get_many(self.cache_key, hashes)
+        # Only texts missing from the cache reach the model (each distinct text once)
+        todo = {}
+        hits = 0
+        for h, t in zip(hashes, texts):
+            if h in found:
+                hits += 1
+            elif h not in todo:
+                todo[h] = t
+        metrics.count("embed_calls")
+        metrics.count("embed_texts", len(texts))
+        metrics.count("embed_cache_hits", hits)
+        if todo:
+            metrics.count("embed_encoded", len(todo))
+            computed = dict(zip(todo, self._encode(list(todo.values()))))
+            self.cache.put_many(self.cache_key, computed)
+            found.update(computed)
+        return [found[h] for h in hashes]
+
+    def _encode(self, texts: List[str]):
         if self._model is not None:
-            return [v.tolist() for v in self._model.encode(texts, convert_to_numpy=True, normalize_embeddings=True)]
-        return [self._fallback_embed(t) for t in texts]
+            return list(self._model.encode(texts, convert_to_numpy=True, normalize_embeddings=True))
+        return list(self._fallback_embed_batch(texts))
 
     def _fallback_embed(self, text: str) -> List[float]:
-        tokens = self._tokenize(text)
-        vec = [0.0] * self.dim
-        for i, tok in enumerate(tokens):
-            idx = (hash(tok) % self.dim)
-            vec[idx] += 1.0
-            if i + 1 < len(tokens):
-                bigram = tok + "_" + tokens[i + 1]
-                bidx = (hash(bigram) % self.dim)
-                vec[bidx] += 0.5
-        norm = sum(v * v for v in vec) ** 0.5
-        if norm > 0:
-            vec = [v / norm for v in vec]
-        return vec
-
-    def _tokenize(self, text: str) -> List[str]:
-        import re
-        text = text.lower()
-        # Basic cleanup of numbers like 25bps -> 25 bps, 0.25% -> 0.25 %
-        text = re.sub(r"(\d)([a-zA-Z]+)", r"\1 \2", text)
-        text = re.sub(r"[^a-z0-9%]+", " ", text)
-        toks = [t for t in text.split() if t]
-        return toks
+        return self._fallback_embed_batch([text])[0].tolist()
+
+    def _fallback_embed_batch(self, texts: List[str], chunk: int = 256) -> np.ndarray:
+        # Chunks keep the per-byte work arrays cache-sized
+        if len(texts) > chunk:
+            return np.concatenate([self._fallback_embed_batch(texts[s:s + chunk], chunk) for s in range(0, len(texts), chunk)])
+        # Hashing trick: unigram -> +1.0, adjacent bigram -> +0.5 in a `dim`-wide vector, L2-normalized
+        n = len(texts)
+        joined = "\x00".join(texts)
+        if joined.count("\x00") != n - 1:
+            joined = "\x00".join(t.replace("\x00", " ") for t in texts)
+        raw = np.frombuffer(joined.lower().encode("utf-8"), dtype=np.uint8)
+        letter = (raw - np.uint8(ord("a"))) < 26
+        digit = (raw - np.uint8(ord("0"))) < 10
+        token = letter | digit | (raw == ord("%"))
+        start = token.copy()
+        start[1:] &= ~token[:-1] | (digit[:-1] & letter[1:])
+        starts = np.flatnonzero(start)
+        if not len(starts):
+            return np.zeros((n, self.dim), dtype=np.float32)
+
+        # Separator bytes contribute 0, so token sums are differences of one running sum at token ends
+        csum = np.cumsum((raw.astype(np.uint32) + np.uint32(1)) * token * _power_range(len(raw)), dtype=np.uint32)
+        sums = np.diff(csum[np.append(starts[1:] - 1, len(raw) - 1)], prepend=np.uint32(0))
+        h = _finalize((sums * _powers(starts, _INV_POLY)).astype(np.uint64))
+        rows = np.searchsorted(np.flatnonzero(raw == 0), starts)
+        same = rows[1:] == rows[:-1]
+        bigram = _finalize(h[:-1][same] * _MIX + h[1:][same])
+        flat = np.concatenate([rows * self.dim + _bucket(h, self.dim),
+                               rows[:-1][same] * self.dim + _bucket(bigram, self.dim)])
+        weights = np.concatenate([np.ones(len(h), dtype=np.float32), np.full(len(bigram), 0.5, dtype=np.float32)])
+        m = np.bincount(flat, weights, minlength=n * self.dim).astype(np.float32).reshape(n, self.dim)
+        norms = np.sqrt(np.einsum("ij,ij->i", m, m))
+        m /= np.where(norms == 0, 1.0, norms)[:, None]
+        return m
@@ -0,0 +1,124 @@
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+import itertools
+import logging
+import queue
+import threading
+import time
+import uuid
+
+
+logger = logging.getLogger("ingestion_worker")
+
+
+class IngestionJob:
+    def __init__(self, state: Dict[str, Any]):
+        self.id = uuid.uuid4().hex[:12]
+        self.state = state
+        self.status = "queued"
+        self.stage: Optional[str] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._done.wait(timeout)
+
+    def to_dict(self) -> Dict[str, Any]:
+        out = {"job_id": self.id, "mode": self.state.get("mode"), "status": self.status, "stage": self.stage,
+               "submitted_at": self.submitted_at, "started_at": self.started_at, "finished_at": self.finished_at,
+               "error": self.error}
+        if self.result is not None:
+            # Whole-list graph state, or a streaming run summary that already carries the counts
+            out["ingested"] = self.result.get("ingested", len(self.result.get("parsed_articles", [])))
+            out["unique"] = self.result.get("unique", len(self.result.get("unique_articles", [])))
+        return out
+
+
+class IngestionWorker:
+    # Runs news_graph jobs one at a time on a dedicated thread, off the API event loop. The queue is
+    # bounded: submit() raises queue.Full instead of piling up work. Finished jobs are kept (up to
+    # `keep_finished`) so their status can still be read. With a StreamingNewsPipeline, jobs run in
+    # micro-batches and report counts after every stored batch.
+    def __init__(self, news_graph, max_queue: int = 8, keep_finished: int = 100, pipeline=None):
+        self.news_graph = news_graph
+        self.pipeline = pipeline
+        self.keep_finished = keep_finished
+        self.jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._queue: "queue.Queue[Optional[IngestionJob]]" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._loop, name="ingestion-worker", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout)
+        if self.pipeline is not None:
+            self.pipeline.close()
+
+    def submit(self, state: Dict[str, Any]) -> IngestionJob:
+        self.start()
+        job = IngestionJob(state)
+        with self._lock:
+            self._queue.put_nowait(job)
+            self.jobs[job.id] = job
+            self._trim()
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def pending(self, mode: Optional[str] = None) -> int:
+        with self._lock:
+            return sum(1 for j in self.jobs.values()
+                       if j.status in ("queued", "running") and (mode is None or j.state.get("mode") == mode))
+
+    def _loop(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            job.status, job.started_at = "running", time.time()
+            try:
+                if self.pipeline is not None:
+                    job.result = self.pipeline.run(job.state, on_batch=lambda summary: self._progress(job, summary))
+                else:
+                    result: Dict[str, Any] = {}
+                    # Streaming node updates lets the status endpoint report the stage that last finished
+                    for update in self.news_graph.stream(job.state, stream_mode="updates"):
+                        for node, value in update.items():
+                            job.stage = node
+                            if value:
+                                result.update(value)
+                    job.result = result
+                job.status = "done"
+            except Exception as e:
+                logger.exception("Ingestion job %s failed", job.id)
+                job.error, job.status = f"{type(e).__name__}: {e}", "failed"
+            finally:
+                if job.state.get("mode") == "ingest_rss":
+                    self._finish_rss(job.status == "done")
+                job.finished_at = time.time()
+                job._done.set()
+
+    def _finish_rss(self, ok: bool):
+        # Feed validators only advance once the polled items are stored
+        from ..utils.rss_parser import finish_rss_ingest
+        finish_rss_ingest(ok)
+
+    def _progress(self, job: IngestionJob, summary: Dict[str, Any]):
+        job.stage, job.result = f"batch {summary['batches']}", summary
+
+    def _trim(self):
+        finished = [jid for jid, j in self.jobs.items() if j.status in ("done", "failed")]
+        for jid in itertools.islice(finished, max(0, len(finished) - self.keep_finished)):
+            del self.jobs[jid]
@@ -1,9 +1,193 @@
-from typing import Optional
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import json
+import logging
+import threading
+from .query_cache import normalize_query
+
+logger = logging.getLogger("llm_service")
+
+_PROMPT = ("For the search query below, explain in one sentence for each numbered news article why it is "
+           "relevant to the query. Answer with a JSON array of strings only, one per article, in order.\n\n"
+           "Query: {query}\n\n{articles}")
+
+
+def build_prompt(query: str, articles: List[Dict[str, Any]]) -> str:
+    # One prompt covers a whole chunk of hits
+    lines = [f"{i}. {a.get('title', '')}\n{(a.get('content') or '')[:300]}" for i, a in enumerate(articles, 1)]
+    return _PROMPT.format(query=query, articles="\n\n".join(lines))
+
+
+def parse_explanations(text: str, n: int) -> List[Optional[str]]:
+    try:
+        items = json.loads(text[text.index("["):text.rindex("]") + 1])
+    except ValueError:
+        return [None] * n
+    out = [str(x) if isinstance(x, str) and x.strip() else None for x in items[:n]]
+    return out + [None] * (n - len(out))
+
+
+class _HTTPClient:
+    # Chat API over httpx; one AsyncClient, created on the service's event loop
+    def __init__(self, api_key: Optional[str], model: str):
+        self.api_key = api_key
+        self.model = model
+        self._http = None
+
+    async def explain(self, query: str, articles: List[Dict[str, Any]]) -> List[Optional[str]]:
+        if self._http is None:
+            import httpx
+            self._http = httpx.AsyncClient()
+        r = await self._http.post(self.url, headers=self.headers(), json=self.body(build_prompt(query, articles)))
+        r.raise_for_status()
+        return parse_explanations(self.text(r.json()), len(articles))
+
+
+class OpenAIClient(_HTTPClient):
+    url = "https://api.openai.com/v1/chat/completions"
+
+    def headers(self):
+        return {"Authorization": f"Bearer {self.api_key}"}
+
+    def body(self, prompt: str):
+        return {"model": self.model, "temperature": 0, "messages": [{"role": "user", "content": prompt}]}
+
+    def text(self, data) -> str:
+        return data["choices"][0]["message"]["content"]
+
+
+class AnthropicClient(_HTTPClient):
+    url = "https://api.anthropic.com/v1/messages"
+
+    def headers(self):
+        return {"x-api-key": self.api_key or "", "anthropic-version": "2023-06-01"}
+
+    def body(self, prompt: str):
+        return {"model": self.model, "max_tokens": 1024, "messages": [{"role": "user", "content": prompt}]}
+
+    def text(self, data) -> str:
+        return "".join(block.get("text", "") for block in data.get("content", []))
+
+
+def _client_for(provider: str, api_key: Optional[str], model: Optional[str]):
+    if provider == "openai":
+        return OpenAIClient(api_key, model or "gpt-4o-mini")
+    if provider == "anthropic":
+        return AnthropicClient(api_key, model or "claude-3-5-haiku-latest")
+    return None
 
 
 class LLMService:
-    def __init__(self, provider: str = "none"):
+    # Explanations for a list of hits: cached per (query, article id), the rest split into chunks of
+    # batch_size articles (one prompt each) that run concurrently, at most max_concurrency at a time,
+    # each bounded by timeout_sec. Calls run on a private event loop thread, so sync callers (the
+    # query graph), other event loops (streaming routes) and deferred callers all share one limit.
+    # client: anything with `async explain(query, articles) -> [str or None]`; the template otherwise.
+    def __init__(self, provider: str = "none", client=None, api_key: Optional[str] = None,
+                 model: Optional[str] = None, max_concurrency: int = 4, batch_size: int = 5,
+                 timeout_sec: float = 10.0, cache_size: int = 2048):
         self.provider = provider
+        self.client = client if client is not None else _client_for(provider, api_key, model)
+        self.max_concurrency = max_concurrency
+        self.batch_size = max(1, batch_size)
+        self.timeout_sec = timeout_sec
+        self.cache_size = cache_size
+        self.calls = 0
+        self.timeouts = 0
+        self.errors = 0
+        self._cache: "OrderedDict[Tuple[str, Any], str]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._sem: Optional[asyncio.Semaphore] = None
 
     def explain(self, query: str, title: str) -> Optional[str]:
         return f"Relevant because it matches entities/themes in query '{query}'. Article: {title}."
+
+    def explain_batch(self, query: str, articles: List[Dict[str, Any]]) -> List[Optional[str]]:
+        # Blocks for about one round trip when the chunks fit under max_concurrency
+        return self.explain_async(query, articles).result()
+
+    def explain_async(self, query: str, articles: List[Dict[str, Any]]) -> Future:
+        # Deferred delivery: a future of the explanations, in the order of articles
+        out, chunks = self._split(query, articles)
+        if not chunks:
+            done: Future = Future()
+            done.set_result(out)
+            return done
+
+        async def _all():
+            for part in await asyncio.gather(*[self._run_chunk(query, articles, c) for c in chunks]):
+                for pos, text in part:
+                    out[pos] = text
+            return out
+
+        return self._schedule(_all())
+
+    async def stream(self, query: str, articles: List[Dict[str, Any]]):
+        # (article id, explanation) pairs as they become available: cached ones first, then per chunk
+        out, chunks = self._split(query, articles)
+        pending = {pos for c in chunks for pos in c}
+        for pos, text in enumerate(out):
+            if pos not in pending:
+                yield articles[pos].get("id"), text
+        futures = [asyncio.wrap_future(self._schedule(self._run_chunk(query, articles, c))) for c in chunks]
+        for done in asyncio.as_completed(futures):
+            for pos, text in await done:
+                yield articles[pos].get("id"), text
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            cached = len(self._cache)
+        return {"calls": self.calls, "timeouts": self.timeouts, "errors": self.errors, "cached": cached}
+
+    def _split(self, query: str, articles: List[Dict[str, Any]]):
+        # Cached explanations filled in; positions still to explain grouped into prompt-sized chunks
+        if self.client is None:
+            return [self.explain(query, a.get("title", "")) for a in articles], []
+        q = normalize_query(query)
+        out: List[Optional[str]] = [None] * len(articles)
+        missing = []
+        with self._lock:
+            for pos, a in enumerate(articles):
+                key = (q, a.get("id"))
+                if key in self._cache:
+                    self._cache.move_to_end(key)
+                    out[pos] = self._cache[key]
+                else:
+                    missing.append(pos)
+        return out, [missing[s:s + self.batch_size] for s in range(0, len(missing), self.batch_size)]
+
+    async def _run_chunk(self, query: str, articles: List[Dict[str, Any]], chunk: List[int]):
+        if self._sem is None:
+            self._sem = asyncio.Semaphore(self.max_concurrency)
+        async with self._sem:
+            self.calls += 1
+            try:
+                texts = await asyncio.wait_for(self.client.explain(query, [articles[p] for p in chunk]),
+                                               self.timeout_sec)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                logger.warning("LLM explanation timed out after %.1fs", self.timeout_sec)
+                return [(pos, None) for pos in chunk]
+            except Exception:
+                self.errors += 1
+                logger.exception("LLM explanation failed")
+                return [(pos, None) for pos in chunk]
+        texts = (list(texts) + [None] * len(chunk))[:len(chunk)]
+        q = normalize_query(query)
+        with self._lock:
+            for pos, text in zip(chunk, texts):
+                if text is not None:
+                    self._cache[(q, articles[pos].get("id"))] = text
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return list(zip(chunk, texts))
+
+    def _schedule(self, coro) -> Future:
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="llm-service", daemon=True).start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
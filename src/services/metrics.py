@@ -0,0 +1,145 @@
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional, Tuple
+import math
+import threading
+import time
+
+
+class Histogram:
+    # Quantiles over the last `window` observations; count and sum over the process lifetime
+    def __init__(self, window: int = 1024):
+        self.values = deque(maxlen=window)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.values.append(value)
+        self.count += 1
+        self.sum += value
+
+    def quantiles(self, qs: Iterable[float]) -> Dict[float, float]:
+        ordered = sorted(self.values)
+        if not ordered:
+            return {q: math.nan for q in qs}
+        return {q: ordered[min(len(ordered) - 1, int(q * len(ordered)))] for q in qs}
+
+
+class MetricsRegistry:
+    # Counters and rolling histograms keyed by (name, labels), rendered in the Prometheus text format.
+    # stage() attributes what runs on the current thread (SQL statements, embedding calls, dedup
+    # comparisons, reported through count()) to one pipeline stage; with enabled=False every hook
+    # is a flag or thread-local check.
+    QUANTILES = (0.5, 0.9, 0.99)
+
+    def __init__(self, enabled: bool = True, window: int = 1024):
+        self.enabled = enabled
+        self.window = window
+        self._counters: Dict[Tuple[str, tuple], float] = {}
+        self._histograms: Dict[Tuple[str, tuple], Histogram] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def inc(self, name: str, value: float = 1.0, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = Histogram(self.window)
+            hist.observe(value)
+
+    def count(self, key: str, n: float = 1):
+        # Adds to the stage running on this thread, if any
+        stats = getattr(self._local, "stats", None)
+        if stats is not None:
+            stats[key] = stats.get(key, 0) + n
+
+    @contextmanager
+    def stage(self, graph: str, name: str, stats: Optional[dict] = None):
+        # Wall time plus whatever count() collects while the block runs; totals go to the registry
+        if not self.enabled:
+            yield stats if stats is not None else {}
+            return
+        stats = stats if stats is not None else {}
+        outer = getattr(self._local, "stats", None)
+        self._local.stats = stats
+        start = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats["seconds"] = time.perf_counter() - start
+            self._local.stats = outer
+            self.observe("pipeline_stage_seconds", stats["seconds"], graph=graph, stage=name)
+            for key, value in stats.items():
+                if key != "seconds":
+                    self.inc(f"pipeline_{key}_total", value, graph=graph, stage=name)
+
+    def counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get((name, tuple(sorted(labels.items()))), 0.0)
+
+    def summary(self, name: str, **labels) -> Optional[Dict[str, float]]:
+        # count, sum and rolling-window quantiles of one histogram series
+        with self._lock:
+            hist = self._histograms.get((name, tuple(sorted(labels.items()))))
+            if hist is None:
+                return None
+            out = {f"p{int(q * 100)}": v for q, v in hist.quantiles(self.QUANTILES).items()}
+            out.update(count=hist.count, sum=hist.sum)
+            return out
+
+    def snapshot(self) -> Dict[str, dict]:
+        with self._lock:
+            counters = {self._series(n, l): v for (n, l), v in self._counters.items()}
+            histograms = {self._series(n, l): dict({f"p{int(q * 100)}": v for q, v in h.quantiles(self.QUANTILES).items()},
+                                                   count=h.count, sum=h.sum)
+                          for (n, l), h in self._histograms.items()}
+        return {"counters": counters, "histograms": histograms}
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            for name in sorted({n for n, _ in self._counters}):
+                lines.append(f"# TYPE {name} counter")
+                for (n, labels), v in sorted(self._counters.items()):
+                    if n == name:
+                        lines.append(f"{self._series(n, labels)} {v:g}")
+            # Histograms are exposed as summaries: rolling-window quantiles, lifetime _sum and _count
+            for name in sorted({n for n, _ in self._histograms}):
+                lines.append(f"# TYPE {name} summary")
+                for (n, labels), h in sorted(self._histograms.items()):
+                    if n != name:
+                        continue
+                    for q, v in h.quantiles(self.QUANTILES).items():
+                        lines.append(f"{self._series(n, labels + (('quantile', str(q)),))} {v:g}")
+                    lines.append(f"{self._series(n + '_sum', labels)} {h.sum:g}")
+                    lines.append(f"{self._series(n + '_count', labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    @staticmethod
+    def _series(name: str, labels: tuple) -> str:
+        if not labels:
+            return name
+        body = ",".join(f'{k}="{_escape(v)}"' for k, v in labels)
+        return f"{name}{{{body}}}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+metrics = MetricsRegistry()
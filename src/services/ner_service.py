@@ -1,9 +1,11 @@
-import re
-from typing import List, Dict
+from typing import List, Dict, Optional
+from ..utils.keyword_matcher import KeywordMatcher
 
 
 class NERService:
-    def __init__(self):
+    def __init__(self, company_keywords: Optional[List[str]] = None, regulator_keywords: Optional[List[str]] = None,
+                 sector_keywords: Optional[List[str]] = None, batch_size: int = 64, n_process: int = 1,
+                 max_chars: int = 20000):
         self.nlp = None
         try:
             import spacy
@@ -13,31 +15,62 @@ class NERService:
                 self.nlp = spacy.load("en_core_web_sm")
         except Exception:
             self.nlp = None
-        self.company_keywords = [
+        if self.nlp is not None:
+            self._disable_unused_pipes()
+        # nlp.pipe settings; spaCy only sees the first `max_chars` characters of a text
+        self.batch_size = batch_size
+        self.n_process = n_process
+        self.max_chars = max_chars
+        self.company_keywords = company_keywords or [
             "HDFC Bank", "ICICI Bank", "SBI", "State Bank of India", "Kotak", "Kotak Mahindra Bank", "Axis Bank",
             "TCS", "Infosys", "Wipro", "HCL Tech", "Sun Pharma", "Dr. Reddy's", "Cipla", "Tata Motors", "Maruti", "M&M",
             "Mahindra", "Reliance", "ONGC", "NTPC"
         ]
-        self.regulator_keywords = ["RBI", "Reserve Bank of India", "SEBI", "Finance Ministry"]
-        self.sector_keywords = [
+        self.regulator_keywords = regulator_keywords or ["RBI", "Reserve Bank of India", "SEBI", "Finance Ministry"]
+        self.sector_keywords = sector_keywords or [
             "Banking", "Financial Services", "IT", "Information Technology", "Pharma", "Automobile", "Auto", "Energy"
         ]
+        self.build_matcher()
+
+    def build_matcher(self):
+        # Gazetteer compiled once; call again after changing the keyword lists
+        self.matcher = KeywordMatcher(
+            [("COMPANY", kw) for kw in self.company_keywords]
+            + [("REGULATOR", kw) for kw in self.regulator_keywords]
+            + [("SECTOR", kw) for kw in self.sector_keywords]
+        )
+
+    def _disable_unused_pipes(self):
+        # Only doc.ents is used: keep "ner" and the embedding layer it listens to (if any)
+        keep = {"ner"}
+        for name in ("tok2vec", "transformer"):
+            if name in self.nlp.pipe_names and "ner" in getattr(self.nlp.get_pipe(name), "listening_components", []):
+                keep.add(name)
+        self.nlp.select_pipes(disable=[p for p in self.nlp.pipe_names if p not in keep])
 
     def extract(self, text: str) -> List[Dict]:
+        return self.extract_many([text])[0]
+
+    def extract_many(self, texts: List[str]) -> List[List[Dict]]:
+        docs = [None] * len(texts)
+        if self.nlp and texts:
+            n_process = self.n_process if len(texts) > self.batch_size else 1
+            docs = self.nlp.pipe((t[:self.max_chars] for t in texts), batch_size=self.batch_size, n_process=n_process)
+        return [self._entities(text, doc) for text, doc in zip(texts, docs)]
+
+    def _entities(self, text: str, doc) -> List[Dict]:
         ents = []
-        if self.nlp:
-            doc = self.nlp(text)
+        if doc is not None:
             for e in doc.ents:
-                ents.append({"id": f"{e.label_}:{e.text}", "type": e.label_, "name": e.text, "normalized": self._normalize(e.text)})
-        for kw in self.company_keywords:
-            if re.search(rf"\b{re.escape(kw)}\b", text, re.IGNORECASE):
-                ents.append({"id": f"COMPANY:{kw}", "type": "COMPANY", "name": kw, "normalized": self._normalize(kw)})
-        for kw in self.regulator_keywords:
-            if re.search(rf"\b{re.escape(kw)}\b", text, re.IGNORECASE):
-                ents.append({"id": f"REGULATOR:{kw}", "type": "REGULATOR", "name": kw, "normalized": self._normalize(kw)})
-        for kw in self.sector_keywords:
-            if re.search(rf"\b{re.escape(kw)}\b", text, re.IGNORECASE):
-                ents.append({"id": f"SECTOR:{kw}", "type": "SECTOR", "name": kw, "normalized": self._normalize(kw)})
+                ents.append({"id": f"{e.label_}:{e.text}", "type": e.label_, "name": e.text, "normalized": self._normalize(e.text),
+                             "spans": [[e.start_char, e.end_char]]})
+        # Keyword entities in gazetteer order (companies, regulators, sectors), each with all its spans
+        spans: Dict[tuple, List[List[int]]] = {}
+        for start, end, label, kw in self.matcher.find(text):
+            spans.setdefault((label, kw), []).append([start, end])
+        for label, kw in sorted(spans, key=self.matcher.rank.__getitem__):
+            ents.append({"id": f"{label}:{kw}", "type": label, "name": kw, "normalized": self._normalize(kw),
+                         "spans": spans[(label, kw)]})
         seen = set()
         uniq = []
         for e in ents:
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+import threading
+import time
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+class QueryCache:
+    # Response cache for read endpoints: LRU with a TTL, and entries are only valid for the index
+    # generation they were computed at (StorageIndexingAgent bumps Database.generation after a store)
+    def __init__(self, max_items: int = 1024, ttl_sec: float = 300.0, clock: Callable[[], float] = time.monotonic):
+        self.max_items = max_items
+        self.ttl_sec = ttl_sec
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.invalidated = 0
+        self._lru: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, generation: int) -> Optional[Any]:
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                gen, expires_at, value = entry
+                if gen != generation:
+                    self.invalidated += 1
+                elif expires_at < self.clock():
+                    self.expired += 1
+                else:
+                    self._lru.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._lru[key]
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, generation: int, value: Any):
+        if self.max_items <= 0:
+            return
+        with self._lock:
+            self._lru[key] = (generation, self.clock() + self.ttl_sec, value)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_items:
+                self._lru.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, generation: int, compute: Callable[[], Any]) -> Any:
+        value = self.get(key, generation)
+        if value is None:
+            value = compute()
+            self.put(key, generation, value)
+        return value
+
+    def stats(self) -> Dict[str, float]:
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0,
+                "expired": self.expired, "invalidated": self.invalidated, "items": len(self._lru)}
@@ -0,0 +1,76 @@
+import logging
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger("service_registry")
+
+
+class ServiceRegistry:
+    # Named services built by their factory on first get(), at most once even when several threads
+    # ask at the same time. Factories may get() the services they depend on.
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._loading: set = set()
+        self._errors: Dict[str, str] = {}
+        self._warmup: Optional[threading.Thread] = None
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        self._factories[name] = factory
+        self._locks[name] = threading.Lock()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._factories
+
+    def get(self, name: str) -> Any:
+        if name in self._instances:
+            return self._instances[name]
+        with self._locks[name]:
+            if name not in self._instances:
+                self._loading.add(name)
+                try:
+                    self._instances[name] = self._factories[name]()
+                    self._errors.pop(name, None)
+                except Exception as e:
+                    self._errors[name] = f"{type(e).__name__}: {e}"
+                    raise
+                finally:
+                    self._loading.discard(name)
+        return self._instances[name]
+
+    def loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def peek(self, name: str) -> Any:
+        # The service if it has been built already, without building it
+        return self._instances.get(name)
+
+    def status(self, names: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        out = {}
+        for name in names or self._factories:
+            if name in self._instances:
+                out[name] = "ready"
+            elif name in self._loading:
+                out[name] = "loading"
+            elif name in self._errors:
+                out[name] = "failed: " + self._errors[name]
+            else:
+                out[name] = "not loaded"
+        return out
+
+    def warm_up(self, names: Iterable[str]) -> threading.Thread:
+        # Builds the services on a background thread, in order, so the first request does not pay for it
+        names = list(names)
+
+        def _run():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception:
+                    logger.exception("Warm-up of %s failed", name)
+
+        if self._warmup is None or not self._warmup.is_alive():
+            self._warmup = threading.Thread(target=_run, name="service-warmup", daemon=True)
+            self._warmup.start()
+        return self._warmup
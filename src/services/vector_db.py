@@ -1,12 +1,20 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import os
+from .vector_index import VectorIndex
 
 
 class VectorDB:
-    def __init__(self, persist_path: str, embedder):
+    # store_documents=False keeps only ids, vectors and metadata; documents come from SQLite (db) when asked for
+    def __init__(self, persist_path: str, embedder, index_mode: str = "exact", nprobe: int = 8,
+                 store_documents: bool = False, db=None):
         self.persist_path = persist_path
         self.embedder = embedder
+        self.index_mode = index_mode
+        self.nprobe = nprobe
+        self.store_documents = store_documents
+        self.db = db
         self._collection = None
+        self._index = None
         self._init()
 
     def _init(self):
@@ -22,29 +30,56 @@ class VectorDB:
                 self._collection = client.create_collection(name)
         except Exception:
             self._collection = None
-            self._mem_store = {}
+            # The embedding cache key changes whenever the vectors would (model, fallback version, dim),
+            # so an index built from other vectors is dropped rather than searched
+            model = getattr(self.embedder, "cache_key", getattr(self.embedder, "model_name", ""))
+            self._index = VectorIndex(os.path.join(self.persist_path, "numpy_index"),
+                                      mode=self.index_mode, nprobe=self.nprobe, model=model)
 
-    def add(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]):
+    def add(self, ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]], embeddings=None):
+        if embeddings is None:
+            embeddings = self.embedder.embed_array(documents)
+        self.upsert(ids, embeddings, metadatas, documents)
+
+    def upsert(self, ids: List[str], embeddings, metadatas: List[Dict[str, Any]],
+               documents: Optional[List[str]] = None):
+        # Precomputed embeddings (one row per id); re-ingesting an id replaces its entry
+        if not len(ids):
+            return
+        docs = documents if self.store_documents and documents is not None else None
         if self._collection is not None:
-            embeddings = self.embedder.embed(documents)
-            self._collection.add(ids=ids, embeddings=embeddings, metadatas=metadatas, documents=documents)
+            self._collection.upsert(ids=ids, embeddings=[list(map(float, e)) for e in embeddings],
+                                    metadatas=metadatas, documents=docs)
         else:
-            for i, d, m in zip(ids, documents, metadatas):
-                self._mem_store[i] = {"doc": d, "meta": m}
+            self._index.upsert(ids, embeddings, docs or [None] * len(ids), metadatas)
 
-    def query(self, text: str, top_k: int = 10) -> List[Dict[str, Any]]:
+    def query(self, text: str, top_k: int = 10, include_documents: bool = True) -> List[Dict[str, Any]]:
+        out = []
         if self._collection is not None:
-            q = self._collection.query(query_embeddings=self.embedder.embed([text]), n_results=top_k)
-            out = []
+            include = ["metadatas", "distances"] + (["documents"] if include_documents else [])
+            q = self._collection.query(query_embeddings=self.embedder.embed([text]), n_results=top_k, include=include)
+            docs = (q.get("documents") or [None])[0] or [None] * len(q["ids"][0])
             for i in range(len(q["ids"][0])):
                 out.append({
                     "id": q["ids"][0][i],
                     "distance": q.get("distances", [[0]])[0][i] if q.get("distances") else 0.0,
-                    "document": q["documents"][0][i],
+                    "document": docs[i],
                     "metadata": q["metadatas"][0][i],
                 })
-            return out
-        scored = []
-        for i, v in self._mem_store.items():
-            scored.append({"id": i, "distance": 0.0, "document": v["doc"], "metadata": v["meta"]})
-        return scored[:top_k]
+        else:
+            for aid, score, doc, meta in self._index.search(self.embedder.embed_array([text]), top_k)[0]:
+                # Cosine distance
+                out.append({"id": aid, "distance": 1.0 - score, "document": doc, "metadata": meta})
+        if include_documents:
+            self._fill_documents(out)
+        return out
+
+    def _fill_documents(self, hits: List[Dict[str, Any]]):
+        missing = [h["id"] for h in hits if h["document"] is None]
+        if not missing or self.db is None:
+            return
+        articles = self.db.get_articles(missing)
+        for h in hits:
+            a = articles.get(h["id"])
+            if h["document"] is None and a:
+                h["document"] = a["title"] + "\n" + a["content"]
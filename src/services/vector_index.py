@@ -0,0 +1,200 @@
+from typing import Any, Dict, List, Optional, Tuple
+import json
+import os
+import threading
+import numpy as np
+from ..utils.similarity import as_matrix, topk
+
+
+class VectorIndex:
+    # NumPy nearest-neighbour engine used when chromadb is unavailable.
+    # Embeddings (L2-normalized, float32) live in a growable memory-mapped `embeddings.npy`;
+    # ids / documents / metadata are side arrays replayed from an append-only `records.jsonl`,
+    # so a restart reopens the index without re-embedding anything.
+    # mode="exact": brute-force top-k. mode="ivf": k-means coarse quantizer, only the `nprobe`
+    # nearest cells are scanned (higher nprobe -> higher recall, slower queries).
+    def __init__(self, path: str, mode: str = "exact", nprobe: int = 8, nlist: Optional[int] = None,
+                 ivf_min_size: int = 4096, model: str = ""):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.model = model
+        self.mode = mode
+        self.nprobe = nprobe
+        self.nlist = nlist
+        self.ivf_min_size = ivf_min_size
+        self._lock = threading.RLock()
+        self._matrix: Optional[np.ndarray] = None
+        self._ids: List[str] = []
+        self._docs: List[Optional[str]] = []
+        self._metas: List[Dict[str, Any]] = []
+        self._pos: Dict[str, int] = {}
+        self._centroids: Optional[np.ndarray] = None
+        self._assign: Optional[np.ndarray] = None
+        self._trained_size = 0
+        self._cell_order: Optional[np.ndarray] = None
+        self._cell_bounds: Optional[np.ndarray] = None
+        self._load()
+
+    @property
+    def _emb_path(self) -> str:
+        return os.path.join(self.path, "embeddings.npy")
+
+    @property
+    def _records_path(self) -> str:
+        return os.path.join(self.path, "records.jsonl")
+
+    @property
+    def _manifest_path(self) -> str:
+        return os.path.join(self.path, "manifest.json")
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def upsert(self, ids: List[str], embeddings, documents: List[Optional[str]], metadatas: List[Dict[str, Any]]):
+        embs = as_matrix(embeddings)
+        if not len(ids):
+            return
+        with self._lock:
+            rows = []
+            for i, d, m in zip(ids, documents, metadatas):
+                pos = self._pos.get(i)
+                if pos is None:
+                    pos = self._pos[i] = len(self._ids)
+                    self._ids.append(i)
+                    self._docs.append(d)
+                    self._metas.append(m)
+                else:
+                    self._docs[pos] = d
+                    self._metas[pos] = m
+                rows.append(pos)
+            self._reserve(len(self._ids), embs.shape[1])
+            self._matrix[rows] = embs
+            self._matrix.flush()
+            with open(self._records_path, "a", encoding="utf-8") as f:
+                for pos in rows:
+                    f.write(json.dumps({"id": self._ids[pos], "row": pos, "doc": self._docs[pos], "meta": self._metas[pos]}) + "\n")
+            if self._centroids is not None:
+                self._assign_rows(np.asarray(rows))
+
+    def search(self, queries, k: int) -> List[List[Tuple[str, float, Optional[str], Dict[str, Any]]]]:
+        # Per query: (id, cosine similarity, document, metadata), best first
+        q = as_matrix(queries)
+        with self._lock:
+            n = len(self._ids)
+            if n == 0 or k <= 0:
+                return [[] for _ in range(q.shape[0])]
+            data = self._matrix[:n]
+            if self.mode == "ivf" and n >= self.ivf_min_size:
+                hits = [self._search_ivf(q[r:r + 1], data, k) for r in range(q.shape[0])]
+            else:
+                idx, scores = topk(q, data, k)
+                hits = list(zip(idx.tolist(), scores.tolist()))
+            return [[(self._ids[i], s, self._docs[i], self._metas[i]) for i, s in zip(ix, sc)] for ix, sc in hits]
+
+    def get(self, article_id: str) -> Optional[Tuple[np.ndarray, Optional[str], Dict[str, Any]]]:
+        with self._lock:
+            pos = self._pos.get(article_id)
+            if pos is None:
+                return None
+            return np.array(self._matrix[pos]), self._docs[pos], self._metas[pos]
+
+    def _search_ivf(self, q: np.ndarray, data: np.ndarray, k: int) -> Tuple[List[int], List[float]]:
+        if self._centroids is None or len(self._ids) >= 2 * self._trained_size:
+            self._train(data)
+        if self._cell_order is None:
+            order = np.argsort(self._assign[:len(self._ids)], kind="stable")
+            self._cell_order = order
+            self._cell_bounds = np.searchsorted(self._assign[:len(self._ids)][order], np.arange(len(self._centroids) + 1))
+        cells = topk(q, self._centroids, min(self.nprobe, len(self._centroids)))[0][0]
+        cand = np.concatenate([self._cell_order[self._cell_bounds[c]:self._cell_bounds[c + 1]] for c in cells])
+        if not len(cand):
+            return [], []
+        idx, scores = topk(q, data[cand], k)
+        return cand[idx[0]].tolist(), scores[0].tolist()
+
+    def _train(self, data: np.ndarray, iters: int = 5, sample: int = 50000, seed: int = 0):
+        n = data.shape[0]
+        rng = np.random.default_rng(seed)
+        nlist = min(n, self.nlist or max(1, int(4 * np.sqrt(n))))
+        train = data[rng.choice(n, size=min(n, sample), replace=False)]
+        centroids = train[rng.choice(len(train), size=nlist, replace=False)].copy()
+        for _ in range(iters):
+            assign = topk(train, centroids, 1)[0][:, 0]
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, train)
+            counts = np.bincount(assign, minlength=nlist)
+            centroids[counts > 0] = sums[counts > 0] / counts[counts > 0, None]
+            centroids = as_matrix(centroids)
+        self._centroids = centroids
+        self._trained_size = n
+        self._assign = np.zeros(self._matrix.shape[0], dtype=np.int64)
+        self._assign_rows(np.arange(n))
+
+    def _assign_rows(self, rows: np.ndarray):
+        if self._assign.shape[0] < self._matrix.shape[0]:
+            self._assign = np.concatenate([self._assign, np.zeros(self._matrix.shape[0] - self._assign.shape[0], dtype=np.int64)])
+        self._assign[rows] = topk(self._matrix[rows], self._centroids, 1)[0][:, 0]
+        self._cell_order = None
+
+    def _reserve(self, rows: int, dim: int):
+        # Capacity doubling; the memmap file is re-created at the new size and swapped in
+        if self._matrix is not None and self._matrix.shape[0] >= rows:
+            return
+        cap = max(1024, rows, 2 * (self._matrix.shape[0] if self._matrix is not None else 0))
+        tmp = self._emb_path + ".tmp"
+        grown = np.lib.format.open_memmap(tmp, mode="w+", dtype=np.float32, shape=(cap, dim))
+        if self._matrix is not None:
+            grown[:self._matrix.shape[0]] = self._matrix
+        grown.flush()
+        del grown
+        self._matrix = None
+        os.replace(tmp, self._emb_path)
+        self._matrix = np.lib.format.open_memmap(self._emb_path, mode="r+")
+
+    def _load(self):
+        manifest = {}
+        if os.path.exists(self._manifest_path):
+            with open(self._manifest_path, "r", encoding="utf-8") as f:
+                manifest = json.load(f)
+        if manifest.get("model", self.model) != self.model:
+            # Vectors from another embedding model are not comparable; start over
+            for p in (self._emb_path, self._records_path):
+                if os.path.exists(p):
+                    os.remove(p)
+        with open(self._manifest_path, "w", encoding="utf-8") as f:
+            json.dump({"model": self.model}, f)
+        if not os.path.exists(self._emb_path):
+            return
+        self._matrix = np.lib.format.open_memmap(self._emb_path, mode="r+")
+        if not os.path.exists(self._records_path):
+            return
+        lines = 0
+        with open(self._records_path, "r", encoding="utf-8") as f:
+            for line in f:
+                lines += 1
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    # Torn last line from an interrupted write; its embedding row is simply unused
+                    continue
+                pos = rec["row"]
+                if pos >= self._matrix.shape[0]:
+                    continue
+                if pos == len(self._ids):
+                    self._ids.append(rec["id"])
+                    self._docs.append(rec.get("doc"))
+                    self._metas.append(rec.get("meta") or {})
+                    self._pos[rec["id"]] = pos
+                elif pos < len(self._ids):
+                    self._docs[pos] = rec.get("doc")
+                    self._metas[pos] = rec.get("meta") or {}
+        if lines > 2 * len(self._ids) + 1000:
+            self._compact()
+
+    def _compact(self):
+        # Re-ingests append a record per upsert; rewrite the log with one line per id
+        tmp = self._records_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for pos, aid in enumerate(self._ids):
+                f.write(json.dumps({"id": aid, "row": pos, "doc": self._docs[pos], "meta": self._metas[pos]}) + "\n")
+        os.replace(tmp, self._records_path)
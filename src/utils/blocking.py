@@ -0,0 +1,112 @@
+from collections import Counter
+from typing import Iterable, List, Set
+import math
+import numpy as np
+from .similarity import pairs_above, topk
+
+
+def jaccard_candidate_pairs(token_sets: List[Set[str]], threshold: float, min_shared: int = 2) -> np.ndarray:
+    # Prefix filtering: with tokens in a global rare-first order, any two sets with
+    # Jaccard >= threshold share their first k common tokens within the first
+    # |x| - ceil(t*|x|) + k tokens of each set. Exact (no false negatives), and common
+    # tokens rarely end up in a prefix. k = `min_shared`, capped by ceil(t*|x|) for tiny sets.
+    n = len(token_sets)
+    freq = Counter(t for s in token_sets for t in s)
+    rank = {tok: r for r, tok in enumerate(sorted(freq, key=lambda t: (freq[t], t)))}
+    need = np.ones(n, dtype=np.int64)
+    tok_ids: List[int] = []
+    doc_ids: List[int] = []
+    empty: List[int] = []
+    for d, s in enumerate(token_sets):
+        if not s:
+            empty.append(d)
+            continue
+        size = len(s)
+        overlap = math.ceil(threshold * size - 1e-9)
+        k = max(1, min(min_shared, overlap))
+        need[d] = k
+        ids = sorted(rank[t] for t in s)[:size - overlap + k]
+        tok_ids.extend(ids)
+        doc_ids.extend([d] * len(ids))
+    raw = _group_pairs(np.asarray(tok_ids, dtype=np.int64), np.asarray(doc_ids, dtype=np.int64))
+    codes, shared = np.unique(raw.min(axis=1) * n + raw.max(axis=1), return_counts=True)
+    cand = np.stack([codes // n, codes % n], axis=1)
+    cand = cand[shared >= np.minimum(need[cand[:, 0]], need[cand[:, 1]])]
+    # Two empty sets count as identical
+    cand = _unique_pairs([cand, _group_pairs(np.zeros(len(empty), dtype=np.int64), np.asarray(empty, dtype=np.int64))], n)
+    if not len(cand):
+        return cand
+    # Length filter: J(x, y) >= t requires t*|y| <= |x|
+    sizes = np.fromiter((len(s) for s in token_sets), dtype=np.float64, count=n)
+    small = np.minimum(sizes[cand[:, 0]], sizes[cand[:, 1]])
+    large = np.maximum(sizes[cand[:, 0]], sizes[cand[:, 1]])
+    return cand[small >= threshold * large - 1e-9]
+
+
+def embedding_candidate_pairs(embs: np.ndarray, threshold: float, exact_max: int = 4096,
+                              nprobe: int = 2, iters: int = 2, chunk: int = 1024, seed: int = 0) -> np.ndarray:
+    # Rows must be L2-normalized (see similarity.as_matrix). Small batches: exact blockwise all-pairs. Larger batches:
+    # IVF-style blocking where each vector joins its `nprobe` nearest coarse centroids and
+    # only cell-mates are compared.
+    n = embs.shape[0]
+    if n < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    if n <= exact_max:
+        return pairs_above(embs, threshold, chunk=chunk)
+    rng = np.random.default_rng(seed)
+    nlist = max(2, int(np.sqrt(n)))
+    centroids = embs[rng.choice(n, size=nlist, replace=False)].copy()
+    for _ in range(iters):
+        assign = _nearest_centroids(embs, centroids, 1, chunk)[:, 0]
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, embs)
+        counts = np.bincount(assign, minlength=nlist)
+        nonempty = counts > 0
+        centroids[nonempty] = sums[nonempty] / counts[nonempty, None]
+        norms = np.linalg.norm(centroids, axis=1, keepdims=True)
+        centroids = centroids / np.where(norms == 0, 1.0, norms)
+    probe = _nearest_centroids(embs, centroids, min(nprobe, nlist), chunk)
+    cells = probe.ravel()
+    members = np.repeat(np.arange(n), probe.shape[1])
+    order = np.argsort(cells, kind="stable")
+    cells, members = cells[order], members[order]
+    bounds = np.flatnonzero(np.diff(cells)) + 1
+    out = [pairs_above(embs, threshold, rows=m, chunk=chunk) for m in np.split(members, bounds) if len(m) > 1]
+    return _unique_pairs(out, n)
+
+
+def merge_pairs(pair_arrays: Iterable[np.ndarray], n: int) -> np.ndarray:
+    return _unique_pairs(list(pair_arrays), n)
+
+
+def _nearest_centroids(embs: np.ndarray, centroids: np.ndarray, k: int, chunk: int) -> np.ndarray:
+    return topk(embs, centroids, k, chunk)[0]
+
+
+def _group_pairs(keys: np.ndarray, members: np.ndarray) -> np.ndarray:
+    # All (a, b) member pairs that share a key, without a Python loop over groups
+    if len(keys) < 2:
+        return np.empty((0, 2), dtype=np.int64)
+    order = np.argsort(keys, kind="stable")
+    keys, members = keys[order], members[order]
+    pos = np.arange(len(keys))
+    bounds = np.flatnonzero(np.diff(keys)) + 1
+    ends = np.repeat(np.concatenate([bounds, [len(keys)]]), np.diff(np.concatenate([[0], bounds, [len(keys)]])))
+    counts = ends - pos - 1
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty((0, 2), dtype=np.int64)
+    left = np.repeat(pos, counts)
+    within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.stack([members[left], members[left + 1 + within]], axis=1)
+
+
+def _unique_pairs(pair_arrays: List[np.ndarray], n: int) -> np.ndarray:
+    pair_arrays = [p for p in pair_arrays if len(p)]
+    if not pair_arrays:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.concatenate(pair_arrays).astype(np.int64)
+    lo = np.minimum(pairs[:, 0], pairs[:, 1])
+    hi = np.maximum(pairs[:, 0], pairs[:, 1])
+    codes = np.unique(lo[lo != hi] * n + hi[lo != hi])
+    return np.stack([codes // n, codes % n], axis=1)
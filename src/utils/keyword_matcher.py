@@ -0,0 +1,65 @@
+from typing import Dict, Iterable, List, Tuple
+import re
+
+
+def trie_pattern(phrases: Iterable[str]) -> str:
+    # Alternation factored by common prefixes, so the scanner never re-tries a shared prefix.
+    # Optional suffixes are greedy, so the longest phrase wins as in "reserve bank of india|reserve bank".
+    trie: dict = {}
+    for p in phrases:
+        node = trie
+        for ch in p:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        alts = [re.escape(ch) + build(node[ch]) for ch in sorted(k for k in node if k)]
+        if not alts:
+            return ""
+        body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def _is_word(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    # Case-insensitive whole-word dictionary matcher, compiled once. One scan finds every mention,
+    # overlapping ones included ("Kotak Mahindra Bank" also yields "Kotak" and "Mahindra"), with the
+    # same \b semantics as re.search(rf"\b{re.escape(kw)}\b", text, re.IGNORECASE) per keyword.
+    def __init__(self, keywords: Iterable[Tuple[str, str]]):
+        # keywords: (label, keyword) pairs; `rank` keeps their order for callers that report by keyword
+        self._entries: Dict[str, List[Tuple[str, str]]] = {}
+        self.rank: Dict[Tuple[str, str], int] = {}
+        for label, kw in keywords:
+            if (label, kw) not in self.rank:
+                self.rank[(label, kw)] = len(self.rank)
+                self._entries.setdefault(kw.lower(), []).append((label, kw))
+        phrases = sorted(self._entries)
+        # Keywords that are a prefix of a longer one can match at the same start; the scan only
+        # reports the longest, so remember the shorter ones to check their own end boundary
+        self._prefixes: Dict[str, List[str]] = {
+            p: [p] + [p[:i] for i in range(len(p) - 1, 0, -1) if p[:i] in self._entries] for p in phrases
+        }
+        self._re = re.compile(r"(?=\b(" + trie_pattern(phrases) + r")\b)", re.IGNORECASE) if phrases else None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def find(self, text: str) -> List[Tuple[int, int, str, str]]:
+        # (start, end, label, keyword), by start offset
+        out = []
+        if self._re is None:
+            return out
+        n = len(text)
+        for m in self._re.finditer(text):
+            start = m.start(1)
+            for p in self._prefixes.get(m.group(1).lower(), ()):
+                end = start + len(p)
+                if end != m.end(1) and _is_word(text[end - 1]) == (end < n and _is_word(text[end])):
+                    continue
+                out.extend((start, end, label, kw) for label, kw in self._entries[p])
+        return out
@@ -0,0 +1,69 @@
+from typing import List, Set
+import zlib
+import numpy as np
+
+
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_SHIFT = np.uint64(32)
+
+
+def stable_token_hash(token: str) -> int:
+    # Process-independent (unlike the salted builtin hash), so signatures can be persisted
+    return zlib.crc32(token.encode("utf-8"))
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 128, seed: int = 1, chunk_tokens: int = 10_000):
+        self.num_perm = num_perm
+        self.chunk_tokens = chunk_tokens
+        rng = np.random.default_rng(seed)
+        # Multiply-shift hashing over 32-bit token hashes: h(x) = (a*x + b) >> 32
+        self._a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+
+    def signatures(self, token_sets: List[Set[str]]) -> np.ndarray:
+        n = len(token_sets)
+        sigs = np.full((n, self.num_perm), _MAX_HASH, dtype=np.uint64)
+        start = 0
+        while start < n:
+            hashes: List[int] = []
+            offsets: List[int] = []
+            rows: List[int] = []
+            end = start
+            while end < n and len(hashes) < self.chunk_tokens:
+                toks = token_sets[end]
+                if toks:
+                    offsets.append(len(hashes))
+                    rows.append(end)
+                    hashes.extend(stable_token_hash(t) for t in toks)
+                end += 1
+            if hashes:
+                x = np.asarray(hashes, dtype=np.uint64)
+                h = (x[:, None] * self._a[None, :] + self._b[None, :]) >> _SHIFT
+                sigs[rows] = np.minimum.reduceat(h, offsets, axis=0)
+            start = end
+        return sigs.astype(np.uint32)
+
+
+def band_keys(signatures: np.ndarray, bands: int, rows: int, seed: int = 7) -> np.ndarray:
+    # Collapse each band of `rows` signature values into one signed 64-bit bucket key
+    if bands * rows > signatures.shape[1]:
+        raise ValueError("bands * rows exceeds signature length")
+    rng = np.random.default_rng(seed)
+    mult = rng.integers(1, 2**63, size=rows, dtype=np.uint64) | np.uint64(1)
+    sig = signatures.astype(np.uint64)
+    keys = np.empty((signatures.shape[0], bands), dtype=np.uint64)
+    for b in range(bands):
+        keys[:, b] = (sig[:, b * rows:(b + 1) * rows] * mult[None, :]).sum(axis=1, dtype=np.uint64)
+    return keys.view(np.int64)
+
+
+def estimate_jaccard(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return (a == b).mean(axis=-1)
+
+
+def jaccard(a: set, b: set) -> float:
+    # Exact token-set Jaccard; two empty sets count as identical
+    if not a and not b:
+        return 1.0
+    return len(a & b) / (len(a | b) or 1)
@@ -1,5 +1,12 @@
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+import gzip
+import logging
 import os
+import threading
+import time
+import urllib.error
+import urllib.request
 import feedparser
 
 
@@ -12,22 +19,140 @@ DEFAULT_FEEDS = [
 _feeds_env = os.getenv("RSS_FEEDS")
 RSS_FEEDS = [s.strip() for s in _feeds_env.split(",")] if _feeds_env else DEFAULT_FEEDS
 
+logger = logging.getLogger("rss_fetcher")
 
-def fetch_rss_articles() -> List[Dict]:
-    items: List[Dict] = []
-    for url in RSS_FEEDS:
+
+class FeedState:
+    def __init__(self):
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.failures = 0
+        self.retry_at = 0.0
+        self.last_status: Optional[int] = None
+        # Validators of a 200 whose items are not stored yet; see RSSFetcher.commit / discard
+        self.pending: Optional[tuple] = None
+
+
+class RSSFetcher:
+    # Polls all feeds concurrently (poll time ~ slowest feed). Keeps ETag / Last-Modified per feed and
+    # sends them back, so unchanged feeds answer 304 and are not parsed; failing feeds back off
+    # exponentially (base_backoff, doubling up to max_backoff) instead of being hit every poll.
+    # New validators only take effect on commit(), once the items they cover are stored: after a
+    # failed ingest, discard() makes the next poll unconditional so the items are fetched again.
+    def __init__(self, feeds: Optional[List[str]] = None, timeout: float = 10.0, max_workers: int = 8,
+                 base_backoff: float = 60.0, max_backoff: float = 3600.0, max_items: int = 50,
+                 clock: Callable[[], float] = time.monotonic):
+        self.feeds = list(feeds) if feeds is not None else RSS_FEEDS
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.max_items = max_items
+        self.clock = clock
+        self.state: Dict[str, FeedState] = {}
+        self._lock = threading.Lock()
+
+    def fetch(self) -> List[Dict]:
+        now = self.clock()
+        with self._lock:
+            due = [url for url in self.feeds if self.state.setdefault(url, FeedState()).retry_at <= now]
+        if not due:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(due))) as pool:
+            results = list(pool.map(self._fetch_feed, due))
+        # Feed order is kept so the output is deterministic
+        return [item for items in results for item in items]
+
+    def _fetch_feed(self, url: str) -> List[Dict]:
+        st = self.state[url]
+        req = urllib.request.Request(url, headers={"User-Agent": "financial-news-intelligence/0.1",
+                                                   "Accept-Encoding": "gzip"})
+        if st.etag:
+            req.add_header("If-None-Match", st.etag)
+        if st.last_modified:
+            req.add_header("If-Modified-Since", st.last_modified)
         try:
-            feed = feedparser.parse(url)
-            for e in feed.entries[:50]:
-                items.append({
-                    "id": getattr(e, "id", getattr(e, "guid", getattr(e, "link", ""))),
-                    "title": getattr(e, "title", ""),
-                    "content": getattr(e, "summary", ""),
-                    "source": feed.feed.get("title", url),
-                    "published_at": getattr(e, "published", getattr(e, "updated", "")),
-                    "url": getattr(e, "link", url),
-                    "category": ""
-                })
-        except Exception:
-            continue
-    return items
+            with urllib.request.urlopen(req, timeout=self.timeout) as resp:
+                body = resp.read()
+                if resp.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                etag, last_modified, status = resp.headers.get("ETag"), resp.headers.get("Last-Modified"), resp.status
+        except urllib.error.HTTPError as e:
+            if e.code == 304:
+                self._succeeded(st, 304)
+                return []
+            self._failed(url, st, e)
+            return []
+        except Exception as e:
+            self._failed(url, st, e)
+            return []
+        feed = feedparser.parse(body)
+        if feed.bozo and not feed.entries:
+            self._failed(url, st, feed.get("bozo_exception"))
+            return []
+        self._succeeded(st, status, (etag, last_modified))
+        return [_to_item(e, feed.feed.get("title", url), url) for e in feed.entries[:self.max_items]]
+
+    def commit(self):
+        # The polled items are stored: later polls may send the new validators
+        with self._lock:
+            for st in self.state.values():
+                if st.pending is not None:
+                    st.etag, st.last_modified = st.pending
+                    st.pending = None
+
+    def discard(self):
+        # Storing the polled items failed: forget the validators of changed feeds, so they are
+        # requested unconditionally (and their items returned again) on the next poll
+        with self._lock:
+            for st in self.state.values():
+                if st.pending is not None:
+                    st.etag = st.last_modified = st.pending = None
+
+    def _succeeded(self, st: FeedState, status: int, validators: Optional[tuple] = None):
+        with self._lock:
+            if validators is not None:
+                st.pending = validators
+            st.last_status = status
+            st.failures = 0
+            st.retry_at = 0.0
+
+    def _failed(self, url: str, st: FeedState, error):
+        with self._lock:
+            st.failures += 1
+            st.last_status = getattr(error, "code", None)
+            delay = min(self.max_backoff, self.base_backoff * 2 ** (st.failures - 1))
+            st.retry_at = self.clock() + delay
+        logger.warning("RSS feed %s failed (%s); retrying in %.0fs", url, error, delay)
+
+
+def _to_item(e, source: str, url: str) -> Dict:
+    return {
+        "id": getattr(e, "id", getattr(e, "guid", getattr(e, "link", ""))),
+        "title": getattr(e, "title", ""),
+        "content": getattr(e, "summary", ""),
+        "source": source,
+        "published_at": getattr(e, "published", getattr(e, "updated", "")),
+        "url": getattr(e, "link", url),
+        "category": ""
+    }
+
+
+_default_fetcher: Optional[RSSFetcher] = None
+
+
+def fetch_rss_articles() -> List[Dict]:
+    # One long-lived fetcher, so validators and backoff carry over between polls
+    global _default_fetcher
+    if _default_fetcher is None:
+        _default_fetcher = RSSFetcher()
+    return _default_fetcher.fetch()
+
+
+def finish_rss_ingest(ok: bool):
+    # Called by the ingestion worker when an ingest_rss job ends
+    if _default_fetcher is not None:
+        if ok:
+            _default_fetcher.commit()
+        else:
+            _default_fetcher.discard()
@@ -1,5 +1,6 @@
-from typing import List
+from typing import Iterator, List, Sequence, Tuple
 import math
+import numpy as np
 
 
 def cosine(a: List[float], b: List[float]) -> float:
@@ -9,3 +10,75 @@ def cosine(a: List[float], b: List[float]) -> float:
     if na == 0 or nb == 0:
         return 0.0
     return dot / (na * nb)
+
+
+# Batched kernels. Embeddings live in one contiguous float32 matrix with L2-normalized rows,
+# so cosine similarity is a plain matrix product. `chunk` bounds the size of each block of
+# the similarity matrix that is materialized at once (chunk x len(b) floats).
+
+def as_matrix(vectors, normalize: bool = True) -> np.ndarray:
+    m = np.ascontiguousarray(vectors, dtype=np.float32)
+    if m.ndim == 1:
+        m = m.reshape(1, -1) if m.size else m.reshape(0, 0)
+    return normalize_rows(m) if normalize else m
+
+
+def normalize_rows(m: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(m, axis=1, keepdims=True)
+    return m / np.where(norms == 0, 1.0, norms)
+
+
+def similarity_blocks(a: np.ndarray, b: np.ndarray, chunk: int = 2048) -> Iterator[Tuple[int, np.ndarray]]:
+    for s in range(0, a.shape[0], chunk):
+        yield s, a[s:s + chunk] @ b.T
+
+
+def similarity_matrix(a: np.ndarray, b: np.ndarray, chunk: int | None = None) -> np.ndarray:
+    if chunk is None:
+        return a @ b.T
+    out = np.empty((a.shape[0], b.shape[0]), dtype=np.result_type(a, b))
+    for s, block in similarity_blocks(a, b, chunk):
+        out[s:s + block.shape[0]] = block
+    return out
+
+
+def topk(queries: np.ndarray, matrix: np.ndarray, k: int, chunk: int = 2048) -> Tuple[np.ndarray, np.ndarray]:
+    # Per query row: indices and scores of the k most similar rows of `matrix`, best first
+    n = matrix.shape[0]
+    k = min(k, n)
+    idx = np.empty((queries.shape[0], k), dtype=np.int64)
+    scores = np.empty((queries.shape[0], k), dtype=np.float32)
+    if k == 0:
+        return idx, scores
+    for s, block in similarity_blocks(queries, matrix, chunk):
+        part = np.argpartition(-block, k - 1, axis=1)[:, :k] if k < n else np.tile(np.arange(n), (block.shape[0], 1))
+        part_scores = np.take_along_axis(block, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind="stable")
+        idx[s:s + block.shape[0]] = np.take_along_axis(part, order, axis=1)
+        scores[s:s + block.shape[0]] = np.take_along_axis(part_scores, order, axis=1)
+    return idx, scores
+
+
+def pairs_above(matrix: np.ndarray, threshold: float, rows: Sequence[int] | None = None,
+                chunk: int = 1024) -> np.ndarray:
+    # All (i, j), i < j, among `rows` (default: every row) with similarity >= threshold
+    idx = np.arange(matrix.shape[0]) if rows is None else np.asarray(rows)
+    sub = matrix[idx]
+    out = []
+    for s, block in similarity_blocks(sub, sub, chunk):
+        r, c = np.nonzero(block >= threshold)
+        r = r + s
+        keep = c > r
+        if keep.any():
+            out.append(np.stack([idx[r[keep]], idx[c[keep]]], axis=1))
+    if not out:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.concatenate(out)
+
+
+def rowwise_similarity(matrix: np.ndarray, pairs: np.ndarray, chunk: int = 65536) -> np.ndarray:
+    out = np.empty(len(pairs), dtype=np.float32)
+    for s in range(0, len(pairs), chunk):
+        p = pairs[s:s + chunk]
+        out[s:s + len(p)] = np.einsum("ij,ij->i", matrix[p[:, 0]], matrix[p[:, 1]])
+    return out
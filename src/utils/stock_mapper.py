@@ -1,5 +1,5 @@
 import json
-from typing import Dict, List
+from typing import Dict, Iterable, List
 from pathlib import Path
 
 
@@ -9,6 +9,7 @@ class StockMapper:
         self._stock_map = {}
         self._sector_hierarchy = {}
         self._load()
+        self._build_indexes()
 
     def _load(self):
         try:
@@ -30,3 +31,52 @@ class StockMapper:
 
     def sector_children(self, sector: str) -> List[str]:
         return self._sector_hierarchy.get(sector, [])
+
+    def _build_indexes(self):
+        # Inverted indexes so impact mapping is a few dict lookups per entity, whatever the universe size
+        companies: Dict[str, List[str]] = self._stock_map.get("companies", {})
+        self._alias_index: Dict[str, List[str]] = {}
+        for name, symbols in companies.items():
+            self._alias_index.setdefault(name, symbols)
+            self._alias_index.setdefault(name.lower(), symbols)
+        # Optional {"aliases": {"alias": "Company name"}}
+        for alias, name in self._stock_map.get("aliases", {}).items():
+            if name in companies:
+                self._alias_index.setdefault(alias, companies[name])
+                self._alias_index.setdefault(alias.lower(), companies[name])
+
+        self._all_symbols = _unique(s for symbols in companies.values() for s in symbols)
+        by_sector: Dict[str, List[str]] = {}
+        for name, sectors in self._stock_map.get("company_to_sector", {}).items():
+            for sec in sectors:
+                by_sector.setdefault(sec.lower(), []).extend(companies.get(name, []))
+        children = {k.lower(): [c.lower() for c in v] for k, v in self._sector_hierarchy.items()}
+        # Sector -> symbols of the sector itself, then of its (transitive) children in sector_hierarchy.json
+        self._sector_index: Dict[str, List[str]] = {}
+        for sec in set(by_sector) | set(children):
+            order, stack, visited = [], [sec], set()
+            while stack:
+                cur = stack.pop(0)
+                if cur not in visited:
+                    visited.add(cur)
+                    order.append(cur)
+                    stack.extend(children.get(cur, []))
+            self._sector_index[sec] = _unique(s for cur in order for s in by_sector.get(cur, []))
+        # Optional {"regulator_to_sector": {"RBI": ["Banking", ...]}}; unscoped regulators affect every symbol
+        self._regulator_index: Dict[str, List[str]] = {
+            reg.lower(): _unique(s for sec in sectors for s in self._sector_index.get(sec.lower(), []))
+            for reg, sectors in self._stock_map.get("regulator_to_sector", {}).items()
+        }
+
+    def symbols_for_company(self, name: str) -> List[str]:
+        return self._alias_index.get(name) or self._alias_index.get(name.lower(), [])
+
+    def symbols_for_sector(self, sector: str) -> List[str]:
+        return self._sector_index.get(sector.lower(), [])
+
+    def symbols_for_regulator(self, regulator: str) -> List[str]:
+        return self._regulator_index.get(regulator.lower(), self._all_symbols)
+
+
+def _unique(items: Iterable[str]) -> List[str]:
+    return list(dict.fromkeys(items))
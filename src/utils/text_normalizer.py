@@ -0,0 +1,64 @@
+from typing import List, Tuple
+import re
+from .keyword_matcher import trie_pattern
+
+
+# Synonym table used for dedup normalization, in the order the rules were originally applied.
+# The phrase groups share no words, so one alternation over all of them gives the same result
+# as applying them one after another.
+SYNONYMS: List[Tuple[List[str], str]] = [
+    # Regulators
+    (["reserve bank of india", "reserve bank", "central bank"], "rbi"),
+    # Rate terms
+    (["repo rate", "policy rate", "interest rates", "interest rate"], "policy rate"),
+    # Action verbs
+    (["hike", "hikes", "hiked", "raise", "raises", "raised", "increase", "increases", "increased"], "raise"),
+    # Business synonyms
+    (["share repurchase", "repurchase"], "buyback"),
+    (["bags", "bagged", "wins", "won"], "win"),
+    (["okays", "approves", "approved"], "approve"),
+    (["mega deal", "mega"], "deal"),
+    # Basis points
+    (["basis points"], "bps"),
+]
+
+_REPLACEMENTS = {phrase: repl for phrases, repl in SYNONYMS for phrase in phrases}
+_SYNONYM_RE = re.compile(r"\b(?:" + trie_pattern(_REPLACEMENTS) + r")\b")
+_RATE_CONTEXT_RE = re.compile(r"\b(policy rate|repo|interest)\b")
+# "25bps" / "25  bps" -> "25 bps"; then percentages become bps in interest-rate context, else " percent"
+_RATE_UNITS_RE = re.compile(r"\b(\d+)\s*bps\b|(\d+(?:\.\d+)?)\s*%")
+_PLAIN_UNITS_RE = re.compile(r"\b(\d+)\s*bps\b|\s*%\b")
+
+
+def _synonym(m: re.Match) -> str:
+    return _REPLACEMENTS[m.group(0)]
+
+
+def _rate_units(m: re.Match) -> str:
+    if m.group(1) is not None:
+        return f"{m.group(1)} bps"
+    try:
+        return f"{int(round(float(m.group(2)) * 100))} bps"
+    except Exception:
+        return m.group(0)
+
+
+def _plain_units(m: re.Match) -> str:
+    return f"{m.group(1)} bps" if m.group(1) is not None else " percent"
+
+
+def normalize_tokens(text: str) -> Tuple[str, List[str]]:
+    # Normalized text and its tokens (whitespace-split), so callers don't re-split
+    t = _SYNONYM_RE.sub(_synonym, text.lower())
+    # The unit rules can only fire on text containing "bps" or "%"; most articles skip them
+    if "bps" in t or "%" in t:
+        if ("policy rate" in t or "repo" in t or "interest" in t) and _RATE_CONTEXT_RE.search(t):
+            t = _RATE_UNITS_RE.sub(_rate_units, t)
+        else:
+            t = _PLAIN_UNITS_RE.sub(_plain_units, t)
+    tokens = t.split()
+    return " ".join(tokens), tokens
+
+
+def normalize_text(text: str) -> str:
+    return normalize_tokens(text)[0]
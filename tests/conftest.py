@@ -1,5 +1,6 @@
 import os
 import pytest
+from src.config import settings
 from src.main import create_app
 
 
@@ -8,3 +9,13 @@ def app():
     os.environ.setdefault("DB_PATH", "./data/test_news.db")
     os.environ.setdefault("VECTOR_DB_PATH", "./data/test_vector_store")
     return create_app()
+
+
+@pytest.fixture
+def tmp_app(tmp_path, monkeypatch):
+    # A fresh app whose databases, caches and vector store live in tmp_path
+    monkeypatch.setattr(settings, "db_path", str(tmp_path / "news.db"))
+    monkeypatch.setattr(settings, "dedup_index_path", str(tmp_path / "dedup_index.db"))
+    monkeypatch.setattr(settings, "embedding_cache_path", str(tmp_path / "embedding_cache.db"))
+    monkeypatch.setattr(settings, "vector_db_path", str(tmp_path / "vector_store"))
+    return create_app()
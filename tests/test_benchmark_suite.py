@@ -0,0 +1,21 @@
+from benchmarks.corpus import iter_corpus
+from benchmarks.suite import compare, run
+
+
+def test_dup_window_keeps_duplicates_of_recent_stories():
+    corpus = list(iter_corpus(400, dup_rate=0.5, seed=1, dup_window=10))
+    assert len(corpus) == 400 and len({a["id"] for a in corpus}) == 400
+    assert corpus == list(iter_corpus(400, dup_rate=0.5, seed=1, dup_window=10))
+
+
+def test_suite_reports_stages_and_flags_regressions():
+    config = {"articles": 200, "chunk": 100, "queries": 5}
+    results = run("test", config, seed=0, dup_rate=0.2, data_dir="data")
+    assert results["ingest"]["articles"] == 200 and 0 < results["ingest"]["unique"] < 200
+    assert set(results["ingest"]["stages"]) == {"ingest", "dedup", "entity", "impact", "store"}
+    assert results["ingest"]["stages"]["dedup"]["runs"] == 2
+    assert results["query"]["queries"] == 5 and results["query"]["p99_ms"] > 0
+    assert results["memory"]["peak_rss_mb"] > 0 and results["storage"]["vector_store_bytes"] > 0
+    assert compare(results, results, tolerance=0.2)
+    slower = dict(results, query=dict(results["query"], p50_ms=results["query"]["p50_ms"] / 2))
+    assert not compare(results, slower, tolerance=0.2)
@@ -0,0 +1,137 @@
+import sqlite3
+import pytest
+from src.agents.storage_indexing import StorageIndexingAgent
+from src.graph.workflow import build_news_processing_graph
+from src.services.database import Database, NEWS_BY_ENTITY_SQL, NEWS_BY_SECTOR_SQL, NEWS_BY_STOCK_SQL
+from src.services.dedup_index import DedupIndex
+from src.services.embedding_service import EmbeddingService
+from src.services.ner_service import NERService
+from src.services.vector_db import VectorDB
+
+
+def _article(i):
+    return {"id": f"A{i}", "title": f"Title {i}", "content": "Body", "source": "Test",
+            "published_at": f"2024-01-{i + 1:02d}T00:00:00Z", "url": f"https://example.com/{i}", "category": "Banking"}
+
+
+class _NoVectors:
+    def add(self, ids, docs, metas):
+        pass
+
+
+def test_bulk_store_matches_row_api(tmp_path):
+    ents = {f"A{i}": [{"id": "COMPANY:hdfc bank", "type": "COMPANY", "name": "HDFC Bank", "normalized": "hdfc bank"},
+                      {"id": f"SECTOR:s{i}", "type": "SECTOR", "name": f"S{i}", "normalized": f"s{i}"}] for i in range(3)}
+    impacts = [{"article_id": f"A{i}", "symbol": "HDFCBANK", "confidence": 1.0, "type": "direct"} for i in range(3)]
+
+    row = Database(str(tmp_path / "row.db"))
+    for i in range(3):
+        row.upsert_article(_article(i))
+        row.link_article_entities(f"A{i}", ents[f"A{i}"])
+    row.add_stock_impacts(impacts)
+
+    bulk = Database(str(tmp_path / "bulk.db"))
+    StorageIndexingAgent(bulk, _NoVectors(), None).run(
+        {"unique_articles": [_article(i) for i in range(3)], "article_entity_map": ents, "stock_impacts": impacts})
+
+    assert bulk.conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert bulk.stats() == row.stats()
+    assert [a["id"] for a in bulk.list_news_by_company("hdfc bank")] == ["A2", "A1", "A0"]
+    assert [a["id"] for a in bulk.list_news_by_stock("HDFCBANK")] == [a["id"] for a in row.list_news_by_stock("HDFCBANK")]
+
+
+def test_transaction_rolls_back_whole_run(tmp_path):
+    db = Database(str(tmp_path / "news.db"))
+    with pytest.raises(KeyError):
+        with db.transaction():
+            db.upsert_articles([_article(0), _article(1)])
+            db.add_stock_impacts_bulk([{"article_id": "A0", "symbol": "X"}])
+    assert db.stats()["articles"] == 0
+    db.upsert_articles([_article(0)])
+    assert db.get_article("A0")["title"] == "Title 0"
+
+
+def _plan(db, sql, args):
+    return " | ".join(r[3] for r in db.conn.execute("EXPLAIN QUERY PLAN " + sql, args))
+
+
+def test_lookups_use_indexes(tmp_path):
+    db = Database(str(tmp_path / "news.db"))
+    entity = _plan(db, NEWS_BY_ENTITY_SQL, ("hdfc bank", "COMPANY", 20))
+    sector = _plan(db, NEWS_BY_SECTOR_SQL, ("banking", "Banking", 20))
+    stock = _plan(db, NEWS_BY_STOCK_SQL, ("HDFCBANK", 20))
+    assert "idx_entities_key" in entity and "idx_article_entities_entity" in entity
+    assert "idx_entities_name_key" in sector and "idx_articles_category" in sector
+    assert "idx_stock_impacts_symbol" in stock
+    assert "SCAN" not in entity + sector + stock
+
+
+def test_migrates_entities_without_keys(tmp_path):
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE articles (id TEXT PRIMARY KEY, title TEXT, content TEXT, source TEXT, "
+                 "published_at TEXT, url TEXT, category TEXT, metadata TEXT)")
+    conn.execute("CREATE TABLE entities (id TEXT PRIMARY KEY, type TEXT, name TEXT, normalized TEXT)")
+    conn.execute("CREATE TABLE article_entities (article_id TEXT, entity_id TEXT)")
+    conn.execute("INSERT INTO articles (id, published_at) VALUES ('A0', '2024-01-01T00:00:00Z')")
+    conn.execute("INSERT INTO entities VALUES ('SECTOR:Auto', 'SECTOR', 'Auto', 'automobile')")
+    # Written before the unique keys existed: the same link twice
+    conn.executemany("INSERT INTO article_entities VALUES ('A0', 'SECTOR:Auto')", [(), ()])
+    conn.commit()
+    conn.close()
+    db = Database(path)
+    assert [a["id"] for a in db.list_news_by_sector("AUTO")] == ["A0"]
+    assert [a["id"] for a in db.list_news_by_entity("SECTOR", "Automobile")] == ["A0"]
+    assert db.list_entities() == [{"id": "SECTOR:Auto", "type": "SECTOR", "name": "Auto", "normalized": "automobile"}]
+    assert db.conn.execute("SELECT COUNT(*) FROM article_entities").fetchone()[0] == 1
+
+
+def test_replacing_article_replaces_links_and_impacts(tmp_path):
+    db = Database(str(tmp_path / "news.db"))
+    tcs = {"id": "COMPANY:TCS", "type": "COMPANY", "name": "TCS", "normalized": "tcs"}
+    infy = {"id": "COMPANY:Infosys", "type": "COMPANY", "name": "Infosys", "normalized": "infosys"}
+    agent = StorageIndexingAgent(db, _NoVectors(), None)
+    agent.run({"unique_articles": [_article(0)], "article_entity_map": {"A0": [tcs, infy]},
+               "stock_impacts": [{"article_id": "A0", "symbol": "TCS", "confidence": 1.0, "type": "direct"},
+                                 {"article_id": "A0", "symbol": "INFY", "confidence": 1.0, "type": "direct"}]})
+    agent.run({"unique_articles": [{**_article(0), "title": "Updated"}], "article_entity_map": {"A0": [tcs]},
+               "stock_impacts": [{"article_id": "A0", "symbol": "TCS", "confidence": 0.7, "type": "sector"}]})
+    assert db.get_article("A0")["title"] == "Updated"
+    assert db.list_news_by_company("infosys") == []
+    assert [tuple(r) for r in db.conn.execute("SELECT symbol, confidence, type FROM stock_impacts")] == \
+        [("TCS", 0.7, "sector")]
+    # Link / impact writes on their own are idempotent too
+    db.link_article_entities("A0", [tcs, tcs])
+    db.add_stock_impacts([{"article_id": "A0", "symbol": "TCS", "confidence": 1.0, "type": "direct"}])
+    assert db.stats()["stocks"] == 1
+    assert db.conn.execute("SELECT COUNT(*) FROM article_entities").fetchone()[0] == 1
+
+
+def test_repeated_mock_ingest_keeps_table_sizes(tmp_path):
+    db = Database(str(tmp_path / "news.db"))
+    embedder = EmbeddingService("test-model")
+    graph = build_news_processing_graph(db, VectorDB(str(tmp_path / "vectors"), embedder), embedder, NERService(),
+                                        DedupIndex(str(tmp_path / "dedup.db")))
+
+    def sizes():
+        return [db.conn.execute(f"SELECT COUNT(*) FROM {t}").fetchone()[0]
+                for t in ("articles", "entities", "article_entities", "stock_impacts")]
+
+    graph.invoke({"mode": "ingest_mock"})
+    first = sizes()
+    assert all(first)
+    for _ in range(2):
+        graph.invoke({"mode": "ingest_mock"})
+        assert sizes() == first
+
+
+def test_compact_removes_duplicates_and_orphans(tmp_path):
+    db = Database(str(tmp_path / "news.db"))
+    db.upsert_article(_article(0))
+    db.conn.execute("DROP INDEX ux_stock_impacts")
+    db.conn.executemany("INSERT INTO stock_impacts VALUES (?, 'TCS', 1.0, 'direct')", [("A0",), ("A0",), ("gone",)])
+    db.conn.execute("INSERT INTO entities (id, type, name) VALUES ('COMPANY:Old', 'COMPANY', 'Old')")
+    db.conn.commit()
+    assert db.compact() == {"duplicate_article_entities": 0, "duplicate_stock_impacts": 1,
+                            "orphan_article_entities": 0, "orphan_stock_impacts": 1, "orphan_entities": 1}
+    assert db.stats()["stocks"] == 1 and db.stats()["entities"] == 0
@@ -51,3 +51,74 @@ def test_deduplication_accuracy_benchmark(app):
             correct += 1
     accuracy = correct / len(groups)
     assert accuracy >= 0.95
+
+
+def test_blocked_grouping_matches_exhaustive():
+    import json
+    from src.agents.news_ingestion import NewsIngestionAgent
+    embedder = EmbeddingService("sentence-transformers/all-MiniLM-L6-v2")
+    with open("data/mock_news.json", "r", encoding="utf-8") as f:
+        parsed = [NewsIngestionAgent()._normalize(a) for a in json.load(f)]
+    exhaustive = DeduplicationAgent(embedder, blocking=False).run({"parsed_articles": parsed})
+    blocked = DeduplicationAgent(embedder, blocking_min_batch=0).run({"parsed_articles": parsed})
+    assert [a["id"] for a in blocked["unique_articles"]] == [a["id"] for a in exhaustive["unique_articles"]]
+    assert blocked["duplicate_groups"] == exhaustive["duplicate_groups"]
+
+
+def test_jaccard_candidates_cover_all_similar_pairs():
+    import random
+    from src.utils.blocking import jaccard_candidate_pairs
+    rng = random.Random(3)
+    vocab = [f"w{i}" for i in range(40)]
+    sets = [set(rng.sample(vocab, rng.randint(0, 12))) for _ in range(150)]
+    cand = {tuple(p) for p in jaccard_candidate_pairs(sets, 0.58).tolist()}
+    agent = DeduplicationAgent(EmbeddingService("sentence-transformers/all-MiniLM-L6-v2"))
+    for i in range(len(sets)):
+        for j in range(i + 1, len(sets)):
+            if agent._jaccard(sets[i], sets[j]) >= 0.58:
+                assert (i, j) in cand
+
+
+def test_cross_batch_index_skips_stored_stories(tmp_path):
+    import json
+    from src.agents.news_ingestion import NewsIngestionAgent
+    from src.services.dedup_index import DedupIndex
+    with open("data/mock_news.json", "r", encoding="utf-8") as f:
+        parsed = {a["id"]: NewsIngestionAgent()._normalize(a) for a in json.load(f)}
+    index = DedupIndex(str(tmp_path / "dedup_index.db"))
+    agent = DeduplicationAgent(EmbeddingService("sentence-transformers/all-MiniLM-L6-v2"), index=index)
+    batch = [parsed[i] for i in ("N1", "N3", "N5", "N9")]
+    first = agent.run({"mode": "ingest_rss", "parsed_articles": batch})
+    assert len(first["unique_articles"]) == 4
+    index.add(first["dedup_index_entries"])
+    buckets = index.conn.execute("SELECT COUNT(*) FROM lsh_buckets").fetchone()[0]
+    # Re-adding stored ids (e.g. a re-store) leaves the bucket table as it was
+    index.add(first["dedup_index_entries"])
+    assert index.conn.execute("SELECT COUNT(*) FROM lsh_buckets").fetchone()[0] == buckets
+
+    again = agent.run({"mode": "ingest_rss", "parsed_articles": batch})
+    assert again["unique_articles"] == []
+    assert set(again["known_articles"]) == {"N1", "N3", "N5", "N9"}
+
+    # Deleted from news.db: pruned entries are no longer known, the rest still are
+    removed = index.prune(["N1", "N5", "N9"])
+    assert removed["signatures"] == 1 and removed["lsh_buckets"] > 0
+    pruned = agent.run({"mode": "ingest_rss", "parsed_articles": batch})
+    assert [a["id"] for a in pruned["unique_articles"]] == ["N3"]
+    index.add(pruned["dedup_index_entries"])
+
+    edited = dict(parsed["N9"], id="N9-syndicated", content=parsed["N9"]["content"] + " Shares rose.")
+    later = agent.run({"mode": "ingest_rss", "parsed_articles": [edited, parsed["N23"], parsed["N11"]]})
+    assert [a["id"] for a in later["unique_articles"]] == ["N11"]
+    assert ["N9", "N9-syndicated"] in later["duplicate_groups"]
+    assert ["N1", "N23"] in later["duplicate_groups"]
+
+
+def test_normalizer_rules():
+    from src.utils.text_normalizer import normalize_tokens
+    text, tokens = normalize_tokens("Reserve Bank of India HIKES repo rate by 0.25%;  basis points\n25bps")
+    assert text == "rbi raise policy rate by 25 bps; bps 25 bps"
+    assert tokens == text.split()
+    # Percent outside rate context: only "%" directly followed by a word character is rewritten
+    assert normalize_tokens("Mega deal won, sales up 5% and 7%growth")[0] == "deal win, sales up 5% and 7 percentgrowth"
+    assert normalize_tokens("TCS bags share repurchase; board okays")[0] == "tcs win buyback; board approve"
@@ -0,0 +1,51 @@
+import subprocess
+import sys
+import numpy as np
+from src.services.embedding_service import EmbeddingService
+
+
+def test_cache_only_embeds_misses(tmp_path):
+    svc = EmbeddingService("test-model", str(tmp_path / "cache.db"))
+    calls = []
+    encode = svc._encode
+    svc._encode = lambda texts: calls.append(list(texts)) or encode(texts)
+
+    first = svc.embed(["RBI hikes repo rate", "HDFC Bank dividend", "RBI hikes repo rate"])
+    assert calls == [["RBI hikes repo rate", "HDFC Bank dividend"]]
+    second = svc.embed(["HDFC Bank dividend", "Sensex closes higher"])
+    assert calls[-1] == ["Sensex closes higher"]
+    assert np.allclose(second[0], first[1])
+    assert svc.cache.stats()["hits"] == 1
+    # A cached text repeated within a batch is a hit at every position
+    svc.embed(["Sensex closes higher", "Sensex closes higher"])
+    stats = svc.cache.stats()
+    assert stats["hits"] == 3 and stats["misses"] == 4
+
+    # A fresh service (new process in production) reads the on-disk cache
+    reopened = EmbeddingService("test-model", str(tmp_path / "cache.db"))
+    reopened._encode = lambda texts: (_ for _ in ()).throw(AssertionError(texts))
+    assert np.allclose(reopened.embed(["RBI hikes repo rate"])[0], first[0])
+
+
+def test_fallback_embedding_is_stable_across_processes():
+    code = ("from src.services.embedding_service import EmbeddingService;"
+            "print(EmbeddingService('test-model')._fallback_embed('RBI hikes repo rate by 25bps'))")
+    outs = {subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+            for _ in range(2)}
+    assert len(outs) == 1
+
+
+def test_batched_fallback_matches_per_text():
+    svc = EmbeddingService("test-model")
+    texts = ["RBI hikes repo rate by 25bps", "", "Sensex\x00 up 0.5%", "RBI hikes repo rate by 25bps"]
+    batch = svc._fallback_embed_batch(texts)
+    for t, row in zip(texts, batch):
+        assert np.allclose(row, svc._fallback_embed(t))
+    assert np.allclose(np.linalg.norm(batch[[0, 2, 3]], axis=1), 1.0)
+    assert not batch[1].any()
+    # Same tokens as the regex tokenizer: 25bps -> 25 bps, punctuation and case are separators
+    same = svc._fallback_embed_batch(["RBI hikes repo-rate by 25bps!", "rbi HIKES repo rate by 25 bps"])
+    assert np.allclose(same[0], same[1])
+    # Bigrams do not cross text boundaries
+    assert np.allclose(svc._fallback_embed_batch(["alpha", "beta"]).sum(axis=0),
+                       svc._fallback_embed_batch(["alpha"])[0] + svc._fallback_embed_batch(["beta"])[0])
@@ -38,3 +38,58 @@ def test_entity_precision_benchmark():
             correct += 1
     precision = correct / total
     assert precision >= 0.9
+
+
+def test_keyword_spans_and_overlaps():
+    ner = NERService()
+    text = "Kotak Mahindra Bank and M&M gain; kotak shares up"
+    ents = {e["name"]: e for e in ner.extract(text)}
+    assert ents["Kotak Mahindra Bank"]["spans"] == [[0, 19]]
+    assert ents["Kotak"]["spans"] == [[0, 5], [34, 39]]
+    assert ents["Mahindra"]["spans"] == [[6, 14]]
+    assert ents["M&M"]["spans"] == [[24, 27]]
+    # Whole words only
+    assert not any(e["name"] == "TCS" for e in ner.extract("TCSL and ATCS results"))
+
+
+def test_large_gazetteer():
+    companies = [f"Company{i} Ltd" for i in range(10000)] + ["HDFC Bank"]
+    ner = NERService(company_keywords=companies)
+    ents = ner.extract("Company9999 Ltd and HDFC Bank sign pact; Company12 Ltds rally")
+    assert [e["name"] for e in ents if e["type"] == "COMPANY"] == ["Company9999 Ltd", "HDFC Bank"]
+
+
+def test_extract_many_batches_through_nlp_pipe():
+    from types import SimpleNamespace
+
+    class FakeNLP:
+        # Tags every capitalized word as ORG, like a tiny NER model
+        pipe_names = ["ner"]
+
+        def __init__(self):
+            self.calls = []
+
+        def pipe(self, texts, batch_size, n_process):
+            texts = list(texts)
+            self.calls.append((texts, batch_size, n_process))
+            for t in texts:
+                words, pos = [], 0
+                for w in t.split():
+                    pos = t.index(w, pos)
+                    if w[0].isupper():
+                        words.append(SimpleNamespace(label_="ORG", text=w, start_char=pos, end_char=pos + len(w)))
+                    pos += len(w)
+                yield SimpleNamespace(ents=words)
+
+    ner = NERService(batch_size=2, n_process=4, max_chars=30)
+    ner.nlp = FakeNLP()
+    texts = ["Infosys wins deal", "RBI holds rates", "Wipro " + "x " * 20 + "Cipla"]
+    batched = ner.extract_many(texts)
+    assert len(ner.nlp.calls) == 1
+    seen, batch_size, n_process = ner.nlp.calls[0]
+    assert (batch_size, n_process) == (2, 4)
+    assert seen[2] == texts[2][:30]
+    assert batched == [ner.extract(t) for t in texts]
+    # Truncation only applies to spaCy; gazetteer keywords still match the full body
+    names = [e["name"] for e in batched[2]]
+    assert "Cipla" in names and names.count("Cipla") == 1
@@ -0,0 +1,59 @@
+import random
+import time
+from fastapi.testclient import TestClient
+
+
+def _articles(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    companies = ["HDFC Bank", "ICICI Bank", "Reliance Industries", "Infosys", "TCS", "State Bank of India"]
+    words = ["quarterly", "profit", "rises", "margin", "loan", "growth", "deposit", "shares", "rally", "guidance",
+             "outlook", "capex", "export", "demand", "rupee", "bond", "yield", "inflation", "dividend", "stake"]
+    syllables = ["ka", "ri", "to", "man", "dra", "vel", "sun", "pra", "lo", "shi", "nek", "tor", "ba", "gan"]
+    out = []
+    for i in range(n):
+        company = rng.choice(companies)
+        # Story-specific terms keep the articles apart for the deduplication agent
+        story = [("".join(rng.choice(syllables) for _ in range(4))) for _ in range(20)]
+        body = " ".join(rng.sample(words, 4) + story)
+        out.append({"id": f"BULK{i}", "title": f"{company} {story[0]} {story[1]} {rng.choice(words)}",
+                    "content": f"{company} reported {body} ref{i}.", "source": "Test",
+                    "published_at": "2024-06-01T00:00:00Z", "url": f"https://example.com/bulk/{i}"})
+    return out
+
+
+def _p99(samples):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+
+
+def test_queries_stay_responsive_during_large_ingest(tmp_app):
+    app = tmp_app
+    client = TestClient(app)
+
+    r = client.post("/api/v1/news/ingest", params={"wait": True})
+    assert r.json()["status"] == "done" and r.json()["unique"] > 0
+
+    def _query(i):
+        # A different query every time, so the query cache does not answer it
+        start = time.perf_counter()
+        assert client.get("/api/v1/query", params={"q": f"HDFC Bank loan growth {i}", "top_k": 5}).status_code == 200
+        return time.perf_counter() - start
+
+    baseline = [_query(i) for i in range(30)]
+
+    job = app.state.ingestion_worker.submit({"mode": "single_article", "raw_articles": _articles(3000)})
+    during, stages, i = [], set(), 0
+    while job.status in ("queued", "running"):
+        during.append(_query(1000 + i))
+        stages.add(client.get(f"/api/v1/news/jobs/{job.id}").json()["stage"])
+        i += 1
+    ingest_sec = job.finished_at - job.started_at
+
+    status = client.get(f"/api/v1/news/jobs/{job.id}").json()
+    assert status["status"] == "done" and status["ingested"] == 3000 and status["unique"] > 0
+    assert {"dedup", "entity"} & stages  # progress was visible while the job ran
+    # Queries kept being answered all through the ingest; none waited for it to finish
+    assert len(during) >= 20
+    assert _p99(during) < max(0.25, 5 * _p99(baseline))
+    assert _p99(during) < ingest_sec / 5
+    assert client.get("/api/v1/news/jobs/missing").status_code == 404
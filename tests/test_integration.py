@@ -9,7 +9,7 @@ def test_api_endpoints_integration():
     r = client.get("/api/v1/health")
     assert r.status_code == 200 and r.json().get("status") == "ok"
 
-    r = client.post("/api/v1/news/ingest")
+    r = client.post("/api/v1/news/ingest", params={"wait": True})
     assert r.status_code == 200
 
     r = client.get("/api/v1/query", params={"q": "HDFC Bank news", "top_k": 5})
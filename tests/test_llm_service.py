@@ -0,0 +1,117 @@
+import asyncio
+import json
+import time
+from fastapi.testclient import TestClient
+from src.services.llm_service import LLMService, parse_explanations
+
+
+class FakeProvider:
+    # Local stand-in for a chat API: one request per chunk, a fixed round-trip latency
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.requests = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def explain(self, query, articles):
+        self.requests.append([a["id"] for a in articles])
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        return [f"{a['id']} is about {query}" for a in articles]
+
+
+def _articles(n):
+    return [{"id": f"A{i}", "title": f"Story {i}"} for i in range(n)]
+
+
+def test_batch_takes_one_round_trip_and_is_cached():
+    fake = FakeProvider(0.3)
+    llm = LLMService(client=fake, batch_size=3, max_concurrency=4)
+    start = time.perf_counter()
+    out = llm.explain_batch("HDFC Bank", _articles(10))
+    elapsed = time.perf_counter() - start
+    assert out == [f"A{i} is about HDFC Bank" for i in range(10)]
+    # Four prompts of up to three hits, all in flight together
+    assert len(fake.requests) == 4 and fake.peak == 4 and elapsed < 0.3 * 1.8
+
+    assert llm.explain_batch("  hdfc bank ", _articles(12))[:10] == out
+    assert fake.requests[-1] == ["A10", "A11"] and len(fake.requests) == 5
+
+
+def test_concurrency_limit_and_timeout():
+    fake = FakeProvider(0.1)
+    llm = LLMService(client=fake, batch_size=1, max_concurrency=2)
+    llm.explain_batch("RBI", _articles(6))
+    assert fake.peak == 2
+
+    slow = LLMService(client=FakeProvider(5.0), timeout_sec=0.2)
+    start = time.perf_counter()
+    assert slow.explain_batch("RBI", _articles(3)) == [None, None, None]
+    assert time.perf_counter() - start < 1.0
+    # Timed-out explanations are not cached
+    assert slow.stats()["timeouts"] == 1 and slow.stats()["cached"] == 0
+
+
+def test_deferred_and_streamed_delivery():
+    fake = FakeProvider(0.2)
+    llm = LLMService(client=fake, batch_size=2)
+    future = llm.explain_async("Sensex", _articles(4))
+    assert not future.done()
+    assert future.result() == [f"A{i} is about Sensex" for i in range(4)]
+
+    async def _collect():
+        return [pair async for pair in llm.stream("Sensex", _articles(6))]
+
+    pairs = asyncio.run(_collect())
+    # Cached explanations come first, then the new chunk
+    assert [aid for aid, _ in pairs] == ["A0", "A1", "A2", "A3", "A4", "A5"]
+    assert len(fake.requests) == 3
+
+
+def test_parse_explanations():
+    assert parse_explanations('Sure:\n["a", "b"]', 3) == ["a", "b", None]
+    assert parse_explanations("no json here", 2) == [None, None]
+
+
+def test_query_explains_only_returned_hits(tmp_app):
+    app = tmp_app
+    fake = FakeProvider(0.3)
+    app.state.services.register("llm", lambda: LLMService(client=fake, batch_size=3, max_concurrency=4))
+    client = TestClient(app)
+    client.post("/api/v1/news/ingest", params={"wait": True})
+    client.get("/api/v1/query", params={"q": "warm up", "explain": False})
+
+    start = time.perf_counter()
+    results = client.get("/api/v1/query", params={"q": "HDFC Bank", "top_k": 5}).json()["results"]
+    elapsed = time.perf_counter() - start
+    assert len(results) == 5 and all(r["explanation"] for r in results)
+    # Only the five returned hits went to the provider, in two concurrent prompts
+    assert sorted(sum(fake.requests, [])) == sorted(r["article"]["id"] for r in results)
+    assert elapsed < 0.3 * 1.8
+
+    lines = [json.loads(line) for line in
+             client.get("/api/v1/query/stream", params={"q": "RBI policy", "top_k": 4}).iter_lines() if line]
+    assert [r["explanation"] for r in lines[0]["results"]] == [None] * 4
+    assert sorted(line["article_id"] for line in lines[1:]) == sorted(r["article"]["id"] for r in lines[0]["results"])
+
+
+def test_explained_query_leaves_event_loop_free(tmp_app):
+    import httpx
+    app = tmp_app
+    app.state.services.register("llm", lambda: LLMService(client=FakeProvider(0.5)))
+    TestClient(app).post("/api/v1/news/ingest", params={"wait": True})
+
+    async def _run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            start = time.perf_counter()
+            query = asyncio.create_task(client.get("/api/v1/query", params={"q": "HDFC Bank", "top_k": 3}))
+            await asyncio.sleep(0.05)
+            assert (await client.get("/api/v1/health")).status_code == 200
+            health = time.perf_counter() - start
+            assert all(r["explanation"] for r in (await query).json()["results"])
+            return health
+
+    # /health answers while the query still waits on the provider
+    assert asyncio.run(_run()) < 0.4
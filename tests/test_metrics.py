@@ -0,0 +1,68 @@
+import json
+from fastapi.testclient import TestClient
+from src.graph.workflow import build_news_processing_graph
+from src.services.database import Database
+from src.services.dedup_index import DedupIndex
+from src.services.embedding_service import EmbeddingService
+from src.services.metrics import MetricsRegistry, metrics
+from src.services.ner_service import NERService
+from src.services.vector_db import VectorDB
+
+
+def _graph(path):
+    embedder = EmbeddingService("test-model")
+    db = Database(str(path / "news.db"))
+    return build_news_processing_graph(db, VectorDB(str(path / "vector_store"), embedder), embedder, NERService(),
+                                       DedupIndex(str(path / "dedup_index.db")))
+
+
+def _feed():
+    with open("data/mock_news.json", "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_registry_renders_counters_and_rolling_summaries():
+    reg = MetricsRegistry(window=4)
+    reg.inc("jobs_total", stage='say "hi"')
+    for v in (5, 1, 2, 3, 4):
+        reg.observe("latency_seconds", v)
+    text = reg.render()
+    assert '# TYPE jobs_total counter\njobs_total{stage="say \\"hi\\""} 1\n' in text
+    # Quantiles over the last 4 observations, count/sum over all 5
+    assert 'latency_seconds{quantile="0.5"} 3\n' in text
+    assert "latency_seconds_sum 15\nlatency_seconds_count 5\n" in text
+
+    reg.enabled = False
+    reg.inc("jobs_total")
+    with reg.stage("news", "dedup") as stats:
+        reg.count("sql_statements")
+    assert stats == {} and reg.snapshot()["counters"] == {'jobs_total{stage="say \\"hi\\""}': 1.0}
+
+
+def test_news_graph_fills_processing_stats(tmp_path):
+    result = _graph(tmp_path).invoke({"mode": "single_article", "skip_known": True, "raw_articles": _feed()})
+    stats = result["processing_stats"]
+    assert list(stats) == ["ingest", "dedup", "entity", "impact", "store"]
+    assert all(s["seconds"] > 0 for s in stats.values())
+    assert stats["dedup"]["items_in"] == len(_feed()) and stats["dedup"]["items_out"] == len(result["unique_articles"])
+    assert stats["dedup"]["embed_texts"] == len(_feed()) and stats["dedup"]["dedup_comparisons"] > 0
+    # Dedup index lookups and the store's bulk writes are counted where they ran
+    assert stats["dedup"]["sql_statements"] > 0 and stats["store"]["sql_statements"] > 0
+    assert "embed_calls" not in stats["store"]
+
+
+def test_disabled_metrics_leave_state_alone(tmp_path, monkeypatch):
+    monkeypatch.setattr(metrics, "enabled", False)
+    result = _graph(tmp_path).invoke({"mode": "single_article", "raw_articles": _feed()})
+    assert "processing_stats" not in result
+
+
+def test_metrics_endpoint(tmp_app):
+    client = TestClient(tmp_app)
+    client.post("/api/v1/news/ingest", params={"wait": True})
+    client.get("/api/v1/query", params={"q": "HDFC Bank"})
+    r = client.get("/api/v1/metrics")
+    assert r.status_code == 200 and r.headers["content-type"].startswith("text/plain")
+    assert 'pipeline_stage_seconds_count{graph="query",stage="query"}' in r.text
+    assert 'pipeline_items_out_total{graph="news",stage="store"}' in r.text
+    assert "# TYPE sql_statement_seconds summary" in r.text
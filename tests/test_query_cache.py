@@ -0,0 +1,46 @@
+import time
+from fastapi.testclient import TestClient
+from src.main import create_app
+from src.services.query_cache import QueryCache
+
+
+def test_ttl_generation_and_size_bounds():
+    now = [0.0]
+    cache = QueryCache(max_items=2, ttl_sec=10, clock=lambda: now[0])
+    cache.put("a", 0, 1)
+    cache.put("b", 0, 2)
+    assert cache.get("a", 0) == 1
+    cache.put("c", 0, 3)  # evicts "b", the least recently used
+    assert cache.get("b", 0) is None and cache.get("c", 0) == 3
+    assert cache.get("a", 1) is None  # computed for an older index generation
+    now[0] = 11
+    assert cache.get("c", 0) is None
+    assert cache.stats() == {"hits": 2, "misses": 3, "hit_rate": 0.4, "expired": 1, "invalidated": 1, "items": 0}
+
+
+def test_api_responses_cached_until_next_store():
+    app = create_app()
+    client = TestClient(app)
+    client.post("/api/v1/news/ingest", params={"wait": True})
+    before = app.state.query_cache.stats()
+    first = client.get("/api/v1/query", params={"q": "HDFC Bank news", "top_k": 5}).json()
+    assert client.get("/api/v1/query", params={"q": "  hdfc bank   NEWS", "top_k": 5}).json() == first
+    # Lowercase symbols are looked up uppercased, so both spellings share the entry and the rows
+    lower = client.get("/api/v1/stocks/hdfcbank/news").json()
+    assert lower and client.get("/api/v1/stocks/HDFCBANK/news").json() == lower
+    stats = client.get("/api/v1/stats").json()["query_cache"]
+    assert stats["hits"] - before["hits"] == 2 and stats["misses"] - before["misses"] == 2
+    sector = client.get("/api/v1/sectors/banking/news").json()
+    assert sector and client.get("/api/v1/sectors/BANKING/news").json() == sector
+
+    start = time.perf_counter()
+    for _ in range(1000):
+        app.state.query_cache.get(("query", "hdfc bank news", 5), app.state.db.generation)
+    assert (time.perf_counter() - start) / 1000 < 1e-3
+
+    # A successful store bumps the generation: the next identical query is recomputed
+    client.post("/api/v1/news/process", json={"title": "HDFC Bank opens new branches", "content": "HDFC Bank expands.",
+                                              "source": "Test", "published_at": "2024-06-01T00:00:00Z",
+                                              "url": "https://example.com/hdfc-branches"})
+    client.get("/api/v1/query", params={"q": "HDFC Bank news", "top_k": 5})
+    assert client.get("/api/v1/stats").json()["query_cache"]["invalidated"] - stats["invalidated"] == 1
@@ -29,3 +29,44 @@ def test_semantic_query_matching():
     res = app.state.query_graph.invoke({"query": "interest rate impact", "top_k": 10})
     ids = [r["article"]["id"] for r in res.get("search_results", [])]
     assert any(i in ids for i in ["N2", "N21", "N22", "N32"]) or len(ids) > 0
+
+
+def test_lexical_bm25_ranks_title_matches():
+    hits = app.state.db.search_text("festival weekend payments", limit=5)
+    assert hits and hits[0]["article"]["id"] == "N27"
+    assert [h["score"] for h in hits] == sorted((h["score"] for h in hits), reverse=True)
+    assert app.state.db.search_text("!!!") == []
+
+
+def test_rrf_fuses_lexical_hits_without_entities():
+    # No gazetteer entity in the query: entity lookups contribute nothing, BM25 + vectors are fused
+    query = "record transactions over the festival weekend"
+    assert app.state.ner.extract(query) == []
+    res = app.state.query_graph.invoke({"query": query, "top_k": 5})
+    results = res.get("search_results", [])
+    assert results[0]["article"]["id"] == "N27"
+    assert all(0 < r["score"] <= 2 / 61 for r in results)
+
+
+def test_query_round_trips_do_not_grow_with_entities_or_top_k():
+    statements = []
+    conn = app.state.db.conn
+    # Statements SQLite runs internally (FTS5 shadow tables) are traced with a leading "--"
+    conn.set_trace_callback(lambda sql: statements.append(sql) if not sql.startswith("--") else None)
+    try:
+        counts = []
+        for query, top_k in [("RBI policy", 10), ("HDFC Bank news", 5), ("HDFC Bank, ICICI Bank and TCS with RBI on IT sector", 5),
+                             ("HDFC Bank, ICICI Bank and TCS with RBI on IT sector", 20)]:
+            statements.clear()
+            res = app.state.query_graph.invoke({"query": query, "top_k": top_k})
+            assert res["search_results"]
+            counts.append(len(statements))
+    finally:
+        conn.set_trace_callback(None)
+    assert counts[1] == counts[2] == counts[3] == 4
+
+
+def test_get_articles_bulk():
+    got = app.state.db.get_articles(["N1", "missing", "N1", "N27"])
+    assert sorted(got) == ["N1", "N27"]
+    assert got["N1"] == app.state.db.get_article("N1")
@@ -0,0 +1,131 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from src.utils import rss_parser
+from src.services.ingestion_worker import IngestionWorker
+from src.utils.rss_parser import RSSFetcher
+
+FEED = """<?xml version="1.0"?>
+<rss version="2.0"><channel><title>{name}</title>
+<item><guid>{name}-1</guid><title>{name} story one</title><link>http://example.com/{name}/1</link>
+<description>RBI keeps repo rate unchanged</description><pubDate>Mon, 01 Apr 2024 10:00:00 GMT</pubDate></item>
+<item><guid>{name}-2</guid><title>{name} story two</title><link>http://example.com/{name}/2</link>
+<description>HDFC Bank posts record profit</description><pubDate>Mon, 01 Apr 2024 11:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # /<name>?delay=<sec>&status=<code>; responses carry an ETag and honour If-None-Match
+    def do_GET(self):
+        path, _, query = self.path.partition("?")
+        params = dict(p.split("=") for p in query.split("&") if p)
+        self.server.requests.append((path, self.headers.get("If-None-Match")))
+        time.sleep(float(params.get("delay", 0)))
+        status = int(params.get("status", self.server.status.get(path, 200)))
+        etag = f'"{path}-v1"'
+        if status == 200 and self.headers.get("If-None-Match") == etag:
+            status = 304
+        self.send_response(status)
+        if status == 200:
+            body = FEED.format(name=path.strip("/")).encode()
+            self.send_header("ETag", etag)
+            self.send_header("Content-Type", "application/rss+xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    srv.requests, srv.status = [], {}
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv, f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_conditional_get_skips_unchanged_feeds(server, monkeypatch):
+    srv, base = server
+    fetcher = RSSFetcher([f"{base}/alpha", f"{base}/beta"])
+    items = fetcher.fetch()
+    assert [i["id"] for i in items] == ["alpha-1", "alpha-2", "beta-1", "beta-2"]
+    assert items[0]["source"] == "alpha" and items[1]["content"] == "HDFC Bank posts record profit"
+    fetcher.commit()  # the items were stored
+
+    parsed = []
+    parse = rss_parser.feedparser.parse
+    monkeypatch.setattr(rss_parser.feedparser, "parse", lambda body: parsed.append(body) or parse(body))
+    assert fetcher.fetch() == []
+    assert parsed == []
+    assert sorted(srv.requests[2:]) == [("/alpha", '"/alpha-v1"'), ("/beta", '"/beta-v1"')]
+    assert fetcher.state[f"{base}/alpha"].last_status == 304
+
+
+def test_poll_time_bounded_by_slowest_feed(server):
+    _, base = server
+    fetcher = RSSFetcher([f"{base}/f{i}?delay=0.4" for i in range(4)])
+    start = time.perf_counter()
+    items = fetcher.fetch()
+    assert len(items) == 8
+    assert time.perf_counter() - start < 1.2  # sequential fetching would take 1.6 s
+
+
+def test_failing_feed_backs_off_exponentially(server):
+    srv, base = server
+    now = [0.0]
+    fetcher = RSSFetcher([f"{base}/down", f"{base}/up"], base_backoff=10, max_backoff=25, clock=lambda: now[0])
+    srv.status["/down"] = 503
+    assert [i["id"] for i in fetcher.fetch()] == ["up-1", "up-2"]
+    fetcher.commit()
+    state = fetcher.state[f"{base}/down"]
+    assert (state.failures, state.retry_at, state.last_status) == (1, 10, 503)
+
+    now[0] = 5  # still backing off: only the healthy feed is requested
+    fetcher.fetch()
+    assert [p for p, _ in srv.requests].count("/down") == 1
+    now[0] = 10
+    fetcher.fetch()
+    assert (state.failures, state.retry_at) == (2, 30)
+    now[0] = 30
+    fetcher.fetch()
+    assert (state.failures, state.retry_at) == (3, 55)  # capped at max_backoff
+
+    srv.status["/down"] = 200
+    now[0] = 55
+    assert [i["id"] for i in fetcher.fetch()] == ["down-1", "down-2"]
+    assert (state.failures, state.retry_at) == (0, 0.0)
+
+
+def test_failed_ingest_refetches_items_on_next_poll(server, monkeypatch):
+    srv, base = server
+    monkeypatch.setattr(rss_parser, "_default_fetcher", RSSFetcher([f"{base}/alpha"]))
+    polled, fail = [], [True]
+
+    class _Graph:
+        # Polls like the ingest node, then fails in a later stage while fail[0] is set
+        def stream(self, state, stream_mode):
+            polled.append([i["id"] for i in rss_parser.fetch_rss_articles()])
+            if fail[0]:
+                raise RuntimeError("store failed")
+            yield {"store": {}}
+
+    worker = IngestionWorker(_Graph())
+    job = worker.submit({"mode": "ingest_rss"})
+    job.wait(5)
+    assert job.status == "failed"
+    fail[0] = False
+    for _ in range(2):
+        worker.submit({"mode": "ingest_rss"}).wait(5)
+    worker.stop(5)
+    # The poll after the failure is unconditional and returns the items again; once they are stored,
+    # the next poll sends the ETag and gets a 304
+    assert [h for _, h in srv.requests] == [None, None, '"/alpha-v1"']
+    assert polled == [["alpha-1", "alpha-2"], ["alpha-1", "alpha-2"], []]
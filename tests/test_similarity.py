@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+from src.utils.similarity import as_matrix, cosine, pairs_above, topk
+from src.services.embedding_service import EmbeddingService
+from src.services.vector_db import VectorDB
+
+
+def test_topk_matches_pure_python_cosine():
+    rng = np.random.default_rng(1)
+    vecs = rng.standard_normal((200, 16)).tolist()
+    query = rng.standard_normal(16).tolist()
+    idx, scores = topk(as_matrix([query]), as_matrix(vecs), 5, chunk=64)
+    expected = sorted(range(len(vecs)), key=lambda i: cosine(query, vecs[i]), reverse=True)[:5]
+    assert idx[0].tolist() == expected
+    assert np.allclose(scores[0], [cosine(query, vecs[i]) for i in expected], atol=1e-5)
+
+
+def test_pairs_above_matches_pure_python_cosine():
+    rng = np.random.default_rng(2)
+    base = rng.standard_normal((40, 8))
+    vecs = np.vstack([base, base[:10] + 0.05 * rng.standard_normal((10, 8))]).tolist()
+    got = {tuple(p) for p in pairs_above(as_matrix(vecs), 0.9, chunk=7).tolist()}
+    expected = {(i, j) for i in range(len(vecs)) for j in range(i + 1, len(vecs)) if cosine(vecs[i], vecs[j]) >= 0.9}
+    assert got == expected
+
+
+def test_vector_db_fallback_ranks_by_similarity(tmp_path):
+    vdb = VectorDB(str(tmp_path / "vs"), EmbeddingService("sentence-transformers/all-MiniLM-L6-v2"))
+    if vdb._collection is not None:
+        pytest.skip("chromadb installed; fallback store not used")
+    docs = ["RBI raises repo rate to curb inflation", "Infosys hires freshers for AI services",
+            "Sun Pharma gets USFDA approval"]
+    vdb.add(["a", "b", "c"], docs, [{"article_id": x} for x in "abc"])
+    hits = vdb.query("Infosys AI hiring", top_k=2)
+    assert [h["id"] for h in hits][0] == "b"
+    assert hits[0]["distance"] < hits[1]["distance"]
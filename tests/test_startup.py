@@ -0,0 +1,78 @@
+import subprocess
+import sys
+import threading
+from fastapi.testclient import TestClient
+from demo.cli_demo import cmd_article, cmd_stats
+from src.config import settings
+from src.main import MODEL_SERVICES
+from src.services.registry import ServiceRegistry
+
+
+def test_import_stays_within_budget():
+    code = ("import sys, time; t = time.perf_counter(); import src.main; dt = time.perf_counter() - t;"
+            "heavy = [m for m in ('langgraph', 'sentence_transformers', 'spacy', 'chromadb') if m in sys.modules];"
+            "print(dt, ','.join(heavy))")
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+    # No graph framework or model library at import; what is left is mostly FastAPI itself
+    assert out[1:] == []
+    assert float(out[0]) < 2.0
+
+
+def test_health_stats_and_cli_do_not_load_models(tmp_app):
+    app = tmp_app
+    client = TestClient(app)
+    assert client.get("/api/v1/health").json() == {"status": "ok"}
+    assert client.get("/api/v1/stats").json()["articles"] == 0
+    assert client.get("/api/v1/news/N1").status_code == 404
+    cmd_stats(app)
+    cmd_article(app, "N1")
+    r = client.get("/api/v1/ready")
+    assert r.status_code == 503 and not r.json()["ready"]
+    assert not any(app.state.services.loaded(name) for name in MODEL_SERVICES)
+
+
+def test_warm_up_makes_app_ready(tmp_app, monkeypatch):
+    monkeypatch.setattr(settings, "warmup_on_startup", True)
+    app = tmp_app
+    with TestClient(app) as client:
+        app.state.services._warmup.join(60)
+        r = client.get("/api/v1/ready")
+        assert r.status_code == 200 and set(r.json()["services"].values()) == {"ready"}
+        # Queries reuse the warmed-up graph
+        assert client.get("/api/v1/query", params={"q": "HDFC Bank"}).status_code == 200
+        assert app.state.query_graph is app.state.services.peek("query_graph")
+
+
+def test_registry_builds_once_under_concurrent_first_use():
+    services, built = ServiceRegistry(), []
+    started = threading.Event()
+
+    def _slow():
+        started.wait()
+        built.append(1)
+        return object()
+
+    services.register("model", _slow)
+    got = []
+    threads = [threading.Thread(target=lambda: got.append(services.get("model"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    started.set()
+    for t in threads:
+        t.join()
+    assert len(built) == 1 and len({id(g) for g in got}) == 1
+
+
+def test_registry_reports_failures_and_retries():
+    services, calls = ServiceRegistry(), []
+
+    def _flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("model download failed")
+        return "model"
+
+    services.register("model", _flaky)
+    services.warm_up(["model"]).join()
+    assert services.status() == {"model": "failed: RuntimeError: model download failed"}
+    assert services.get("model") == "model" and services.status() == {"model": "ready"}
@@ -0,0 +1,37 @@
+import json
+from src.agents.stock_impact import StockImpactAgent
+
+
+def _agent(tmp_path, **extra):
+    mapping = {
+        "companies": {"HDFC Bank": ["HDFCBANK"], "Bajaj Finance": ["BAJFINANCE"], "TCS": ["TCS"]},
+        "company_to_sector": {"HDFC Bank": ["Banking"], "Bajaj Finance": ["Financial Services"], "TCS": ["IT"]},
+        **extra,
+    }
+    (tmp_path / "stock_mappings.json").write_text(json.dumps(mapping))
+    (tmp_path / "sector_hierarchy.json").write_text(json.dumps({"Financial Services": ["Banking"]}))
+    return StockImpactAgent(data_dir=str(tmp_path))
+
+
+def _impacts(agent, ents):
+    out = agent.run({"article_entity_map": {"A1": ents}})["stock_impacts"]
+    return [(i["symbol"], i["type"]) for i in out]
+
+
+def test_sector_includes_hierarchy_children(tmp_path):
+    agent = _agent(tmp_path)
+    assert _impacts(agent, [{"type": "SECTOR", "name": "Financial Services", "normalized": "financial services"}]) == \
+        [("BAJFINANCE", "sector"), ("HDFCBANK", "sector")]
+    assert _impacts(agent, [{"type": "SECTOR", "name": "banking", "normalized": "banking"}]) == [("HDFCBANK", "sector")]
+
+
+def test_company_alias_and_regulator_scope(tmp_path):
+    agent = _agent(tmp_path, aliases={"Tata Consultancy Services": "TCS"}, regulator_to_sector={"RBI": ["Financial Services"]})
+    ents = [
+        {"type": "COMPANY", "name": "Tata Consultancy Services", "normalized": "tata consultancy services"},
+        {"type": "REGULATOR", "name": "RBI", "normalized": "rbi"},
+    ]
+    assert _impacts(agent, ents) == [("TCS", "direct"), ("BAJFINANCE", "regulator"), ("HDFCBANK", "regulator")]
+    # Regulators without a configured scope still touch every listed symbol
+    assert [s for s, _ in _impacts(agent, [{"type": "REGULATOR", "name": "SEBI", "normalized": "sebi"}])] == \
+        ["HDFCBANK", "BAJFINANCE", "TCS"]
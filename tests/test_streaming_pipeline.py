@@ -0,0 +1,169 @@
+import json
+import os
+import random
+import threading
+import pytest
+from src.graph.workflow import build_news_processing_graph, build_streaming_news_pipeline
+from src.services.database import Database
+from src.services.dedup_index import DedupIndex
+from src.services.embedding_service import EmbeddingService
+from src.services.ingestion_worker import IngestionWorker
+from src.services.ner_service import NERService
+from src.services.vector_db import VectorDB
+
+
+def _services(path):
+    embedder = EmbeddingService("sentence-transformers/all-MiniLM-L6-v2")
+    return (Database(os.path.join(path, "news.db")), VectorDB(os.path.join(path, "vector_store"), embedder),
+            embedder, NERService(), DedupIndex(os.path.join(path, "dedup_index.db")))
+
+
+def _feed():
+    # Mock news, then the same stories re-published under new ids later in the feed
+    with open("data/mock_news.json", "r", encoding="utf-8") as f:
+        articles = json.load(f)
+    reposts = [dict(a, id=f"R{a['id']}", url=a["url"] + "?syndicated") for a in articles[::3]]
+    return articles + reposts
+
+
+def _stored(db):
+    c = db.conn
+    return (sorted(r[0] for r in c.execute("SELECT id FROM articles")),
+            sorted(tuple(r) for r in c.execute("SELECT article_id, entity_id FROM article_entities")),
+            sorted(tuple(r) for r in c.execute("SELECT article_id, symbol, confidence, type FROM stock_impacts")))
+
+
+def test_streaming_matches_batch_graph(tmp_path):
+    batch_services = _services(str(tmp_path / "batch"))
+    result = build_news_processing_graph(*batch_services).invoke({"mode": "single_article", "raw_articles": _feed()})
+
+    stream_services = _services(str(tmp_path / "stream"))
+    summary = build_streaming_news_pipeline(*stream_services, batch_size=4).run(
+        {"mode": "single_article", "raw_articles": iter(_feed())})
+
+    assert _stored(stream_services[0]) == _stored(batch_services[0])
+    assert summary["batches"] == 12 and summary["ingested"] == len(_feed())
+    assert sorted(summary["unique_ids"]) == sorted(a["id"] for a in result["unique_articles"])
+    # Reposts in later micro-batches were caught against stories kept by earlier ones
+    assert sorted(map(sorted, summary["duplicate_groups"])) == sorted(map(sorted, result["duplicate_groups"]))
+    assert any(aid.startswith("RN") for g in summary["duplicate_groups"] for aid in g)
+
+
+def _chains(n=6, seed=5):
+    # Stories A, B, C where B shares most of A's words and C most of B's, but C is too far from A:
+    # the whole-list graph groups A with B, and C stays a leader of its own
+    rng = random.Random(seed)
+
+    def _word():
+        return "".join(rng.choice("bcdfghklmnprstvz") + rng.choice("aeiou") for _ in range(3))
+
+    bodies = []
+    for _ in range(n):
+        a = [_word() for _ in range(40)]
+        b = a[7:] + [_word() for _ in range(7)]
+        bodies += [a, b, b[7:] + [_word() for _ in range(7)]]
+    return [{"id": f"S{i}", "title": " ".join(_word() for _ in range(4)), "content": " ".join(body),
+             "source": "wire", "url": f"http://example.com/{i}", "published_at": "2024-04-01T10:00:00"}
+            for i, body in enumerate(bodies)]
+
+
+def test_streamed_groups_match_whole_list_groups(tmp_path):
+    result = build_news_processing_graph(*_services(str(tmp_path / "batch"))).invoke(
+        {"mode": "single_article", "raw_articles": _chains()})
+    summary = build_streaming_news_pipeline(*_services(str(tmp_path / "stream")), batch_size=2).run(
+        {"mode": "single_article", "raw_articles": iter(_chains())})
+    # Same leaders and members: C is not pulled into A's group through B, which sits in its micro-batch
+    assert sorted(summary["duplicate_groups"]) == sorted(result["duplicate_groups"])
+    assert len(summary["unique_ids"]) == 12
+
+
+def test_stages_overlap_with_bounded_batches_in_flight(tmp_path):
+    pipeline = build_streaming_news_pipeline(*_services(str(tmp_path)), batch_size=2, max_pending=1)
+    lock = threading.Lock()
+    in_flight, peak, read, read_at_first_store = [0], [0], [0], []
+
+    def _source():
+        for a in _feed():
+            read[0] += 1
+            yield a
+
+    dedup_run = pipeline.dedup.run
+
+    def _dedup(state, **kwargs):
+        with lock:
+            in_flight[0] += 1
+            peak[0] = max(peak[0], in_flight[0])
+        return dedup_run(state, **kwargs)
+
+    def _stored_batch(summary):
+        with lock:
+            in_flight[0] -= 1
+        read_at_first_store.append(read[0])
+
+    pipeline.dedup.run = _dedup
+    summary = pipeline.run({"mode": "single_article", "raw_articles": _source()}, on_batch=_stored_batch)
+    assert summary["ingested"] == len(_feed())
+    # The first batch was stored before the feed was read to the end
+    assert read_at_first_store[0] < len(_feed())
+    # Several batches between dedup and store at once, but at most one per stage plus one per queue slot
+    assert 1 < peak[0] <= 4 * 1 + 4
+
+
+def test_stage_failure_is_raised(tmp_path):
+    pipeline = build_streaming_news_pipeline(*_services(str(tmp_path)), batch_size=4)
+
+    def _fail(state):
+        raise RuntimeError("ner down")
+
+    pipeline.entity.run = _fail
+    with pytest.raises(RuntimeError, match="ner down"):
+        pipeline.run({"mode": "single_article", "raw_articles": _feed()})
+
+
+def test_worker_reports_batches(tmp_path):
+    services = _services(str(tmp_path))
+    worker = IngestionWorker(None, pipeline=build_streaming_news_pipeline(*services, batch_size=10))
+    job = worker.submit({"mode": "single_article", "raw_articles": _feed()})
+    assert job.wait(60)
+    status = job.to_dict()
+    assert status["status"] == "done" and status["stage"] == "batch 5"
+    assert status["ingested"] == len(_feed()) and status["unique"] == len(_stored(services[0])[0])
+    worker.stop()
+
+
+def test_process_pool_stages_match_batch_graph(tmp_path):
+    batch_services = _services(str(tmp_path / "batch"))
+    build_news_processing_graph(*batch_services).invoke({"mode": "single_article", "raw_articles": _feed()})
+
+    services = _services(str(tmp_path / "pooled"))
+    embedder, calls = services[2], []
+    encode = embedder._encode
+    embedder._encode = lambda texts: calls.append(len(texts)) or encode(texts)
+    pipeline = build_streaming_news_pipeline(*services, batch_size=4, embed_workers=2, ner_workers=2)
+    summary = pipeline.run({"mode": "single_article", "raw_articles": _feed()})
+
+    assert _stored(services[0]) == _stored(batch_services[0])
+    assert summary["ingested"] == len(_feed())
+    # Every text dedup and store embedded had been computed on the pool already
+    assert calls == []
+    # Later runs reuse the same pools
+    pools = pipeline.pools
+    pipeline.run({"mode": "single_article", "raw_articles": _feed()[:4]})
+    assert pipeline.pools is pools
+    pipeline.close()
+
+
+def test_app_forks_worker_pools_before_other_threads(tmp_path):
+    import subprocess
+    import sys
+    code = ("from fastapi.testclient import TestClient\n"
+            "from src.main import app\n"
+            "pools = app.state.services.peek('worker_pools')\n"
+            "client = TestClient(app)\n"
+            "job = client.post('/api/v1/news/ingest', params={'wait': True}).json()\n"
+            "print(pools.method, job['status'], job['unique'] > 0)\n")
+    env = dict(os.environ, DB_PATH=str(tmp_path / "news.db"), VECTOR_DB_PATH=str(tmp_path / "vector_store"),
+               INGEST_BATCH_SIZE="8", INGEST_EMBED_WORKERS="1", INGEST_NER_WORKERS="1", WARMUP_ON_STARTUP="false")
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, timeout=120, check=True)
+    # Started by create_app while single-threaded: forked, so the workers share the loaded models
+    assert out.stdout.split() == ["fork", "done", "True"]
@@ -0,0 +1,84 @@
+import numpy as np
+from src.services.vector_index import VectorIndex
+
+
+def _data(n, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((n, dim)).astype(np.float32)
+
+
+def test_exact_search_and_restart(tmp_path):
+    vecs = _data(300)
+    index = VectorIndex(str(tmp_path / "idx"))
+    ids = [f"A{i}" for i in range(300)]
+    index.upsert(ids[:200], vecs[:200], [f"doc {i}" for i in range(200)], [{"article_id": i} for i in ids[:200]])
+    index.upsert(ids[150:], vecs[150:], [f"doc {i}" for i in range(150, 300)], [{"article_id": i} for i in ids[150:]])
+    assert len(index) == 300
+    hits = index.search(vecs[42:43], 3)[0]
+    assert hits[0][0] == "A42" and abs(hits[0][1] - 1.0) < 1e-5
+
+    reopened = VectorIndex(str(tmp_path / "idx"))
+    assert len(reopened) == 300
+    top = reopened.search(vecs[250:251], 1)[0][0]
+    assert top[0] == "A250" and top[2] == "doc 250"
+    assert reopened.get("A7")[2] == {"article_id": "A7"}
+
+
+def test_ivf_recall_improves_with_nprobe(tmp_path):
+    centers = _data(50, seed=1)
+    rng = np.random.default_rng(2)
+    vecs = (centers[rng.integers(0, 50, 5000)] + 0.3 * rng.standard_normal((5000, 32))).astype(np.float32)
+    queries = vecs[:50] + 0.05 * rng.standard_normal((50, 32)).astype(np.float32)
+    ids = [str(i) for i in range(5000)]
+    exact = VectorIndex(str(tmp_path / "exact"))
+    exact.upsert(ids, vecs, [None] * 5000, [{}] * 5000)
+    truth = [{h[0] for h in hits} for hits in exact.search(queries, 10)]
+
+    def recall(nprobe):
+        ivf = VectorIndex(str(tmp_path / f"ivf{nprobe}"), mode="ivf", nprobe=nprobe, ivf_min_size=1000)
+        ivf.upsert(ids, vecs, [None] * 5000, [{}] * 5000)
+        got = ivf.search(queries, 10)
+        return np.mean([len(t & {h[0] for h in g}) / 10 for t, g in zip(truth, got)])
+
+    low, high = recall(1), recall(32)
+    assert high >= 0.95
+    assert high >= low
+
+
+def test_ingest_embeds_once_and_stores_vectors_only(tmp_path):
+    import json
+    from src.graph.workflow import build_news_processing_graph
+    from src.services.database import Database
+    from src.services.dedup_index import DedupIndex
+    from src.services.embedding_service import EmbeddingService
+    from src.services.ner_service import NERService
+    from src.services.vector_db import VectorDB
+
+    embedder = EmbeddingService("test-model")
+    calls = []
+    encode = embedder._encode
+    embedder._encode = lambda texts: calls.append(len(texts)) or encode(texts)
+    db = Database(str(tmp_path / "news.db"))
+    vectordb = VectorDB(str(tmp_path / "vector_store"), embedder, db=db)
+    graph = build_news_processing_graph(db, vectordb, embedder, NERService(), DedupIndex(str(tmp_path / "dedup.db")))
+    with open("data/mock_news.json", "r", encoding="utf-8") as f:
+        articles = json.load(f)
+    unique = graph.invoke({"mode": "single_article", "raw_articles": articles})["unique_articles"]
+    # Dedup embedded every article once; the store reused those vectors
+    assert sum(calls) == len(articles)
+
+    # Re-ingesting the same ids replaces their entries
+    vectordb.upsert([a["id"] for a in unique], np.ones((len(unique), embedder.dim), dtype=np.float32),
+                    [{"article_id": a["id"]} for a in unique])
+    assert len(vectordb._index) == len(unique)
+
+    hits = vectordb.query("HDFC Bank", top_k=3)
+    assert all(h["document"] is None for h in vectordb.query("HDFC Bank", top_k=3, include_documents=False))
+    article = db.get_article(hits[0]["id"])
+    # Not kept in the vector store; fetched from SQLite when asked for
+    assert hits[0]["document"] == article["title"] + "\n" + article["content"]
+
+    # Vectors produced another way (new fallback version, model or dim) invalidate the persisted index
+    assert len(VectorDB(str(tmp_path / "vector_store"), embedder, db=db)._index) == len(unique)
+    embedder.cache_key += ":v3"
+    assert len(VectorDB(str(tmp_path / "vector_store"), embedder, db=db)._index) == 0